@@ -4,15 +4,30 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.agents.scheduler import agent_scheduler
+from src.api.event_backends import create_backend
+from src.api.events import event_bus
 from src.api.routes import agent, events, projects, schema, settings, tasks
 from src.database import init_db
+from src.mcp_client.pool import mcp_pool
+from src.services.sandbox import sandbox_collector
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Startup and shutdown events."""
     await init_db()
+    await event_bus.start(create_backend())
+    # Reclaim runs left RUNNING by a previous process before serving the queue
+    await agent_scheduler.recover()
+    await agent_scheduler.start()
+    await mcp_pool.start()
+    await sandbox_collector.start()
     yield
+    await sandbox_collector.stop()
+    await agent_scheduler.stop()
+    await mcp_pool.close()
+    await event_bus.stop()
 
 
 app = FastAPI(
@@ -30,6 +45,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -0,0 +1,109 @@
+"""Per-run budgets for agent execution.
+
+A run is bounded by agent turns, wall-clock time and tokens. Each limit is
+taken from the task's `budget` when set there, otherwise from the global
+agent settings (/api/settings); None means unlimited.
+
+Enforcement while the query() stream is consumed:
+    turns     - passed to the SDK as max_turns (result "error_max_turns")
+    wall_time - asyncio.timeout around the stream
+    tokens    - counted from streamed API usage events, checked per event
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from claude_agent_sdk.types import ResultMessage
+
+    from src.api.routes.settings import AgentSettings
+    from src.models.agent_run import AgentRun
+
+
+class BudgetExceededError(Exception):
+    """Raised when a run goes over one of its limits."""
+
+    def __init__(self, limit: str, detail: str) -> None:
+        super().__init__(f"Budget exceeded ({limit}): {detail}")
+        self.limit = limit
+
+
+@dataclass(frozen=True)
+class RunBudget:
+    """Effective limits of one agent run."""
+
+    max_turns: int
+    max_wall_seconds: float | None = None
+    max_tokens: int | None = None
+
+    @classmethod
+    def resolve(
+        cls, task_budget: dict[str, Any] | None, settings: AgentSettings
+    ) -> RunBudget:
+        """Task limits where set, global agent settings otherwise."""
+        limits = {k: v for k, v in (task_budget or {}).items() if v is not None}
+        return cls(
+            max_turns=limits.get("max_turns", settings.max_turns),
+            max_wall_seconds=limits.get("max_wall_seconds", settings.max_wall_seconds),
+            max_tokens=limits.get("max_tokens", settings.max_tokens),
+        )
+
+
+def _input_tokens(usage: dict[str, Any]) -> int:
+    """Billed input tokens (cache reads excluded) of an API usage block."""
+    return int(usage.get("input_tokens") or 0) + int(
+        usage.get("cache_creation_input_tokens") or 0
+    )
+
+
+@dataclass
+class RunUsage:
+    """Turns, tokens and cost consumed by a run so far."""
+
+    num_turns: int | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float | None = None
+    _message_output: int = 0  # Output so far of the message being streamed
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add_stream_event(self, event: dict[str, Any]) -> None:
+        """Count tokens from a raw API stream event (partial messages)."""
+        if event.get("type") == "message_start":
+            usage = event.get("message", {}).get("usage") or {}
+            self.input_tokens += _input_tokens(usage)
+            self._message_output = int(usage.get("output_tokens") or 0)
+            self.output_tokens += self._message_output
+        elif event.get("type") == "message_delta":
+            # Delta usage is cumulative for the current message
+            output = int((event.get("usage") or {}).get("output_tokens") or 0)
+            if output > self._message_output:
+                self.output_tokens += output - self._message_output
+                self._message_output = output
+
+    def add_result(self, message: ResultMessage) -> None:
+        """Take the SDK's final totals, which are authoritative."""
+        self.num_turns = message.num_turns
+        self.cost_usd = message.total_cost_usd
+        if message.usage:
+            self.input_tokens = _input_tokens(message.usage)
+            self.output_tokens = int(message.usage.get("output_tokens") or 0)
+
+    def check(self, budget: RunBudget) -> None:
+        """Raise BudgetExceededError if the token limit is exceeded."""
+        if budget.max_tokens is not None and self.total_tokens > budget.max_tokens:
+            raise BudgetExceededError(
+                "tokens", f"{self.total_tokens} > {budget.max_tokens} tokens"
+            )
+
+    def record(self, agent_run: AgentRun) -> None:
+        """Store usage on the run."""
+        agent_run.num_turns = self.num_turns
+        agent_run.input_tokens = self.input_tokens
+        agent_run.output_tokens = self.output_tokens
+        agent_run.cost_usd = self.cost_usd
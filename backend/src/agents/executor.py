@@ -2,23 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from claude_agent_sdk import query
-from claude_agent_sdk.types import ClaudeAgentOptions
+from claude_agent_sdk.types import ClaudeAgentOptions, StreamEvent
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.agent_log_service import append_run_logs
 from src.api.events import EventType, TaskEvent, event_bus
+from src.api.routes.settings import load_settings
 from src.mcp_client import get_defaults, get_mcp_config
+from src.mcp_client.pool import MCPLease, mcp_pool
 from src.models.agent_run import AgentRun, AgentRunStatus
 from src.models.task import Task, TaskStatus
-from src.services.git import create_checkpoint, create_commit
-
+from src.services.git import (
+    Worktree,
+    checkpoint_ref,
+    create_checkpoint,
+    create_commit,
+    create_worktree,
+    merge_worktree,
+    remove_worktree,
+)
+from src.services.sandbox import ensure_sandbox
+
+from .budget import BudgetExceededError, RunBudget, RunUsage
+from .log_batcher import AgentLogBatcher
 from .types import AgentResult
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from claude_agent_sdk.types import Message
+
     from src.models.project import Project
 
 
@@ -65,7 +84,10 @@ async def _publish_task_update(
 
 
 async def _publish_finished_log(
-    task_id: str, agent_run_id: str, error: str | None = None
+    task_id: str,
+    agent_run_id: str,
+    error: str | None = None,
+    project_id: str | None = None,
 ) -> None:
     """Publish a 'finished' log entry to signal agent completion."""
     content = error if error else "Agent execution completed"
@@ -74,12 +96,14 @@ async def _publish_finished_log(
         "type": "finished",
         "content": content,
     }
+    await append_run_logs(agent_run_id, [log_entry])
     await event_bus.publish(
         TaskEvent(
             event_type=EventType.AGENT_LOG,
             data={
                 "task_id": task_id,
                 "agent_run_id": agent_run_id,
+                "project_id": project_id,
                 "log": log_entry,
             },
         )
@@ -93,16 +117,32 @@ async def _finalize_run(
     status: AgentRunStatus,
     task_status: TaskStatus,
     error_msg: str | None = None,
+    usage: RunUsage | None = None,
 ) -> None:
-    """Finalize agent run and task with given statuses."""
+    """Finalize agent run and task with given statuses (and budget usage)."""
     agent_run.status = status
     agent_run.completed_at = datetime.now(timezone.utc)
     if error_msg:
         agent_run.error_message = error_msg
+    if usage:
+        usage.record(agent_run)
     task.status = task_status
     await db.commit()
 
 
+async def _land_worktree(
+    agent_run: AgentRun, workspace: Path, worktree: Worktree, message: str
+) -> bool:
+    """Apply a worktree run's changes to the workspace.
+
+    On conflict the branch is recorded on the run (and kept) for review.
+    """
+    if await merge_worktree(workspace, worktree, message):
+        return True
+    agent_run.worktree_branch = worktree.branch
+    return False
+
+
 async def execute_agent_run(
     db: AsyncSession,
     agent_run: AgentRun,
@@ -112,9 +152,14 @@ async def execute_agent_run(
 ) -> AgentResult:
     """Execute an existing agent run using the Claude Agent SDK.
 
+    The run is bounded by the task's budget (or the global agent settings):
+    going over turns, wall time or tokens stops it as FAILED with
+    budget_exceeded set. Usage is recorded on the run in every outcome.
+
     Args:
         db: Database session
-        agent_run: The pre-created AgentRun (in PENDING status)
+        agent_run: The pre-created AgentRun (PENDING, or RUNNING once claimed
+            by the scheduler)
         task: The task to execute
         project: The project containing workspace path
         mcp_tools: List of MCP tools to enable (None = use task.allowed_mcps or defaults)
@@ -125,9 +170,9 @@ async def execute_agent_run(
     workspace_path = project.workspace_path if project else "."
     workspace = Path(workspace_path).resolve()
 
-    # Transition to RUNNING and set started_at
+    # Transition to RUNNING and set started_at (kept if already claimed)
     agent_run.status = AgentRunStatus.RUNNING
-    agent_run.started_at = datetime.now(timezone.utc)
+    agent_run.started_at = agent_run.started_at or datetime.now(timezone.utc)
     await db.commit()
 
     # Update task status and notify
@@ -135,64 +180,133 @@ async def execute_agent_run(
     await db.commit()
     await _publish_task_update(task, {"agent_run_id": agent_run.id})
 
-    # Git checkpoint before execution
-    if workspace.exists():
-        create_checkpoint(workspace, task.id)
-
-    # Build agent options
-    mcp_config = get_mcp_config(tools, str(workspace))
-    options = ClaudeAgentOptions(
-        cwd=str(workspace),
-        mcp_servers=mcp_config,
-        permission_mode="bypassPermissions",
-        max_turns=50,
-    )
-
-    prompt = _build_prompt(task, project)
-
+    log_batcher = AgentLogBatcher(task.id, agent_run.id, task.project_id, persist=True)
+    usage = RunUsage()
+    # Set up inside the try below; cleaned up in its finally if they exist
+    worktree: Worktree | None = None
+    mcp_lease: MCPLease | None = None
+    stream: AsyncIterator[Message] | None = None
     try:
-        async for message in query(prompt=prompt, options=options):
-            # Determine message type from class name (SDK types don't have .type attr)
-            msg_class = message.__class__.__name__
-            msg_type = msg_class.replace(
-                "Message", ""
-            ).lower()  # ResultMessage → result
-
-            # Stream log to frontend via SSE
-            log_entry = {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "type": msg_type,
-                "content": str(message)[:500],
-            }
-            await event_bus.publish(
-                TaskEvent(
-                    event_type=EventType.AGENT_LOG,
-                    data={
-                        "task_id": task.id,
-                        "agent_run_id": agent_run.id,
-                        "log": log_entry,
-                    },
-                )
-            )
+        # Git checkpoint before execution
+        all_settings = load_settings()
+        if workspace.exists():
+            checkpointed = await create_checkpoint(workspace, task.id)
+            if all_settings.git.use_worktrees:
+                # Based on the checkpoint so uncommitted changes come along
+                base = checkpoint_ref(task.id) if checkpointed else "HEAD"
+                worktree = await create_worktree(workspace, agent_run.id, base)
+        # The agent (and its MCP servers) work in the run's worktree if there is one
+        cwd = worktree.cwd if worktree else workspace
+        # Sandboxes are created lazily, by the first run that needs one
+        sandbox = await asyncio.to_thread(ensure_sandbox, task.sandbox_dir)
+
+        # Build agent options
+        settings = all_settings.agent
+        budget = RunBudget.resolve(task.budget, settings)
+        mcp_config = get_mcp_config(
+            tools, str(cwd), sandbox_dir=str(sandbox) if sandbox else None
+        )
+        mcp_lease = await mcp_pool.acquire(mcp_config)
+        options = ClaudeAgentOptions(
+            cwd=str(cwd),
+            mcp_servers=mcp_lease.servers,
+            permission_mode="bypassPermissions",
+            max_turns=budget.max_turns,
+            model=settings.model,
+            # Token budgets are enforced from streamed API usage events
+            include_partial_messages=budget.max_tokens is not None,
+        )
 
-            # Check for success result
-            if msg_type == "result":
-                if getattr(message, "subtype", None) == "success":
-                    # Save agent result to task
-                    task.result = getattr(message, "result", None)
-                    create_commit(workspace, f"feat: {task.title}")
-                    await _finalize_run(
-                        db, agent_run, task, AgentRunStatus.COMPLETED, TaskStatus.DONE
-                    )
-                    await _publish_task_update(task)
-                    await _publish_finished_log(task.id, agent_run.id)
-                    return AgentResult(
-                        status=AgentRunStatus.COMPLETED,
-                        message="Task completed successfully",
-                    )
+        prompt = _build_prompt(task, project)
+
+        deadline = asyncio.timeout(budget.max_wall_seconds)
+        stream = query(prompt=prompt, options=options)
+        try:
+            async with deadline:
+                async for message in stream:
+                    if isinstance(message, StreamEvent):
+                        usage.add_stream_event(message.event)
+                        usage.check(budget)
+                        continue  # Partial messages are not logged
+
+                    # Determine message type from class name (SDK types don't have .type attr)
+                    msg_class = message.__class__.__name__
+                    msg_type = msg_class.replace(
+                        "Message", ""
+                    ).lower()  # ResultMessage → result
+
+                    # Stream log to frontend via SSE (coalesced into batches)
+                    log_entry = {
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "type": msg_type,
+                        "content": str(message),
+                    }
+                    await log_batcher.add(log_entry)
+
+                    if msg_type != "result":
+                        continue
+                    usage.add_result(message)
+                    subtype = getattr(message, "subtype", None)
+                    if subtype == "error_max_turns":
+                        raise BudgetExceededError(
+                            "turns", f"reached {budget.max_turns} turns"
+                        )
+                    usage.check(budget)
+
+                    # Check for success result
+                    if subtype == "success":
+                        # Save agent result to task
+                        task.result = getattr(message, "result", None)
+                        await log_batcher.close()
+                        commit_message = f"feat: {task.title}"
+                        if worktree is None or await _land_worktree(
+                            agent_run, workspace, worktree, commit_message
+                        ):
+                            await create_commit(workspace, commit_message)
+                        await _finalize_run(
+                            db,
+                            agent_run,
+                            task,
+                            AgentRunStatus.COMPLETED,
+                            TaskStatus.DONE,
+                            usage=usage,
+                        )
+                        await _publish_task_update(task)
+                        await _publish_finished_log(
+                            task.id, agent_run.id, project_id=task.project_id
+                        )
+                        return AgentResult(
+                            status=AgentRunStatus.COMPLETED,
+                            message="Task completed successfully",
+                        )
+        except TimeoutError:
+            if not deadline.expired():
+                raise
+            raise BudgetExceededError(
+                "wall_time", f"ran longer than {budget.max_wall_seconds}s"
+            ) from None
+        # Stream ended without a result: still keep what the run produced
+        if worktree is not None:
+            await _land_worktree(agent_run, workspace, worktree, f"feat: {task.title}")
+
+    except asyncio.CancelledError:
+        # Stopped via stop_agent_run(): the SDK's cleanup has already
+        # terminated the CLI subprocess and, with it, its MCP servers
+        await log_batcher.close()
+        await _finalize_run(
+            db, agent_run, task, AgentRunStatus.CANCELLED, TaskStatus.TODO, usage=usage
+        )
+        await _publish_task_update(task)
+        await _publish_finished_log(
+            task.id, agent_run.id, "Agent run cancelled", project_id=task.project_id
+        )
+        raise
 
     except Exception as e:
         error_msg = str(e)
+        if isinstance(e, BudgetExceededError):
+            agent_run.budget_exceeded = e.limit
+        await log_batcher.close()
         await _finalize_run(
             db,
             agent_run,
@@ -200,22 +314,50 @@ async def execute_agent_run(
             AgentRunStatus.FAILED,
             TaskStatus.TODO,
             error_msg,
+            usage,
         )
         await _publish_task_update(task, {"error": error_msg})
-        await _publish_finished_log(task.id, agent_run.id, error_msg)
+        await _publish_finished_log(
+            task.id, agent_run.id, error_msg, project_id=task.project_id
+        )
         return AgentResult(status=AgentRunStatus.FAILED, error=error_msg)
 
+    finally:
+        # Also closes the SDK stream (and its subprocess) on early return
+        if stream is not None:
+            await stream.aclose()
+        if mcp_lease is not None:
+            await mcp_pool.release(mcp_lease)
+        if worktree is not None:
+            await remove_worktree(
+                workspace, worktree, delete_branch=agent_run.worktree_branch is None
+            )
+
     # If we get here without explicit result, mark as completed
-    await _finalize_run(db, agent_run, task, AgentRunStatus.COMPLETED, TaskStatus.DONE)
-    await _publish_finished_log(task.id, agent_run.id)
+    await log_batcher.close()
+    await _finalize_run(
+        db, agent_run, task, AgentRunStatus.COMPLETED, TaskStatus.DONE, usage=usage
+    )
+    await _publish_finished_log(task.id, agent_run.id, project_id=task.project_id)
     return AgentResult(
         status=AgentRunStatus.COMPLETED, message="Task execution finished"
     )
 
 
 async def stop_agent_run(db: AsyncSession, agent_run: AgentRun) -> bool:
-    """Stop a running agent (placeholder for future implementation)."""
-    # TODO: Implement actual process termination
+    """Stop a running agent.
+
+    A run executing in this process is cancelled: its SDK stream and CLI
+    subprocess are closed and the run is finalized as CANCELLED before this
+    returns. A run executing in another worker is marked CANCELLED here and
+    cancelled by that worker on its next lease renewal.
+    """
+    from .scheduler import agent_scheduler  # scheduler imports this module
+
+    if await agent_scheduler.cancel(agent_run.id):
+        await db.refresh(agent_run)
+        return agent_run.status == AgentRunStatus.CANCELLED
+
     agent_run.status = AgentRunStatus.CANCELLED
     agent_run.completed_at = datetime.now(timezone.utc)
     await db.commit()
@@ -0,0 +1,121 @@
+"""Coalesce agent log entries into batched SSE events."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+from typing import Any
+
+from src.api.agent_log_service import append_run_logs
+from src.api.events import EventType, TaskEvent, event_bus
+
+logger = logging.getLogger(__name__)
+
+# Flush window and size limit for agent log batches
+LOG_BATCH_WINDOW_MS = int(os.environ.get("AGENT_LOG_BATCH_WINDOW_MS", "50"))
+LOG_BATCH_MAX_ENTRIES = int(os.environ.get("AGENT_LOG_BATCH_MAX_ENTRIES", "32"))
+
+# SSE payloads carry a preview; the full content goes to the log store
+SSE_CONTENT_LIMIT = 500
+
+
+class AgentLogBatcher:
+    """Buffer log entries of one agent run and publish them in batches.
+
+    Entries are flushed as a single `agent_log_batch` event once the
+    window elapses after the first buffered entry, or immediately when
+    max_entries is reached. Always close() the batcher when the run ends.
+    Flushes are serialized, so batches are published in entry order and
+    nothing is published after close() returns.
+
+    With persist=True each flush also appends the full, untruncated
+    entries to the agent_run_logs table in one transaction, before the
+    batch is published. If that write fails the batch is still published
+    (marked "persisted": false) and counted in unpersisted.
+
+    Event payload:
+        {"task_id": ..., "agent_run_id": ..., "project_id": ..., "logs": [...],
+         "persisted": bool (only with persist=True)}
+    """
+
+    def __init__(
+        self,
+        task_id: str,
+        agent_run_id: str,
+        project_id: str | None = None,
+        window_ms: int = LOG_BATCH_WINDOW_MS,
+        max_entries: int = LOG_BATCH_MAX_ENTRIES,
+        persist: bool = False,
+    ) -> None:
+        self.task_id = task_id
+        self.agent_run_id = agent_run_id
+        self.project_id = project_id
+        self.window = window_ms / 1000
+        self.max_entries = max(1, max_entries)
+        self.persist = persist
+        self._entries: list[dict[str, Any]] = []
+        self._timer: asyncio.Task[None] | None = None
+        self._flush_lock = asyncio.Lock()
+        self.unpersisted = 0  # Entries published but not stored
+
+    async def add(self, log_entry: dict[str, Any]) -> None:
+        """Buffer a log entry, flushing if the batch is full."""
+        self._entries.append(log_entry)
+        if len(self._entries) >= self.max_entries:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        """Flush once the batching window has elapsed."""
+        await asyncio.sleep(self.window)
+        self._timer = None  # From here on flush() must not cancel us
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Publish (and optionally persist) all buffered entries at once."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+
+        # Waits for a flush already in progress; entries are taken under
+        # the lock so each batch is the next run of buffered entries
+        async with self._flush_lock:
+            entries, self._entries = self._entries, []
+            if entries:
+                await self._publish(entries)
+
+    async def _publish(self, entries: list[dict[str, Any]]) -> None:
+        """Persist (if enabled) and publish one batch."""
+        data: dict[str, Any] = {
+            "task_id": self.task_id,
+            "agent_run_id": self.agent_run_id,
+            "project_id": self.project_id,
+            "logs": [
+                {**entry, "content": entry["content"][:SSE_CONTENT_LIMIT]}
+                for entry in entries
+            ],
+        }
+        if self.persist:
+            data["persisted"] = await append_run_logs(self.agent_run_id, entries)
+            if not data["persisted"]:
+                self.unpersisted += len(entries)
+                logger.warning(
+                    "Run %s: %d log entries only streamed, not stored (%d total)",
+                    self.agent_run_id,
+                    len(entries),
+                    self.unpersisted,
+                )
+        await event_bus.publish(
+            TaskEvent(event_type=EventType.AGENT_LOG_BATCH, data=data)
+        )
+
+    async def close(self) -> None:
+        """Stop the window timer, then flush after any in-progress flush."""
+        timer = self._timer
+        await self.flush()
+        if timer is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await timer
@@ -13,7 +13,11 @@ from .executor import execute_agent_run, stop_agent_run
 from .planner import plan_task_decomposition
 
 # Re-export subtask executor
-from .subtask_executor import execute_subtasks_sequentially
+from .subtask_executor import (
+    build_subtask_graph,
+    execute_subtasks,
+    execute_subtasks_sequentially,
+)
 
 __all__ = [
     # Types
@@ -25,5 +29,7 @@ __all__ = [
     # Planner
     "plan_task_decomposition",
     # Subtask Executor
+    "build_subtask_graph",
+    "execute_subtasks",
     "execute_subtasks_sequentially",
 ]
@@ -51,6 +51,8 @@ async def _create_placeholder_subtasks(
 
     created_subtasks: list[Task] = []
     for plan in subtask_plans:
+        # Setup -> Implement -> Finalize: each waits for the previous one
+        previous = created_subtasks[-1].id if created_subtasks else None
         subtask = Task(
             id=str(uuid4()),
             title=plan["title"],
@@ -60,6 +62,7 @@ async def _create_placeholder_subtasks(
             project_id=parent.project_id,
             parent_id=parent.id,
             steps=plan["steps"],
+            depends_on=[previous] if previous else None,
         )
         db.add(subtask)
         created_subtasks.append(subtask)
@@ -128,6 +131,7 @@ async def plan_task_decomposition(
                     "project_id": subtask.project_id,
                     "parent_id": subtask.parent_id,
                     "steps": subtask.steps,
+                    "depends_on": subtask.depends_on,
                     "created_at": (
                         subtask.created_at.isoformat() if subtask.created_at else None
                     ),
@@ -0,0 +1,465 @@
+"""Global agent run scheduler.
+
+PENDING AgentRun rows are the persistent run queue: a run is queued by
+committing it as PENDING and waking the scheduler. The scheduler serves the
+queue by priority (higher first), then FIFO by queued_at, and starts a run
+only while both limits hold:
+
+    AGENT_MAX_CONCURRENT_RUNS   - RUNNING runs overall (default 4)
+    AGENT_MAX_RUNS_PER_PROJECT  - RUNNING runs per project (default 2)
+
+A run is claimed with a single conditional UPDATE (PENDING -> RUNNING that
+also re-checks both limits), so limits hold across worker processes that
+share the database. The queue survives restarts because it is the table.
+
+Callers wait for a run with wait_for(), which watches the run's row, so
+it works whichever worker process ends up executing the run.
+
+A claimed run holds a lease: the worker executing it refreshes
+heartbeat_at every AGENT_RUN_LEASE_SECONDS / 3. RUNNING runs whose lease
+expired (the worker crashed or was redeployed) are re-queued until they
+have been claimed AGENT_RUN_MAX_ATTEMPTS times, then failed.
+
+Functions:
+    queue_positions: 1-based queue position of every PENDING run
+    recover_orphaned_runs: Re-queue or fail RUNNING runs with expired leases
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from src.database import AsyncSessionLocal
+from src.models.agent_run import AgentRun, AgentRunStatus
+from src.models.project import Project
+from src.models.task import Task, TaskStatus
+
+from .executor import _publish_task_update, execute_agent_run
+from .types import AgentResult
+
+logger = logging.getLogger(__name__)
+
+AGENT_MAX_CONCURRENT_RUNS = int(os.environ.get("AGENT_MAX_CONCURRENT_RUNS", "4"))
+AGENT_MAX_RUNS_PER_PROJECT = int(os.environ.get("AGENT_MAX_RUNS_PER_PROJECT", "2"))
+# Fallback re-check of the queue (runs queued by other processes)
+AGENT_SCHEDULER_POLL_INTERVAL = float(
+    os.environ.get("AGENT_SCHEDULER_POLL_INTERVAL", "2.0")
+)
+AGENT_RUN_LEASE_SECONDS = float(os.environ.get("AGENT_RUN_LEASE_SECONDS", "60"))
+AGENT_RUN_MAX_ATTEMPTS = int(os.environ.get("AGENT_RUN_MAX_ATTEMPTS", "2"))
+# How long stop requests wait for a cancelled run to wind down
+AGENT_CANCEL_TIMEOUT = float(os.environ.get("AGENT_CANCEL_TIMEOUT", "10"))
+
+FINISHED_STATUSES = (
+    AgentRunStatus.COMPLETED,
+    AgentRunStatus.FAILED,
+    AgentRunStatus.CANCELLED,
+)
+
+INTERRUPTED_ERROR = "Run interrupted: its worker stopped before it finished"
+
+_QUEUE_ORDER = (
+    AgentRun.priority.desc(),
+    AgentRun.queued_at.asc(),
+    AgentRun.id.asc(),
+)
+
+
+async def queue_positions(db: AsyncSession) -> dict[str, int]:
+    """Map each PENDING run ID to its 1-based position in the queue."""
+    result = await db.execute(
+        select(AgentRun.id)
+        .where(AgentRun.status == AgentRunStatus.PENDING)
+        .order_by(*_QUEUE_ORDER)
+    )
+    return {run_id: position for position, run_id in enumerate(result.scalars(), 1)}
+
+
+@dataclass
+class RecoveryReport:
+    """Runs reclaimed by recover_orphaned_runs()."""
+
+    requeued: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+async def recover_orphaned_runs(
+    db: AsyncSession,
+    lease_seconds: float = AGENT_RUN_LEASE_SECONDS,
+    max_attempts: int = AGENT_RUN_MAX_ATTEMPTS,
+) -> RecoveryReport:
+    """Reclaim RUNNING runs whose worker stopped refreshing their lease.
+
+    Runs claimed fewer than max_attempts times go back to the queue (keeping
+    their priority and queue time); the rest are FAILED and their task is
+    returned to TODO. Every UPDATE re-checks the expired lease, so recovering
+    from several workers at once is safe.
+    """
+    now = datetime.now(timezone.utc)
+    expired = (
+        AgentRun.status == AgentRunStatus.RUNNING,
+        or_(
+            AgentRun.heartbeat_at.is_(None),
+            AgentRun.heartbeat_at < now - timedelta(seconds=lease_seconds),
+        ),
+    )
+    report = RecoveryReport()
+
+    result = await db.execute(
+        update(AgentRun)
+        .where(*expired, AgentRun.attempts < max_attempts)
+        .values(status=AgentRunStatus.PENDING, started_at=None, heartbeat_at=None)
+        .returning(AgentRun.id)
+        .execution_options(synchronize_session=False)
+    )
+    report.requeued = list(result.scalars())
+
+    result = await db.execute(
+        update(AgentRun)
+        .where(*expired)
+        .values(
+            status=AgentRunStatus.FAILED,
+            error_message=INTERRUPTED_ERROR,
+            completed_at=now,
+        )
+        .returning(AgentRun.id, AgentRun.task_id)
+        .execution_options(synchronize_session=False)
+    )
+    failed = result.all()
+    report.failed = [run_id for run_id, _ in failed]
+
+    # Runs queued before queued_at existed keep their creation order
+    await db.execute(
+        update(AgentRun)
+        .where(AgentRun.status == AgentRunStatus.PENDING, AgentRun.queued_at.is_(None))
+        .values(queued_at=AgentRun.created_at)
+        .execution_options(synchronize_session=False)
+    )
+
+    tasks: list[Task] = []
+    if failed:
+        result = await db.execute(
+            select(Task).where(
+                Task.id.in_([task_id for _, task_id in failed]),
+                Task.status == TaskStatus.IN_PROGRESS,
+            )
+        )
+        tasks = list(result.scalars())
+        for task in tasks:
+            task.status = TaskStatus.TODO
+    await db.commit()
+
+    for task in tasks:
+        await _publish_task_update(task, {"error": INTERRUPTED_ERROR})
+    if report.requeued or report.failed:
+        logger.warning(
+            "Recovered orphaned agent runs: requeued=%s failed=%s",
+            report.requeued,
+            report.failed,
+        )
+    return report
+
+
+class AgentRunScheduler:
+    """Start queued agent runs within global and per-project limits.
+
+    Call wake() after queueing a run. Each started run executes in its own
+    asyncio task and DB session; finishing a run wakes the scheduler so
+    the next queued run can take the freed slot. While serving, it also
+    renews the leases of its own runs and reclaims expired ones.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = AGENT_MAX_CONCURRENT_RUNS,
+        max_per_project: int = AGENT_MAX_RUNS_PER_PROJECT,
+        poll_interval: float = AGENT_SCHEDULER_POLL_INTERVAL,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        lease_seconds: float = AGENT_RUN_LEASE_SECONDS,
+        max_attempts: int = AGENT_RUN_MAX_ATTEMPTS,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_project = max(1, max_per_project)
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._leases_checked = time.monotonic()
+        self._active: dict[str, asyncio.Task[None]] = {}
+        self._waiters: dict[str, list[asyncio.Event]] = {}
+        self._wake = asyncio.Event()
+        self._loop: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        """Begin serving the queue (including runs left PENDING earlier)."""
+        if self._loop is None:
+            self._loop = asyncio.create_task(self._serve())
+
+    async def stop(self) -> None:
+        """Stop serving the queue. Runs already started keep going."""
+        if self._loop is not None:
+            self._loop.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._loop
+            self._loop = None
+
+    def wake(self) -> None:
+        """Re-check the queue now (after queueing or finishing a run)."""
+        self._wake.set()
+
+    async def wait_for(self, run_id: str, timeout: float | None = None) -> AgentResult:
+        """Wait until a run has finished, in this or any other worker.
+
+        The run's status is read from the database every poll_interval;
+        runs finishing in this process wake the waiter immediately.
+
+        Raises:
+            TimeoutError: If the run has not finished within timeout seconds.
+        """
+        finished = asyncio.Event()
+        waiters = self._waiters.setdefault(run_id, [])
+        waiters.append(finished)
+        try:
+            async with asyncio.timeout(timeout):
+                while True:
+                    finished.clear()
+                    async with self.session_factory() as db:
+                        row = (
+                            await db.execute(
+                                select(AgentRun.status, AgentRun.error_message).where(
+                                    AgentRun.id == run_id
+                                )
+                            )
+                        ).one_or_none()
+                    if row is None:
+                        return AgentResult(
+                            status=AgentRunStatus.FAILED, error="Run no longer exists"
+                        )
+                    if row.status in FINISHED_STATUSES:
+                        return AgentResult(status=row.status, error=row.error_message)
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(finished.wait(), self.poll_interval)
+        finally:
+            waiters.remove(finished)
+            if not waiters:
+                self._waiters.pop(run_id, None)
+
+    async def recover(self) -> RecoveryReport:
+        """Reclaim runs with expired leases, then re-check the queue."""
+        async with self.session_factory() as db:
+            report = await recover_orphaned_runs(
+                db, self.lease_seconds, self.max_attempts
+            )
+        self._leases_checked = time.monotonic()
+        if report.requeued:
+            self.wake()
+        return report
+
+    async def cancel(self, run_id: str, timeout: float = AGENT_CANCEL_TIMEOUT) -> bool:
+        """Cancel a run executing in this process and wait for it to stop.
+
+        Returns:
+            False if the run is not executing in this process.
+        """
+        task = self._active.get(run_id)
+        if task is None:
+            return False
+        task.cancel()
+        await asyncio.wait({task}, timeout=timeout)
+        return True
+
+    async def renew_leases(self) -> None:
+        """Refresh heartbeat_at of the runs executing in this process.
+
+        Runs that another worker marked CANCELLED are cancelled here.
+        """
+        if not self._active:
+            return
+        async with self.session_factory() as db:
+            await db.execute(
+                update(AgentRun)
+                .where(
+                    AgentRun.id.in_(list(self._active)),
+                    AgentRun.status == AgentRunStatus.RUNNING,
+                )
+                # Setting version to itself skips the onupdate bump, so
+                # heartbeats do not invalidate ETags
+                .values(
+                    heartbeat_at=datetime.now(timezone.utc),
+                    version=AgentRun.version,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            result = await db.execute(
+                select(AgentRun.id).where(
+                    AgentRun.id.in_(list(self._active)),
+                    AgentRun.status == AgentRunStatus.CANCELLED,
+                )
+            )
+            cancelled = list(result.scalars())
+        for run_id in cancelled:
+            if task := self._active.get(run_id):
+                task.cancel()
+
+    @property
+    def active_runs(self) -> list[str]:
+        """IDs of runs executing in this process."""
+        return list(self._active)
+
+    async def _serve(self) -> None:
+        """Dispatch whenever woken, or every poll_interval."""
+        while True:
+            self._wake.clear()
+            try:
+                if time.monotonic() - self._leases_checked >= self.lease_seconds / 3:
+                    await self.renew_leases()
+                    await self.recover()
+                await self.dispatch()
+            except Exception:
+                logger.exception("Agent run dispatch failed")
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+
+    async def dispatch(self) -> list[str]:
+        """Claim and start queued runs while capacity allows.
+
+        Returns:
+            IDs of the runs started by this call.
+        """
+        started: list[str] = []
+        async with self.session_factory() as db:
+            running = await db.scalar(
+                select(func.count())
+                .select_from(AgentRun)
+                .where(AgentRun.status == AgentRunStatus.RUNNING)
+            )
+            if (running or 0) >= self.max_concurrent:
+                return started
+
+            result = await db.execute(
+                select(AgentRun.id, Task.project_id)
+                .join(Task, Task.id == AgentRun.task_id)
+                .where(AgentRun.status == AgentRunStatus.PENDING)
+                .order_by(*_QUEUE_ORDER)
+            )
+            for run_id, project_id in result.all():
+                if not await self._claim(db, run_id, project_id):
+                    continue  # Project full (or claimed elsewhere) - try next
+                started.append(run_id)
+                self._active[run_id] = asyncio.create_task(self._execute(run_id))
+                if (running or 0) + len(started) >= self.max_concurrent:
+                    break
+        return started
+
+    async def _claim(
+        self, db: AsyncSession, run_id: str, project_id: str | None
+    ) -> bool:
+        """Atomically move a run PENDING -> RUNNING if both limits allow."""
+        runs = aliased(AgentRun)
+        tasks = aliased(Task)
+        running_total = (
+            select(func.count())
+            .select_from(runs)
+            .where(runs.status == AgentRunStatus.RUNNING)
+            .scalar_subquery()
+        )
+        same_project = (
+            tasks.project_id.is_(None)
+            if project_id is None
+            else tasks.project_id == project_id
+        )
+        running_in_project = (
+            select(func.count())
+            .select_from(runs)
+            .join(tasks, tasks.id == runs.task_id)
+            .where(runs.status == AgentRunStatus.RUNNING, same_project)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(AgentRun)
+            .where(
+                AgentRun.id == run_id,
+                AgentRun.status == AgentRunStatus.PENDING,
+                running_total < self.max_concurrent,
+                running_in_project < self.max_per_project,
+            )
+            .values(
+                status=AgentRunStatus.RUNNING,
+                started_at=datetime.now(timezone.utc),
+                heartbeat_at=datetime.now(timezone.utc),
+                attempts=AgentRun.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def _execute(self, run_id: str) -> None:
+        """Run one claimed agent run in its own session."""
+        try:
+            async with self.session_factory() as db:
+                agent_run = await db.get(AgentRun, run_id)
+                task = await db.get(Task, agent_run.task_id) if agent_run else None
+                if agent_run is None or task is None:
+                    outcome = AgentResult(
+                        status=AgentRunStatus.FAILED, error="Task no longer exists"
+                    )
+                else:
+                    project = (
+                        await db.get(Project, task.project_id)
+                        if task.project_id
+                        else None
+                    )
+                    outcome = await execute_agent_run(db, agent_run, task, project)
+            # No-op if the executor already finalized the run; waiters
+            # watch the row, so it must not stay RUNNING
+            await self._mark_finished(run_id, outcome.status, outcome.error)
+        except asyncio.CancelledError:
+            # No-op if the executor already finalized the run
+            await self._mark_finished(run_id, AgentRunStatus.CANCELLED)
+            raise
+        except Exception as e:
+            logger.exception("Agent run %s crashed", run_id)
+            await self._mark_finished(run_id, AgentRunStatus.FAILED, str(e))
+        finally:
+            self._active.pop(run_id, None)
+            for finished in self._waiters.get(run_id, []):
+                finished.set()
+            self.wake()
+
+    async def _mark_finished(
+        self, run_id: str, status: AgentRunStatus, error: str | None = None
+    ) -> None:
+        """Finalize a run the executor did not finalize itself."""
+        async with self.session_factory() as db:
+            await db.execute(
+                update(AgentRun)
+                .where(
+                    AgentRun.id == run_id,
+                    AgentRun.status.in_(
+                        [AgentRunStatus.PENDING, AgentRunStatus.RUNNING]
+                    ),
+                )
+                .values(
+                    status=status,
+                    error_message=error,
+                    completed_at=datetime.now(timezone.utc),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+
+# Global scheduler instance
+agent_scheduler = AgentRunScheduler()
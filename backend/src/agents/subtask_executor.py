@@ -1,71 +1,199 @@
-"""Sequential subtask execution logic."""
+"""Dependency-aware subtask execution logic.
+
+Subtasks declare the sibling subtasks they wait for in `depends_on`. The
+executor runs every subtask whose dependencies are done, up to
+SUBTASK_MAX_PARALLEL at a time, each with its own database session.
+A subtask whose dependency did not finish as DONE is skipped (left as is)
+and the parent goes to NEEDS_REVIEW. Subtask runs are queued on the global
+agent scheduler, so they also count against its concurrency limits, and may
+execute in any worker process. A subtask run still unfinished after
+SUBTASK_RUN_TIMEOUT seconds, or whose caller is cancelled, is cancelled.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
+from collections.abc import Sequence
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.database import AsyncSessionLocal
 from src.models.agent_run import AgentRun, AgentRunStatus
 from src.models.task import Task, TaskStatus
 
-from .executor import _publish_task_update, execute_agent_run
+from .executor import _publish_task_update, stop_agent_run
+from .scheduler import agent_scheduler
 
 if TYPE_CHECKING:
-    from src.models.project import Project
+    from .types import AgentResult
 
+logger = logging.getLogger(__name__)
 
-async def execute_subtasks_sequentially(
+# Maximum number of subtasks of one parent running at the same time
+SUBTASK_MAX_PARALLEL = int(os.environ.get("SUBTASK_MAX_PARALLEL", "3"))
+# Queue wait plus run time per subtask; 0 waits indefinitely
+SUBTASK_RUN_TIMEOUT = float(os.environ.get("SUBTASK_RUN_TIMEOUT", "7200"))
+
+
+def build_subtask_graph(subtasks: Sequence[Task]) -> dict[str, set[str]]:
+    """Map each subtask ID to the sibling IDs it depends on.
+
+    Raises:
+        ValueError: If a dependency is not a sibling or the graph has a cycle.
+    """
+    ids = {subtask.id for subtask in subtasks}
+    graph: dict[str, set[str]] = {}
+    for subtask in subtasks:
+        deps = set(subtask.depends_on or [])
+        unknown = deps - ids
+        if unknown:
+            raise ValueError(
+                f"Subtask {subtask.id} depends on unknown tasks: "
+                f"{', '.join(sorted(unknown))}"
+            )
+        graph[subtask.id] = deps
+
+    # Kahn's algorithm: every node must eventually have no pending deps
+    pending = {task_id: set(deps) for task_id, deps in graph.items()}
+    ready = [task_id for task_id, deps in pending.items() if not deps]
+    resolved = 0
+    while ready:
+        task_id = ready.pop()
+        resolved += 1
+        for other, deps in pending.items():
+            if task_id in deps:
+                deps.discard(task_id)
+                if not deps:
+                    ready.append(other)
+    if resolved != len(graph):
+        raise ValueError("Subtask dependencies contain a cycle")
+    return graph
+
+
+async def _cancel_run(
+    session_factory: async_sessionmaker[AsyncSession], run_id: str
+) -> None:
+    """Stop a subtask run nobody waits for any more (queued or running)."""
+    async with session_factory() as db:
+        agent_run = await db.get(AgentRun, run_id)
+        if agent_run is not None and agent_run.status in (
+            AgentRunStatus.PENDING,
+            AgentRunStatus.RUNNING,
+        ):
+            await stop_agent_run(db, agent_run)
+
+
+async def _run_subtask(
+    session_factory: async_sessionmaker[AsyncSession],
+    subtask_id: str,
+    timeout: float | None,
+) -> AgentResult:
+    """Queue a run for one subtask and wait until a scheduler has executed it.
+
+    Raises:
+        TimeoutError: If the run did not finish in time (it is cancelled).
+    """
+    run_id = str(uuid4())
+    async with session_factory() as db:
+        db.add(
+            AgentRun(
+                id=run_id,
+                task_id=subtask_id,
+                status=AgentRunStatus.PENDING,
+                queued_at=datetime.now(timezone.utc),
+            )
+        )
+        await db.commit()
+    agent_scheduler.wake()
+    try:
+        return await agent_scheduler.wait_for(run_id, timeout)
+    except (TimeoutError, asyncio.CancelledError):
+        await _cancel_run(session_factory, run_id)
+        raise
+
+
+async def execute_subtasks(
     db: AsyncSession,
     parent_task: Task,
-    project: Project | None,
+    max_parallel: int = SUBTASK_MAX_PARALLEL,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    run_timeout: float = SUBTASK_RUN_TIMEOUT,
 ) -> None:
-    """Execute all subtasks of a parent task one by one.
+    """Execute the subtasks of a parent task in dependency order.
+
+    Independent subtasks run concurrently (up to max_parallel). Subtasks
+    already DONE are not re-run and count as satisfied dependencies. A
+    subtask whose run takes longer than run_timeout (0 = no limit) counts
+    as failed. Called after user approves the plan.
 
-    Called after user approves the plan.
+    Raises:
+        ValueError: If the dependency graph is invalid (nothing is run).
     """
     # Fetch all subtasks
     result = await db.execute(
         select(Task)
         .where(Task.parent_id == parent_task.id)
-        .order_by(Task.created_at.asc())
+        .order_by(Task.created_at.asc(), Task.id.asc())
     )
     subtasks = list(result.scalars().all())
 
     if not subtasks:
         return
 
+    graph = build_subtask_graph(subtasks)
+    already_done = {t.id for t in subtasks if t.status == TaskStatus.DONE}
+
     # Update parent to IN_PROGRESS
     parent_task.status = TaskStatus.IN_PROGRESS
     await db.commit()
     await _publish_task_update(parent_task)
 
-    # Execute each subtask
-    for subtask in subtasks:
-        # Create agent run for this subtask
-        agent_run = AgentRun(
-            id=str(uuid4()),
-            task_id=subtask.id,
-            status=AgentRunStatus.PENDING,
-        )
-        db.add(agent_run)
-        await db.commit()
-        await db.refresh(agent_run)
-
-        # Execute the subtask
-        await execute_agent_run(db, agent_run, subtask, project)
-
-        # Refresh subtask to get updated status
-        await db.refresh(subtask)
-
-    # Check if all subtasks completed successfully
-    result = await db.execute(select(Task).where(Task.parent_id == parent_task.id))
-    all_subtasks = list(result.scalars().all())
-    all_done = all(t.status == TaskStatus.DONE for t in all_subtasks)
+    limit = asyncio.Semaphore(max(1, max_parallel))
+    runs: dict[str, asyncio.Task[bool]] = {}
+
+    async def run(subtask_id: str) -> bool:
+        """Wait for dependencies, then execute; True if the subtask is done."""
+        if subtask_id in already_done:
+            return True
+        for dep in graph[subtask_id]:
+            if not await runs[dep]:
+                logger.info("Skipping subtask %s: dependency %s", subtask_id, dep)
+                return False
+        async with limit:
+            try:
+                outcome = await _run_subtask(
+                    session_factory, subtask_id, run_timeout or None
+                )
+            except Exception:
+                # Keep siblings running; the parent ends up in NEEDS_REVIEW
+                logger.exception("Subtask %s failed", subtask_id)
+                return False
+        return outcome.status == AgentRunStatus.COMPLETED
+
+    # Tasks are created in creation order, so the semaphore admits ready
+    # subtasks first-come first-served
+    async with asyncio.TaskGroup() as group:
+        for subtask in subtasks:
+            runs[subtask.id] = group.create_task(run(subtask.id))
+
+    # Read statuses as columns - subtasks were updated by other sessions
+    result = await db.execute(
+        select(Task.status).where(Task.parent_id == parent_task.id)
+    )
+    all_done = all(status == TaskStatus.DONE for status in result.scalars())
 
     # Update parent status
     parent_task.status = TaskStatus.DONE if all_done else TaskStatus.NEEDS_REVIEW
     await db.commit()
     await _publish_task_update(parent_task)
+
+
+async def execute_subtasks_sequentially(db: AsyncSession, parent_task: Task) -> None:
+    """Execute all subtasks of a parent task one by one (in dependency order)."""
+    await execute_subtasks(db, parent_task, max_parallel=1)
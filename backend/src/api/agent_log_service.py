@@ -0,0 +1,87 @@
+"""Append-only persistence for agent run logs.
+
+Log entries are written in batches (one transaction per flush of the
+AgentLogBatcher) on their own session, so they never interfere with the
+session driving the agent run.
+
+Functions:
+    append_run_logs: Insert a batch of log entries for a run
+    get_run_logs: Read a page of log entries after a cursor
+"""
+
+import logging
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database import AsyncSessionLocal
+from src.models.agent_run_log import AgentRunLog
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_timestamp(value: str | None) -> datetime:
+    """Parse an ISO timestamp from a log entry (now if missing/invalid)."""
+    if value:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc)
+
+
+async def append_run_logs(
+    agent_run_id: str,
+    entries: Sequence[dict[str, Any]],
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> bool:
+    """Persist log entries for a run in a single transaction.
+
+    Failures are logged, not raised - losing log history must not fail
+    the agent run itself.
+
+    Returns:
+        True if the entries were written.
+    """
+    if not entries:
+        return True
+
+    rows = [
+        {
+            "agent_run_id": agent_run_id,
+            "timestamp": _parse_timestamp(entry.get("timestamp")),
+            "type": entry.get("type", ""),
+            "content": entry.get("content", ""),
+        }
+        for entry in entries
+    ]
+    try:
+        async with session_factory() as db:
+            await db.execute(insert(AgentRunLog), rows)
+            await db.commit()
+    except SQLAlchemyError:
+        logger.exception(
+            "Failed to persist %d logs for run %s", len(rows), agent_run_id
+        )
+        return False
+    return True
+
+
+async def get_run_logs(
+    db: AsyncSession,
+    agent_run_id: str,
+    after: int = 0,
+    limit: int = 200,
+) -> list[AgentRunLog]:
+    """Get log entries of a run with id greater than `after`, oldest first."""
+    result = await db.execute(
+        select(AgentRunLog)
+        .where(AgentRunLog.agent_run_id == agent_run_id, AgentRunLog.id > after)
+        .order_by(AgentRunLog.id.asc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
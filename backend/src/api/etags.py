@@ -0,0 +1,75 @@
+"""Strong ETags and If-None-Match handling for read endpoints.
+
+Every Task, Project and AgentRun row carries a `version` that the database
+bumps on each UPDATE. A single entity's ETag is derived from its id and
+version; a collection's ETag hashes the (id, version) pairs of its rows
+together with the query string, so inserts, updates, deletes and different
+projections all change it.
+
+Endpoints compute the ETag from a narrow (id, version) query first and
+answer 304 Not Modified before loading or serializing full rows. A 200
+response takes its ETag from the rows it actually returns, so a write
+between the two reads cannot pair a body with another version's ETag.
+
+Functions:
+    entity_version: Current version of a row (None if missing)
+    collection_versions: (id, version) pairs of a list query
+    entity_etag: ETag of a single row
+    collection_etag: ETag of an ordered list of rows
+    etag_matches: Check an If-None-Match header against an ETag
+    not_modified: Build a 304 response
+"""
+
+import hashlib
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import Request, Response, status
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def entity_version(db: AsyncSession, model: Any, entity_id: str) -> int | None:
+    """Read only the version of a row."""
+    return await db.scalar(select(model.version).where(model.id == entity_id))
+
+
+async def collection_versions(
+    db: AsyncSession, query: Select[Any], model: Any
+) -> list[tuple[str, int]]:
+    """Run a list query narrowed to (id, version), keeping filters and order."""
+    result = await db.execute(query.with_only_columns(model.id, model.version))
+    return [(row[0], row[1]) for row in result]
+
+
+def entity_etag(entity_id: str, version: int | str) -> str:
+    """ETag of a single entity."""
+    return f'"{entity_id}.{version}"'
+
+
+def collection_etag(rows: Iterable[tuple[str, int | str]], request: Request) -> str:
+    """ETag of a list response from its rows and the request's query."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(sorted(request.query_params.multi_items())).encode())
+    for entity_id, version in rows:
+        digest.update(f"|{entity_id}.{version}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match matches the ETag (weak comparison, RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    """304 response carrying the current ETag (plus any extra headers)."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={**(headers or {}), "ETag": etag},
+    )
@@ -0,0 +1,214 @@
+"""Pluggable transports that share the event bus across worker processes.
+
+The default bus is in-memory and only reaches SSE clients connected to the
+same process. With `uvicorn --workers N` each worker has its own bus, so
+events must travel through a shared backend instead.
+
+Backends:
+    EventBackend: Interface - assigns global event ids and delivers events
+    SQLiteEventBackend: Shared SQLite file polled by every worker
+
+Configure via EVENT_BUS_URL:
+    memory                      - In-process only (default)
+    sqlite:///./kanban-events.db - Shared across processes on one host
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from pathlib import Path
+
+from src.api.events import EventType, TaskEvent
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUS_URL = os.environ.get("EVENT_BUS_URL", "memory")
+
+Deliver = Callable[[TaskEvent], None]
+
+
+class EventBackend(ABC):
+    """Transport between EventBus instances.
+
+    publish() hands an event to the transport; the backend later calls
+    the deliver callback - in id order - for every event published by
+    any process, including this one.
+    """
+
+    @abstractmethod
+    async def start(self, deliver: Deliver, backfill: int = 0) -> int:
+        """Begin delivering events. Returns the id of the latest event.
+
+        Up to backfill already published events are delivered first, so a
+        fresh bus can replay what happened before it started.
+        """
+
+    @abstractmethod
+    async def publish(self, event: TaskEvent) -> None:
+        """Send an event to all processes sharing this backend."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop delivering and release resources."""
+
+
+class SQLiteEventBackend(EventBackend):
+    """Event log in a shared SQLite file, tailed by each worker.
+
+    Rows get AUTOINCREMENT ids, which double as globally ordered SSE event
+    ids. Each worker polls for rows past the last id it delivered and is
+    woken immediately after its own publishes. Old rows are pruned so the
+    file stays bounded.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        poll_interval: float = 0.05,
+        retain: int = 10_000,
+    ) -> None:
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.retain = retain
+        self._writer: sqlite3.Connection | None = None
+        self._reader: sqlite3.Connection | None = None
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._last_id = 0
+        self._wake = asyncio.Event()
+        self._poller: asyncio.Task[None] | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection usable from worker threads."""
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _open(self) -> int:
+        """Create the schema and return the current head id."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = self._connect()
+        self._reader = self._connect()
+        with self._writer:
+            self._writer.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " event_type TEXT NOT NULL,"
+                " data TEXT NOT NULL)"
+            )
+        row = self._reader.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+        return int(row[0])
+
+    def _insert(self, event_type: str, data: str) -> None:
+        """Append one event row, pruning old rows periodically."""
+        with self._write_lock:
+            writer = self._writer
+            if writer is None:
+                raise RuntimeError("Event backend is not started")
+            with writer:
+                cursor = writer.execute(
+                    "INSERT INTO events (event_type, data) VALUES (?, ?)",
+                    (event_type, data),
+                )
+                event_id = cursor.lastrowid or 0
+                if event_id % 1000 == 0:
+                    writer.execute(
+                        "DELETE FROM events WHERE id <= ?", (event_id - self.retain,)
+                    )
+
+    def _fetch(self, after: int) -> list[tuple[int, str, str]]:
+        """Read rows newer than the given id, oldest first."""
+        with self._read_lock:
+            if self._reader is None:  # Closed while this thread was queued
+                return []
+            return self._reader.execute(
+                "SELECT id, event_type, data FROM events WHERE id > ? ORDER BY id",
+                (after,),
+            ).fetchall()
+
+    async def start(self, deliver: Deliver, backfill: int = 0) -> int:
+        """Open the shared file, replay the last rows and tail new events."""
+        head = await asyncio.to_thread(self._open)
+        self._last_id = max(head - backfill, 0)
+        if backfill > 0:
+            self._deliver_rows(
+                deliver, await asyncio.to_thread(self._fetch, self._last_id)
+            )
+        self._last_id = max(self._last_id, head)
+        self._poller = asyncio.create_task(self._poll(deliver))
+        return self._last_id
+
+    async def publish(self, event: TaskEvent) -> None:
+        """Append the event to the shared log and wake the local poller."""
+        await asyncio.to_thread(
+            self._insert, event.event_type, json.dumps(event.data, default=str)
+        )
+        self._wake.set()
+
+    async def _poll(self, deliver: Deliver) -> None:
+        """Deliver new rows in id order until cancelled."""
+        while True:
+            self._wake.clear()
+            try:
+                rows = await asyncio.to_thread(self._fetch, self._last_id)
+            except sqlite3.Error:
+                logger.exception("Event bus poll failed: %s", self.path)
+                rows = []
+            self._deliver_rows(deliver, rows)
+            if rows:
+                continue
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+
+    def _deliver_rows(self, deliver: Deliver, rows: list[tuple[int, str, str]]) -> None:
+        """Turn fetched rows into id-stamped events, in order."""
+        for event_id, event_type, data in rows:
+            self._last_id = event_id
+            deliver(
+                TaskEvent(
+                    event_type=EventType(event_type),
+                    data=json.loads(data),
+                    event_id=event_id,
+                )
+            )
+
+    def _close(self) -> None:
+        """Close both connections once no thread is using them."""
+        # A cancelled to_thread call keeps running; closing a connection
+        # under an executing statement crashes the interpreter
+        with self._write_lock, self._read_lock:
+            for conn in (self._writer, self._reader):
+                if conn is not None:
+                    conn.close()
+            self._writer = self._reader = None
+
+    async def stop(self) -> None:
+        """Cancel the poller and close both connections."""
+        if self._poller is not None:
+            self._poller.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._poller
+            self._poller = None
+        await asyncio.to_thread(self._close)
+
+
+def create_backend(url: str = EVENT_BUS_URL) -> EventBackend | None:
+    """Build the backend for a bus URL (None = in-memory bus).
+
+    Raises:
+        ValueError: If the URL scheme is not supported.
+    """
+    if url in ("", "memory"):
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteEventBackend(url.removeprefix("sqlite:///"))
+    raise ValueError(f"Unsupported EVENT_BUS_URL: {url}")
@@ -1,11 +1,31 @@
 """SSE event system for real-time task updates."""
 
+from __future__ import annotations
+
 import asyncio
 import json
+import os
+import time
+from collections import deque
 from collections.abc import AsyncGenerator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import StrEnum
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional fast JSON backend
+    orjson = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from src.api.event_backends import EventBackend
+
+# Per-subscriber queue bound (0 = unbounded) and default overflow policy
+EVENT_QUEUE_SIZE = int(os.environ.get("EVENT_QUEUE_SIZE", "1000"))
+EVENT_OVERFLOW_POLICY = os.environ.get("EVENT_OVERFLOW_POLICY", "drop_oldest")
+
+# Number of recent events kept for Last-Event-ID replay
+EVENT_REPLAY_SIZE = int(os.environ.get("EVENT_REPLAY_SIZE", "2000"))
 
 
 class EventType(StrEnum):
@@ -14,8 +34,38 @@ class EventType(StrEnum):
     TASK_CREATED = "task_created"
     TASK_UPDATED = "task_updated"
     TASK_DELETED = "task_deleted"
+    TASKS_BATCH = "tasks_batch"  # Bulk create/update/delete in one event
     AGENT_LOG = "agent_log"
+    AGENT_LOG_BATCH = "agent_log_batch"
     HEARTBEAT = "heartbeat"
+    RESYNC = "resync"  # Replay gap unrecoverable - client must refetch
+
+
+class OverflowPolicy(StrEnum):
+    """What to do when a subscriber queue is full.
+
+    DROP_OLDEST: Discard the oldest queued event to make room
+    COALESCE: Replace a queued event for the same entity, else drop oldest
+    DISCONNECT: Drop the slow subscriber entirely
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+# Event types where only the latest state per entity matters
+_COALESCABLE = frozenset({EventType.TASK_UPDATED})
+
+
+def _dumps(data: dict[str, Any]) -> bytes:
+    """Serialize event data to JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+HEARTBEAT_FRAME = b"event: heartbeat\ndata: {}\n\n"
 
 
 @dataclass
@@ -24,29 +74,355 @@ class TaskEvent:
 
     event_type: EventType
     data: dict[str, Any]
+    event_id: int | None = field(default=None, compare=False)
+    _frame: bytes | None = field(default=None, init=False, repr=False, compare=False)
+
+    def encode(self) -> bytes:
+        """Return the SSE frame for this event.
+
+        Serialized on first call and cached, so every subscriber shares
+        the same immutable bytes instead of re-encoding the payload.
+        """
+        if self._frame is None:
+            event_id = f"id: {self.event_id}\n" if self.event_id is not None else ""
+            self._frame = (
+                f"{event_id}event: {self.event_type}\ndata: ".encode()
+                + _dumps(self.data)
+                + b"\n\n"
+            )
+        return self._frame
+
+
+# Index key matching every event (subscribers without a selective filter)
+_ALL: tuple[str, str] = ("*", "*")
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """Subscription filter; all given criteria must match (None = any)."""
+
+    project_id: str | None = None
+    task_id: str | None = None
+    agent_run_id: str | None = None
+    event_types: frozenset[EventType] | None = None
+
+    def index_keys(self) -> list[tuple[str, str]]:
+        """Topics to index this filter under (its most selective criterion)."""
+        if self.agent_run_id:
+            return [("run", self.agent_run_id)]
+        if self.task_id:
+            return [("task", self.task_id)]
+        if self.project_id:
+            return [("project", self.project_id)]
+        if self.event_types:
+            return [("type", t) for t in self.event_types]
+        return [_ALL]
+
+    def matches(self, event: TaskEvent) -> bool:
+        """Check whether an event satisfies every criterion of this filter.
+
+        A tasks_batch event matches if any task in the batch does.
+        """
+        data = event.data
+        if self.event_types and event.event_type not in self.event_types:
+            return False
+        if self.project_id and self.project_id not in _project_ids(event):
+            return False
+        if self.task_id and self.task_id not in _task_ids(event):
+            return False
+        if self.agent_run_id and data.get("agent_run_id") != self.agent_run_id:
+            return False
+        return True
+
+
+def _payloads(event: TaskEvent) -> list[dict[str, Any]]:
+    """Per-task payloads of an event (each entry of a tasks_batch)."""
+    data = event.data
+    if event.event_type == EventType.TASKS_BATCH:
+        return [*data["created"], *data["updated"], *data["deleted"]]
+    return [data]
+
+
+def _task_ids(event: TaskEvent) -> set[str]:
+    """Task IDs an event concerns (the task itself or its parent)."""
+    ids: set[str | None] = set()
+    for data in _payloads(event):
+        ids.update((data.get("task_id"), data.get("parent_id")))
+        if event.event_type not in (EventType.AGENT_LOG, EventType.AGENT_LOG_BATCH):
+            ids.add(data.get("id"))
+    ids.discard(None)
+    return ids  # type: ignore[return-value]
+
+
+def _project_ids(event: TaskEvent) -> set[str | None]:
+    """Project IDs an event concerns."""
+    return {data.get("project_id") for data in _payloads(event)}
+
+
+def _event_topics(event: TaskEvent) -> list[tuple[str, str]]:
+    """Topics an event is published under, used to look up subscribers."""
+    topics = [_ALL, ("type", event.event_type)]
+    topics.extend(("task", task_id) for task_id in _task_ids(event))
+    topics.extend(
+        ("project", project_id)
+        for project_id in _project_ids(event)
+        if project_id is not None
+    )
+    if agent_run_id := event.data.get("agent_run_id"):
+        topics.append(("run", agent_run_id))
+    return topics
+
+
+def _coalesce_key(event: TaskEvent) -> tuple[str, Any] | None:
+    """Return the entity key an event may be coalesced under (None = never)."""
+    if event.event_type in _COALESCABLE and "id" in event.data:
+        return (event.event_type, event.data["id"])
+    return None
+
+
+class SubscriberQueue(asyncio.Queue[TaskEvent]):
+    """Bounded subscriber queue that never blocks the publisher.
+
+    Tracks backpressure counters so slow consumers can be observed.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        policy: OverflowPolicy,
+        event_filter: EventFilter | None = None,
+    ) -> None:
+        super().__init__(maxsize=maxsize)
+        self.policy = policy
+        self.filter = event_filter or EventFilter()
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def offer(self, event: TaskEvent) -> bool:
+        """Enqueue event without waiting, applying the overflow policy.
+
+        Returns False if the subscriber should be disconnected.
+        """
+        if self.closed:
+            return False
+
+        if self.full():
+            if self.policy == OverflowPolicy.DISCONNECT:
+                self.close()
+                return False
+            if self.policy == OverflowPolicy.COALESCE and self._replace(event):
+                self.coalesced += 1
+                return True
+            self.get_nowait()
+            self.dropped += 1
+
+        self.put_nowait(event)
+        self.delivered += 1
+        self.max_depth = max(self.max_depth, self.qsize())
+        return True
+
+    def _replace(self, event: TaskEvent) -> bool:
+        """Overwrite a queued event for the same entity in place."""
+        key = _coalesce_key(event)
+        if key is None:
+            return False
+        for index, queued in enumerate(self._queue):  # type: ignore[attr-defined]
+            if _coalesce_key(queued) == key:
+                self._queue[index] = event  # type: ignore[attr-defined]
+                return True
+        return False
+
+    def close(self) -> None:
+        """Mark queue closed and release any buffered events."""
+        self.closed = True
+        self.dropped += self.qsize()
+        while not self.empty():
+            self.get_nowait()
+
+    def stats(self) -> dict[str, Any]:
+        """Backpressure counters for this subscriber."""
+        return {
+            "policy": self.policy,
+            "maxsize": self.maxsize,
+            "depth": self.qsize(),
+            "max_depth": self.max_depth,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "closed": self.closed,
+            "filter": {
+                "project_id": self.filter.project_id,
+                "task_id": self.filter.task_id,
+                "agent_run_id": self.filter.agent_run_id,
+                "event_types": sorted(self.filter.event_types or []),
+            },
+        }
 
 
 class EventBus:
-    """Simple pub/sub event bus for SSE broadcasting."""
+    """Simple pub/sub event bus for SSE broadcasting.
+
+    Each subscriber gets its own bounded queue. Publishing never waits on
+    a slow consumer - overflow is handled per OverflowPolicy instead.
 
-    def __init__(self) -> None:
-        self._queues: list[asyncio.Queue[TaskEvent]] = []
+    Subscribers are indexed by topic (run, task, project, event type), so
+    publishing only visits queues whose filter could match the event.
 
-    def subscribe(self) -> asyncio.Queue[TaskEvent]:
-        """Create a new subscriber queue."""
-        queue: asyncio.Queue[TaskEvent] = asyncio.Queue()
+    Every published event gets a monotonically increasing id and is kept
+    in a bounded replay buffer, so reconnecting clients can resume from
+    their Last-Event-ID instead of refetching the whole board.
+
+    By default events stay in this process. After start() with an
+    EventBackend, publish() goes through the backend, which assigns ids
+    and delivers every event (from any worker process) back via _deliver.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = EVENT_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy | str = EVENT_OVERFLOW_POLICY,
+        replay_size: int = EVENT_REPLAY_SIZE,
+    ) -> None:
+        self._queues: list[SubscriberQueue] = []
+        self._index: dict[tuple[str, str], dict[SubscriberQueue, None]] = {}
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.disconnected = 0
+        self._replay: deque[TaskEvent] = deque(maxlen=replay_size)
+        # Seed ids from the clock so they keep increasing across restarts;
+        # a client holding an id from a previous process then sees a gap.
+        self._last_id = time.time_ns() // 1_000
+        self._backend: EventBackend | None = None
+
+    async def start(self, backend: EventBackend | None = None) -> None:
+        """Attach a cross-process backend (None keeps the in-memory bus)."""
+        if backend is None:
+            return
+        self._backend = backend
+        self._replay.clear()
+        # Backfill the replay buffer from the shared log, so ids issued
+        # before this worker started (or by other workers) stay resumable
+        self._last_id = await backend.start(
+            self._deliver, backfill=self._replay.maxlen or 0
+        )
+
+    async def stop(self) -> None:
+        """Detach and shut down the backend, if any."""
+        if self._backend is not None:
+            await self._backend.stop()
+            self._backend = None
+
+    def subscribe(
+        self,
+        max_size: int | None = None,
+        policy: OverflowPolicy | None = None,
+        event_filter: EventFilter | None = None,
+        last_event_id: int | None = None,
+    ) -> SubscriberQueue:
+        """Create a new subscriber queue (bus defaults unless overridden).
+
+        Without a filter the subscriber receives every event. With a
+        last_event_id, missed events are replayed into the queue first.
+        """
+        queue = SubscriberQueue(
+            maxsize=self.max_queue_size if max_size is None else max_size,
+            policy=policy or self.overflow_policy,
+            event_filter=event_filter,
+        )
+        if last_event_id is not None:
+            self._replay_into(queue, last_event_id)
         self._queues.append(queue)
+        for key in queue.filter.index_keys():
+            self._index.setdefault(key, {})[queue] = None
         return queue
 
+    def _replay_into(self, queue: SubscriberQueue, last_event_id: int) -> None:
+        """Queue buffered events after last_event_id, or a resync marker.
+
+        A resync is sent when the gap is no longer fully in the buffer
+        (too old, or the id comes from a previous process).
+        """
+        if last_event_id == self._last_id:
+            return
+
+        oldest = self._replay[0].event_id if self._replay else self._last_id + 1
+        missed = [
+            event
+            for event in self._replay
+            if event.event_id > last_event_id  # type: ignore[operator]
+            and queue.filter.matches(event)
+        ]
+        recoverable = oldest - 1 <= last_event_id < self._last_id  # type: ignore[operator]
+        if recoverable and (queue.maxsize <= 0 or len(missed) <= queue.maxsize):
+            for event in missed:
+                queue.offer(event)
+            return
+
+        queue.offer(
+            TaskEvent(
+                event_type=EventType.RESYNC,
+                data={"last_event_id": self._last_id},
+                event_id=self._last_id,
+            )
+        )
+
     def unsubscribe(self, queue: asyncio.Queue[TaskEvent]) -> None:
         """Remove a subscriber queue."""
-        if queue in self._queues:
-            self._queues.remove(queue)
+        if queue not in self._queues:
+            return
+        self._queues.remove(queue)  # type: ignore[arg-type]
+        for key in queue.filter.index_keys():  # type: ignore[attr-defined]
+            subscribers = self._index.get(key, {})
+            subscribers.pop(queue, None)  # type: ignore[call-overload]
+            if not subscribers:
+                self._index.pop(key, None)
+
+    def _candidates(self, event: TaskEvent) -> list[SubscriberQueue]:
+        """Subscribers whose filter matches the event, found via the index."""
+        found: dict[SubscriberQueue, None] = {}
+        for topic in _event_topics(event):
+            found.update(self._index.get(topic, {}))
+        return [queue for queue in found if queue.filter.matches(event)]
 
     async def publish(self, event: TaskEvent) -> None:
-        """Broadcast event to all subscribers."""
-        for queue in self._queues:
-            await queue.put(event)
+        """Broadcast event to all subscribers without blocking."""
+        if self._backend is not None:
+            await self._backend.publish(event)
+            return
+        event.event_id = self._last_id + 1
+        self._deliver(event)
+
+    def _deliver(self, event: TaskEvent) -> None:
+        """Fan an id-stamped event out to matching local subscribers.
+
+        The SSE frame is encoded once here and shared by every queue.
+        """
+        self._last_id = event.event_id  # type: ignore[assignment]
+        self._replay.append(event)
+
+        queues = self._candidates(event)
+        if queues:
+            event.encode()
+        for queue in queues:
+            if not queue.offer(event):
+                self.unsubscribe(queue)
+                self.disconnected += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Bus-wide and per-subscriber backpressure metrics."""
+        subscribers = [queue.stats() for queue in self._queues]
+        return {
+            "backend": type(self._backend).__name__ if self._backend else "memory",
+            "last_event_id": self._last_id,
+            "replay_buffered": len(self._replay),
+            "subscribers": len(subscribers),
+            "disconnected": self.disconnected,
+            "dropped": sum(s["dropped"] for s in subscribers),
+            "queues": subscribers,
+        }
 
 
 # Global event bus instance
@@ -54,15 +430,15 @@ event_bus = EventBus()
 
 
 async def event_generator(
-    queue: asyncio.Queue[TaskEvent],
-) -> AsyncGenerator[str, None]:
-    """Generate SSE events from queue with heartbeat."""
+    queue: SubscriberQueue,
+) -> AsyncGenerator[bytes, None]:
+    """Generate pre-encoded SSE frames from queue with heartbeat."""
     try:
-        while True:
+        while not queue.closed:
             try:
                 event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                yield f"event: {event.event_type}\ndata: {json.dumps(event.data)}\n\n"
+                yield event.encode()
             except asyncio.TimeoutError:
-                yield "event: heartbeat\ndata: {}\n\n"
+                yield HEARTBEAT_FRAME
     finally:
         event_bus.unsubscribe(queue)
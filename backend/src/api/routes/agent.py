@@ -1,24 +1,51 @@
 """Agent execution API endpoints."""
 
 import logging
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.agents.orchestrator import (
-    execute_agent_run,
-    execute_subtasks_sequentially,
+    build_subtask_graph,
+    execute_subtasks,
     plan_task_decomposition,
     stop_agent_run,
 )
-from src.api.schemas import AgentRunCreate, AgentRunResponse
+from src.agents.scheduler import agent_scheduler, queue_positions
+from src.api import agent_log_service
+from src.api.etags import (
+    collection_etag,
+    collection_versions,
+    entity_etag,
+    entity_version,
+    etag_matches,
+    not_modified,
+)
+from src.api.schemas import (
+    AgentRunCreate,
+    AgentRunLogPage,
+    AgentRunLogResponse,
+    AgentRunResponse,
+)
 from src.database import get_db
 from src.models.agent_run import AgentRun, AgentRunStatus
 from src.models.project import Project
 from src.models.task import Task
+from src.services.git import restore_checkpoint
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/agent", tags=["agent"])
@@ -42,26 +69,17 @@ async def _load_task_and_project(
     return task, project
 
 
-async def _run_agent_background(
-    agent_run_id: str,
-    task_id: str,
-    mcp_tools: list[str] | None,
-) -> None:
-    """Background task runner - continues an existing AgentRun."""
-    from src.database import AsyncSessionLocal
-
-    async with AsyncSessionLocal() as db:
-        result = await db.execute(select(AgentRun).where(AgentRun.id == agent_run_id))
-        agent_run = result.scalar_one_or_none()
-        if not agent_run:
-            return
+def _run_response(run: AgentRun, positions: dict[str, int]) -> AgentRunResponse:
+    """Serialize a run with its current queue position (if queued)."""
+    return AgentRunResponse.model_validate(run).model_copy(
+        update={"queue_position": positions.get(run.id)}
+    )
 
-        try:
-            task, project = await _load_task_and_project(task_id, db)
-        except ValueError:
-            return
 
-        await execute_agent_run(db, agent_run, task, project, mcp_tools)
+def _queued_version(run_id: str, version: int, positions: dict[str, int]) -> str:
+    """Version for ETags that also changes when a queued run moves up."""
+    position = positions.get(run_id)
+    return f"{version}" if position is None else f"{version}q{position}"
 
 
 @router.post(
@@ -69,12 +87,12 @@ async def _run_agent_background(
 )
 async def start_agent_run(
     run_data: AgentRunCreate,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ) -> AgentRunResponse:
-    """Start an agent run for a task.
+    """Queue an agent run for a task.
 
-    The agent runs in the background and streams progress via SSE.
+    The scheduler starts it once a global and a per-project slot are free
+    (higher priority first, then FIFO); progress streams via SSE.
     """
     # Fetch task
     result = await db.execute(select(Task).where(Task.id == run_data.task_id))
@@ -96,27 +114,22 @@ async def start_agent_run(
             status_code=409, detail="Task already has an active agent run"
         )
 
-    # Create AgentRun with PENDING status BEFORE background task
+    # The PENDING row is the queue entry; the scheduler claims it
     agent_run = AgentRun(
         id=str(uuid4()),
         task_id=task.id,
         status=AgentRunStatus.PENDING,
+        priority=run_data.priority,
+        queued_at=datetime.now(timezone.utc),
         started_at=None,  # Will be set when agent starts running
     )
     db.add(agent_run)
     await db.commit()
     await db.refresh(agent_run)
-
-    # Start background task with the real agent_run_id
-    background_tasks.add_task(
-        _run_agent_background,
-        agent_run.id,
-        task.id,
-        None,  # Executor decides from task config or registry defaults
-    )
+    agent_scheduler.wake()
 
     # Return real AgentRun (not placeholder!)
-    return AgentRunResponse.model_validate(agent_run)
+    return _run_response(agent_run, await queue_positions(db))
 
 
 @router.post("/stop/{run_id}", status_code=status.HTTP_200_OK)
@@ -124,16 +137,16 @@ async def stop_agent(
     run_id: str,
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, Any]:
-    """Stop a running agent."""
+    """Stop a running agent or cancel a queued run."""
     result = await db.execute(select(AgentRun).where(AgentRun.id == run_id))
     agent_run = result.scalar_one_or_none()
     if not agent_run:
         logger.warning("Agent run not found for stop: %s", run_id)
         raise HTTPException(status_code=404, detail="Agent run not found")
 
-    if agent_run.status != AgentRunStatus.RUNNING:
+    if agent_run.status not in (AgentRunStatus.PENDING, AgentRunStatus.RUNNING):
         logger.warning(
-            "Stop requested for non-running agent: %s (status: %s)",
+            "Stop requested for finished agent: %s (status: %s)",
             run_id,
             agent_run.status,
         )
@@ -145,11 +158,13 @@ async def stop_agent(
 
 @router.get("/runs", response_model=list[AgentRunResponse])
 async def list_agent_runs(
+    request: Request,
+    response: Response,
     task_id: str | None = None,
     status: AgentRunStatus | None = None,
     db: AsyncSession = Depends(get_db),
-) -> list[AgentRunResponse]:
-    """List agent runs with optional filters."""
+) -> list[AgentRunResponse] | Response:
+    """List agent runs with optional filters (304 if unchanged)."""
     query = select(AgentRun)
 
     if task_id:
@@ -158,24 +173,70 @@ async def list_agent_runs(
         query = query.where(AgentRun.status == status)
 
     query = query.order_by(AgentRun.started_at.desc())
+    positions = await queue_positions(db)
+    versions = await collection_versions(db, query, AgentRun)
+    etag = collection_etag(
+        [(run_id, _queued_version(run_id, v, positions)) for run_id, v in versions],
+        request,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     result = await db.execute(query)
     runs = result.scalars().all()
+    response.headers["ETag"] = collection_etag(
+        [(run.id, _queued_version(run.id, run.version, positions)) for run in runs],
+        request,
+    )
 
-    return [AgentRunResponse.model_validate(run) for run in runs]
+    return [_run_response(run, positions) for run in runs]
 
 
 @router.get("/runs/{run_id}", response_model=AgentRunResponse)
 async def get_agent_run(
     run_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-) -> AgentRunResponse:
-    """Get a specific agent run."""
+) -> AgentRunResponse | Response:
+    """Get a specific agent run (304 if If-None-Match still matches)."""
+    version = await entity_version(db, AgentRun, run_id)
+    if version is None:
+        logger.warning("Agent run not found: %s", run_id)
+        raise HTTPException(status_code=404, detail="Agent run not found")
+    positions = await queue_positions(db)
+    etag = entity_etag(run_id, _queued_version(run_id, version, positions))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     result = await db.execute(select(AgentRun).where(AgentRun.id == run_id))
     agent_run = result.scalar_one_or_none()
     if not agent_run:
-        logger.warning("Agent run not found: %s", run_id)
         raise HTTPException(status_code=404, detail="Agent run not found")
-    return AgentRunResponse.model_validate(agent_run)
+    response.headers["ETag"] = entity_etag(
+        agent_run.id, _queued_version(agent_run.id, agent_run.version, positions)
+    )
+    return _run_response(agent_run, positions)
+
+
+@router.get("/runs/{run_id}/logs", response_model=AgentRunLogPage)
+async def get_agent_run_logs(
+    run_id: str,
+    after: int = Query(0, ge=0, description="Return entries with id > after"),
+    limit: int = Query(200, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+) -> AgentRunLogPage:
+    """Get persisted log entries of an agent run, paginated by cursor."""
+    result = await db.execute(select(AgentRun.id).where(AgentRun.id == run_id))
+    if result.scalar_one_or_none() is None:
+        logger.warning("Agent run not found for logs: %s", run_id)
+        raise HTTPException(status_code=404, detail="Agent run not found")
+
+    logs = await agent_log_service.get_run_logs(db, run_id, after, limit)
+    return AgentRunLogPage(
+        entries=[AgentRunLogResponse.model_validate(log) for log in logs],
+        next_after=logs[-1].id if len(logs) == limit else None,
+    )
 
 
 # ─────────────────────────────────────────────────────────────
@@ -197,16 +258,15 @@ async def _plan_task_background(task_id: str) -> None:
 
 
 async def _execute_subtasks_background(task_id: str) -> None:
-    """Background task for sequential subtask execution."""
+    """Background task for dependency-ordered subtask execution."""
     from src.database import AsyncSessionLocal
 
     async with AsyncSessionLocal() as db:
         try:
-            task, project = await _load_task_and_project(task_id, db)
-        except ValueError:
-            return
-
-        await execute_subtasks_sequentially(db, task, project)
+            task, _ = await _load_task_and_project(task_id, db)
+            await execute_subtasks(db, task)
+        except ValueError as e:
+            logger.warning("Subtask execution aborted for %s: %s", task_id, e)
 
 
 @router.post("/plan/{task_id}", status_code=status.HTTP_202_ACCEPTED)
@@ -237,9 +297,11 @@ async def execute_task(
     background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, Any]:
-    """Execute all subtasks of a parent task sequentially.
+    """Execute all subtasks of a parent task, honouring depends_on.
 
     Called after user approves the plan (task in NEEDS_REVIEW status).
+    Independent subtasks run concurrently; invalid dependencies are
+    rejected with 400 before anything starts.
     """
     result = await db.execute(select(Task).where(Task.id == task_id))
     task = result.scalar_one_or_none()
@@ -247,7 +309,51 @@ async def execute_task(
         logger.warning("Task not found for execution: %s", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
 
+    result = await db.execute(select(Task).where(Task.parent_id == task_id))
+    try:
+        build_subtask_graph(list(result.scalars().all()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
     # Start background execution
     background_tasks.add_task(_execute_subtasks_background, task.id)
 
     return {"status": "execution_started", "task_id": task_id}
+
+
+@router.post("/restore/{task_id}", status_code=status.HTTP_200_OK)
+async def restore_task_checkpoint(
+    task_id: str,
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, Any]:
+    """Roll the project workspace back to the task's pre-run checkpoint.
+
+    Rejected with 409 while the task has a queued or running agent.
+    """
+    task = await db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    project = await db.get(Project, task.project_id) if task.project_id else None
+    if not project:
+        raise HTTPException(status_code=400, detail="Task has no project workspace")
+
+    result = await db.execute(
+        select(AgentRun.id).where(
+            AgentRun.task_id == task_id,
+            AgentRun.status.in_([AgentRunStatus.PENDING, AgentRunStatus.RUNNING]),
+        )
+    )
+    if result.first():
+        raise HTTPException(
+            status_code=409, detail="Task already has an active agent run"
+        )
+
+    try:
+        checkpoint = await restore_checkpoint(Path(project.workspace_path), task_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="No checkpoint for task")
+
+    logger.info("Restored task %s to checkpoint %s", task_id, checkpoint[:8])
+    return {"success": True, "task_id": task_id, "checkpoint": checkpoint}
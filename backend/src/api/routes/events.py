@@ -1,17 +1,53 @@
 """SSE endpoint for real-time task updates."""
 
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, Header, Query
 from fastapi.responses import StreamingResponse
 
-from src.api.events import event_bus, event_generator
+from src.api.events import EventFilter, EventType, event_bus, event_generator
 
 router = APIRouter(prefix="/api", tags=["events"])
 
 
+def _parse_event_id(value: str | None) -> int | None:
+    """Parse a client-supplied event id, ignoring malformed values."""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
 @router.get("/events")
-async def stream_events() -> StreamingResponse:
-    """Stream real-time task events via SSE."""
-    queue = event_bus.subscribe()
+async def stream_events(
+    project_id: str | None = None,
+    task_id: str | None = None,
+    agent_run_id: str | None = None,
+    types: list[EventType] | None = Query(None),
+    last_event_id: str | None = Query(None),
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """Stream real-time task events via SSE.
+
+    Optional filters narrow the stream to one project, task (including
+    its subtasks), agent run and/or set of event types.
+
+    Reconnecting clients send their last seen id (Last-Event-ID header,
+    or last_event_id query param for EventSource re-creation) and get
+    only the missed events, or a resync event if the gap was lost.
+    """
+    event_filter = EventFilter(
+        project_id=project_id,
+        task_id=task_id,
+        agent_run_id=agent_run_id,
+        event_types=frozenset(types) if types else None,
+    )
+    queue = event_bus.subscribe(
+        event_filter=event_filter,
+        last_event_id=_parse_event_id(last_event_id_header or last_event_id),
+    )
     return StreamingResponse(
         event_generator(queue),
         media_type="text/event-stream",
@@ -21,3 +57,9 @@ async def stream_events() -> StreamingResponse:
             "X-Accel-Buffering": "no",
         },
     )
+
+
+@router.get("/events/stats")
+async def event_stats() -> dict[str, Any]:
+    """Get subscriber queue depths and dropped-event counters."""
+    return event_bus.stats()
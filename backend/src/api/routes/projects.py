@@ -2,12 +2,22 @@
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api import project_service
+from src.api.etags import (
+    collection_etag,
+    collection_versions,
+    entity_etag,
+    entity_version,
+    etag_matches,
+    not_modified,
+)
 from src.api.schemas import ProjectCreate, ProjectResponse, ProjectUpdate
 from src.database import get_db
+from src.models.project import Project
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/projects", tags=["projects"])
@@ -24,22 +34,44 @@ async def create_project(
 
 
 @router.get("", response_model=list[ProjectResponse])
-async def list_projects(db: AsyncSession = Depends(get_db)) -> list[ProjectResponse]:
-    """Get all projects."""
+async def list_projects(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+) -> list[ProjectResponse] | Response:
+    """Get all projects (304 if If-None-Match still matches)."""
+    query = select(Project).order_by(Project.created_at.desc())
+    etag = collection_etag(await collection_versions(db, query, Project), request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     projects = await project_service.get_all_projects(db)
+    response.headers["ETag"] = collection_etag(
+        [(p.id, p.version) for p in projects], request
+    )
     return [ProjectResponse.model_validate(p) for p in projects]
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-) -> ProjectResponse:
-    """Get a single project by ID."""
+) -> ProjectResponse | Response:
+    """Get a single project by ID (304 if If-None-Match still matches)."""
+    version = await entity_version(db, Project, project_id)
+    if version is None:
+        logger.warning("Project not found: %s", project_id)
+        raise HTTPException(status_code=404, detail="Project not found")
+    etag = entity_etag(project_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     project = await project_service.get_project(db, project_id)
     if not project:
-        logger.warning("Project not found: %s", project_id)
         raise HTTPException(status_code=404, detail="Project not found")
+    response.headers["ETag"] = entity_etag(project.id, project.version)
     return ProjectResponse.model_validate(project)
 
 
@@ -6,6 +6,8 @@ from pathlib import Path
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from src.mcp_client import get_available_mcps, get_defaults, reload_mcp_registry
+
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
 # Settings file location
@@ -17,13 +19,21 @@ class GitSettings(BaseModel):
 
     auto_checkpoint: bool = True
     checkpoint_prefix: str = "checkpoint:"
+    # Run each agent in its own git worktree (safe parallel runs per project)
+    use_worktrees: bool = False
 
 
 class AgentSettings(BaseModel):
-    """Agent-related settings."""
+    """Agent-related settings.
+
+    max_turns, max_wall_seconds and max_tokens are the global per-run
+    budget; a task's own budget overrides them (None = unlimited).
+    """
 
     max_turns: int = 10
     model: str = "claude-sonnet-4-20250514"
+    max_wall_seconds: int | None = None
+    max_tokens: int | None = None
 
 
 class BackendSettings(BaseModel):
@@ -33,7 +43,7 @@ class BackendSettings(BaseModel):
     agent: AgentSettings = AgentSettings()
 
 
-def _load_settings() -> BackendSettings:
+def load_settings() -> BackendSettings:
     """Load settings from file or return defaults."""
     if SETTINGS_FILE.exists():
         try:
@@ -53,7 +63,7 @@ def _save_settings(settings: BackendSettings) -> None:
 @router.get("")
 def get_settings() -> BackendSettings:
     """Get current backend settings."""
-    return _load_settings()
+    return load_settings()
 
 
 @router.post("")
@@ -63,6 +73,13 @@ def save_settings(settings: BackendSettings) -> BackendSettings:
     return settings
 
 
+@router.post("/mcps/reload")
+def reload_mcps() -> dict:
+    """Re-read .kanban/mcps.yaml now instead of on its next change."""
+    reload_mcp_registry()
+    return {"mcp_options": get_available_mcps(), "defaults": get_defaults()}
+
+
 @router.get("/schema")
 def get_settings_schema() -> dict:
     """Returns MCP-relevant settings schema.
@@ -84,6 +101,13 @@ def get_settings_schema() -> dict:
                 "label": "Checkpoint Prefix",
                 "description": "Prefix für automatische Checkpoint-Commits",
             },
+            "use_worktrees": {
+                "type": "boolean",
+                "default": False,
+                "label": "Git Worktrees",
+                "description": "Jeder Agent-Run arbeitet in einem eigenen Git-Worktree; "
+                "Änderungen werden danach in den Workspace übernommen",
+            },
         },
         "agent": {
             "max_turns": {
@@ -104,5 +128,20 @@ def get_settings_schema() -> dict:
                 "label": "Agent Model",
                 "description": "Claude Model für Agent-Runs",
             },
+            "max_wall_seconds": {
+                "type": "number",
+                "default": None,
+                "min": 1,
+                "label": "Max Laufzeit (Sekunden)",
+                "description": "Maximale Laufzeit pro Agent-Run (leer = unbegrenzt)",
+            },
+            "max_tokens": {
+                "type": "number",
+                "default": None,
+                "min": 1,
+                "label": "Max Tokens",
+                "description": "Maximale Input- plus Output-Tokens pro Agent-Run "
+                "(leer = unbegrenzt)",
+            },
         },
     }
@@ -2,18 +2,45 @@
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api import task_service
-from src.api.schemas import TaskCreate, TaskResponse, TaskUpdate
+from src.api.etags import (
+    collection_etag,
+    entity_etag,
+    entity_version,
+    etag_matches,
+    not_modified,
+)
+from src.api.schemas import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskResponse,
+    TaskUpdate,
+)
 from src.database import get_db
-from src.models.task import Task
+from src.models.task import Task, TaskSource, TaskStatus, TaskType
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+# Header carrying the keyset cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
@@ -25,23 +52,149 @@ async def create_task(
     return TaskResponse.model_validate(task)
 
 
-@router.get("", response_model=list[TaskResponse])
-async def list_tasks(db: AsyncSession = Depends(get_db)) -> list[TaskResponse]:
-    """Get all tasks."""
-    tasks = await task_service.get_all_tasks(db)
+@router.post(
+    "/bulk",
+    response_model=list[TaskResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_tasks_bulk(
+    bulk: TaskBulkCreate,
+    db: AsyncSession = Depends(get_db),
+) -> list[TaskResponse]:
+    """Create many tasks in one transaction (one tasks_batch event)."""
+    tasks = await task_service.create_tasks(db, bulk.tasks)
     return [TaskResponse.model_validate(t) for t in tasks]
 
 
+@router.put("/bulk", response_model=list[TaskResponse])
+async def update_tasks_bulk(
+    bulk: TaskBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+) -> list[TaskResponse]:
+    """Update many tasks in one transaction; 404 if any is missing."""
+    try:
+        tasks = await task_service.update_tasks(db, bulk.tasks)
+    except ValueError as e:
+        logger.warning("Bulk update failed: %s", e)
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return [TaskResponse.model_validate(t) for t in tasks]
+
+
+@router.post("/bulk/delete", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_tasks_bulk(
+    bulk: TaskBulkDelete,
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """Delete many tasks in one transaction; 404 if any is missing."""
+    try:
+        await task_service.delete_tasks(db, bulk.ids)
+    except ValueError as e:
+        logger.warning("Bulk delete failed: %s", e)
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+
+@router.get("", response_model=list[TaskResponse])
+async def list_tasks(
+    request: Request,
+    response: Response,
+    project_id: str | None = None,
+    task_status: TaskStatus | None = Query(None, alias="status"),
+    task_type: TaskType | None = Query(None, alias="type"),
+    parent_id: str | None = None,
+    source: TaskSource | None = None,
+    cursor: str | None = Query(None, description="X-Next-Cursor of the last page"),
+    limit: int | None = Query(None, ge=1, le=500),
+    fields: str | None = Query(None, description="Comma-separated fields"),
+    db: AsyncSession = Depends(get_db),
+) -> list[TaskResponse] | JSONResponse:
+    """Get tasks, newest first.
+
+    Without limit all matching tasks are returned. With limit, the
+    X-Next-Cursor response header holds the cursor of the next page
+    (absent on the last page). fields= returns only the listed fields
+    (plus id), skipping heavy columns like result and steps.
+
+    Responses carry an ETag; a matching If-None-Match returns 304
+    without loading the full rows.
+    """
+    selected = None
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(selected) - set(TaskResponse.model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+
+    filters = {
+        column: value
+        for column, value in {
+            "project_id": project_id,
+            "status": task_status,
+            "type": task_type,
+            "parent_id": parent_id,
+            "source": source,
+        }.items()
+        if value is not None
+    }
+    try:
+        versions, next_cursor = await task_service.list_tasks(
+            db, filters=filters, after=cursor, limit=limit, fields=["version"]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    etag = collection_etag(((t.id, t.version) for t in versions), request)
+    if etag_matches(request, etag):
+        headers = {"ETag": etag}
+        if next_cursor is not None:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        return not_modified(etag, headers)
+
+    # Tasks may have changed since the version query: take the ETag and
+    # cursor from the rows actually returned
+    tasks, next_cursor = await task_service.list_tasks(
+        db,
+        filters=filters,
+        after=cursor,
+        limit=limit,
+        fields=None if selected is None else [*selected, "version"],
+    )
+    headers = {"ETag": collection_etag(((t.id, t.version) for t in tasks), request)}
+    if next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    if selected is None:
+        response.headers.update(headers)
+        return [TaskResponse.model_validate(t) for t in tasks]
+
+    # Partial objects cannot satisfy TaskResponse, so bypass the model
+    names = ["id", *(name for name in selected if name != "id")]
+    rows = [{name: getattr(t, name) for name in names} for t in tasks]
+    return JSONResponse(jsonable_encoder(rows), headers=headers)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-) -> TaskResponse:
-    """Get a single task by ID."""
+) -> TaskResponse | Response:
+    """Get a single task by ID (304 if If-None-Match still matches)."""
+    version = await entity_version(db, Task, task_id)
+    if version is None:
+        logger.warning("Task not found: %s", task_id)
+        raise HTTPException(status_code=404, detail="Task not found")
+    etag = entity_etag(task_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     task = await task_service.get_task(db, task_id)
     if not task:
-        logger.warning("Task not found: %s", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
+    response.headers["ETag"] = entity_etag(task.id, task.version)
     return TaskResponse.model_validate(task)
 
 
@@ -11,8 +11,8 @@ Design Principles:
 
 Schemas by domain:
 - Project: ProjectCreate, ProjectUpdate, ProjectResponse
-- Task: TaskCreate, TaskUpdate, TaskResponse
-- AgentRun: AgentRunCreate, AgentRunResponse
+- Task: TaskBudget, TaskCreate, TaskUpdate, TaskResponse
+- AgentRun: AgentRunCreate, AgentRunResponse, AgentRunLogResponse, AgentRunLogPage
 
 IMPORTANT: Keep these schemas in sync with:
 - Backend models: src/models/*.py
@@ -148,6 +148,18 @@ class TaskDecomposition(BaseModel):
 # ─────────────────────────────────────────────────────────────
 
 
+class TaskBudget(BaseModel):
+    """Per-task limits for agent runs; unset fields use the global settings."""
+
+    max_turns: int | None = Field(None, ge=1, description="Maximum agent turns per run")
+    max_wall_seconds: int | None = Field(
+        None, ge=1, description="Maximum wall-clock seconds per run"
+    )
+    max_tokens: int | None = Field(
+        None, ge=1, description="Maximum input plus output tokens per run"
+    )
+
+
 class TaskCreate(BaseModel):
     """Create a new task on the Kanban board.
 
@@ -206,6 +218,14 @@ class TaskCreate(BaseModel):
         None,
         description="Granular steps for this task (used in subtasks)",
     )
+    depends_on: list[str] | None = Field(
+        None,
+        description="UUIDs of sibling subtasks that must be done before this one",
+    )
+    budget: TaskBudget | None = Field(
+        None,
+        description="Run limits for this task (None = global agent settings)",
+    )
     # Delegation fields (Phase 11B)
     target_path: str | None = Field(
         None,
@@ -255,6 +275,14 @@ class TaskUpdate(BaseModel):
         None,
         description="Updated steps for this task",
     )
+    depends_on: list[str] | None = Field(
+        None,
+        description="Updated sibling subtask dependencies",
+    )
+    budget: TaskBudget | None = Field(
+        None,
+        description="Updated run limits",
+    )
     # Delegation fields (updatable, except source)
     target_path: str | None = Field(
         None,
@@ -303,6 +331,14 @@ class TaskResponse(BaseModel):
         default=None,
         description="Granular steps for this task (used in subtasks)",
     )
+    depends_on: list[str] | None = Field(
+        default=None,
+        description="Sibling subtasks that must be done before this one",
+    )
+    budget: TaskBudget | None = Field(
+        default=None,
+        description="Run limits for this task (None = global agent settings)",
+    )
     created_at: datetime = Field(description="Task creation timestamp (ISO 8601)")
     # Delegation fields (Phase 11B)
     sandbox_dir: str | None = Field(
@@ -331,6 +367,46 @@ class TaskResponse(BaseModel):
     )
 
 
+# Upper bound for one bulk request (one transaction, one SSE event)
+BULK_MAX_TASKS = 1000
+
+
+class TaskBulkCreate(BaseModel):
+    """Create many tasks in one transaction."""
+
+    tasks: list[TaskCreate] = Field(
+        min_length=1,
+        max_length=BULK_MAX_TASKS,
+        description="Tasks to create, in order",
+    )
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    """Partial update of one task within a bulk request."""
+
+    id: str = Field(description="UUID of the task to update")
+
+
+class TaskBulkUpdate(BaseModel):
+    """Update many tasks in one transaction."""
+
+    tasks: list[TaskBulkUpdateItem] = Field(
+        min_length=1,
+        max_length=BULK_MAX_TASKS,
+        description="Updates to apply; only provided fields are modified",
+    )
+
+
+class TaskBulkDelete(BaseModel):
+    """Delete many tasks in one transaction."""
+
+    ids: list[str] = Field(
+        min_length=1,
+        max_length=BULK_MAX_TASKS,
+        description="UUIDs of the tasks to delete",
+    )
+
+
 # ─────────────────────────────────────────────────────────────
 # Agent Run Schemas
 # ─────────────────────────────────────────────────────────────
@@ -347,12 +423,18 @@ class AgentRunCreate(BaseModel):
         description="UUID of the task to process",
         examples=["550e8400-e29b-41d4-a716-446655440000"],
     )
+    priority: int = Field(
+        0,
+        ge=-100,
+        le=100,
+        description="Queue priority; higher runs first, FIFO within a priority",
+    )
 
 
 class AgentRunResponse(BaseModel):
     """Agent run status and metadata returned by API endpoints.
 
-    Lifecycle: pending → running → completed/failed/cancelled
+    Lifecycle: pending (queued) → running → completed/failed/cancelled
     """
 
     model_config = ConfigDict(from_attributes=True)
@@ -373,6 +455,46 @@ class AgentRunResponse(BaseModel):
     completed_at: datetime | None = Field(
         description="Timestamp when run finished (any terminal state)"
     )
+    priority: int = Field(default=0, description="Queue priority (higher first)")
+    queue_position: int | None = Field(
+        default=None,
+        description="1-based position in the run queue while pending",
+    )
+    # Budget usage (recorded when the run finishes)
+    num_turns: int | None = Field(default=None, description="Agent turns used")
+    input_tokens: int | None = Field(
+        default=None, description="Input tokens used (incl. cache writes)"
+    )
+    output_tokens: int | None = Field(default=None, description="Output tokens used")
+    cost_usd: float | None = Field(default=None, description="Reported cost in USD")
+    budget_exceeded: str | None = Field(
+        default=None,
+        description="Limit that stopped the run: turns, wall_time or tokens",
+    )
+    worktree_branch: str | None = Field(
+        default=None,
+        description="Branch holding the run's changes if they did not apply cleanly",
+    )
+
+
+class AgentRunLogResponse(BaseModel):
+    """Single persisted log entry of an agent run."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(description="Sequential log entry id (pagination cursor)")
+    timestamp: datetime = Field(description="When the agent emitted the entry")
+    type: str = Field(description="Message type: assistant, tool, result, finished...")
+    content: str = Field(description="Full, untruncated entry content")
+
+
+class AgentRunLogPage(BaseModel):
+    """A page of agent run log entries, oldest first."""
+
+    entries: list[AgentRunLogResponse] = Field(description="Log entries in order")
+    next_after: int | None = Field(
+        description="Cursor for the next page (pass as ?after=), None if at the end"
+    )
 
 
 # ─────────────────────────────────────────────────────────────
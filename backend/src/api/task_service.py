@@ -6,65 +6,85 @@ events via SSE for real-time frontend updates.
 Functions:
     create_task: Create new task and publish creation event
     get_task: Retrieve single task by ID
-    get_all_tasks: List all tasks (descending by creation date)
+    list_tasks: List tasks newest first, with filters and keyset paging
+        (returns the page and the opaque cursor of the next one)
     update_task: Update task fields and publish update event
     delete_task: Remove task and publish deletion event
+    create_tasks / update_tasks / delete_tasks: Bulk variants, one
+        transaction and one tasks_batch event per call
 
 Events published (via event_bus):
     - task_created: Full task data on creation
-    - task_updated: Full task data on update
-    - task_deleted: Task ID on deletion
+    - task_updated: Full task data on update (plus 'sync' when the
+      sandbox was copied to target_path)
+    - task_deleted: Task ID (plus project/parent for filtering) on deletion
+    - tasks_batch: {"created": [...], "updated": [...], "deleted": [...]}
 """
 
-import shutil
+import asyncio
+import base64
+import json
+import logging
+from collections.abc import Sequence
+from dataclasses import asdict
 from pathlib import Path
+from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import delete, select
+from sqlalchemy import String, and_, delete, or_, select, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from src.api.events import EventType, TaskEvent, event_bus
-from src.api.schemas import TaskCreate, TaskUpdate
+from src.api.schemas import TaskBulkUpdateItem, TaskCreate, TaskUpdate
 from src.models.task import Task, TaskStatus
+from src.services.sandbox import OUTPUT_DIR, SyncReport, remove_sandboxes, sync_tree
 
-# Sandbox output directory base
-OUTPUT_DIR = Path("output")
+logger = logging.getLogger(__name__)
 
 
 def generate_sandbox_dir(task_id: str) -> str:
-    """Generate sandbox directory path for a task."""
-    return f"output/{task_id}/"
+    """Generate sandbox directory path for a task (created on first agent use)."""
+    return f"{OUTPUT_DIR}/{task_id}/"
 
 
-async def copy_sandbox_to_target(sandbox_dir: str, target_path: str) -> bool:
-    """Copy sandbox contents to target path.
+async def copy_sandbox_to_target(
+    sandbox_dir: str, target_path: str
+) -> SyncReport | None:
+    """Sync sandbox contents into target path (incrementally, off the loop).
 
-    Returns True if successful, False if sandbox is empty or doesn't exist.
+    Unchanged files are skipped (size/mtime, then content hash); see
+    services/sandbox.py for the copy modes.
+
+    Returns:
+        What was copied, or None if the sandbox doesn't exist.
     """
     sandbox = Path(sandbox_dir)
-    target = Path(target_path)
-
     if not sandbox.exists():
-        return False
-
-    target.mkdir(parents=True, exist_ok=True)
-
-    for item in sandbox.iterdir():
-        if item.is_file():
-            shutil.copy2(item, target / item.name)
-        elif item.is_dir():
-            shutil.copytree(item, target / item.name, dirs_exist_ok=True)
+        return None
 
-    return True
+    report = await asyncio.to_thread(sync_tree, sandbox, Path(target_path))
+    logger.info(
+        "Synced %s to %s: %d copied (%d bytes), %d linked, %d unchanged",
+        sandbox_dir,
+        target_path,
+        report.files_copied,
+        report.bytes_copied,
+        report.files_linked,
+        report.files_unchanged,
+    )
+    return report
 
 
-def _task_to_event_data(task: Task) -> dict:
+def _task_to_event_data(task: Task, sync: SyncReport | None = None) -> dict:
     """Convert task to event payload with all fields.
 
     Ensures SSE events contain complete task data so frontend
     doesn't lose fields like 'type' or 'description' on updates.
+    If the update synced the sandbox to target_path, its SyncReport is
+    included as 'sync'.
     """
-    return {
+    data = {
         "id": task.id,
         "title": task.title,
         "description": task.description,
@@ -74,6 +94,8 @@ def _task_to_event_data(task: Task) -> dict:
         "project_id": task.project_id,
         "parent_id": task.parent_id,
         "steps": task.steps,
+        "depends_on": task.depends_on,
+        "budget": task.budget,
         "created_at": task.created_at.isoformat() if task.created_at else None,
         # Delegation fields (Phase 11B)
         "sandbox_dir": task.sandbox_dir,
@@ -83,26 +105,20 @@ def _task_to_event_data(task: Task) -> dict:
         "template": task.template,
         "source": task.source,
     }
+    if sync is not None:
+        data["sync"] = asdict(sync)
+    return data
 
 
-async def create_task(db: AsyncSession, task_data: TaskCreate) -> Task:
-    """Create a new task in the database.
-
-    Automatically generates sandbox_dir and creates the directory.
-    Publishes task_created event with full task data.
-    """
+def _new_task(task_data: TaskCreate) -> Task:
+    """Build a Task row (with its sandbox_dir) from create data."""
     # Convert steps from Pydantic models to dicts for JSON storage
     steps_input = task_data.steps
     steps_data = [s.model_dump() for s in steps_input] if steps_input else None
 
     # Generate unique ID and sandbox directory
     task_id = str(uuid4())
-    sandbox_dir = generate_sandbox_dir(task_id)
-
-    # Ensure sandbox directory exists
-    Path(sandbox_dir).mkdir(parents=True, exist_ok=True)
-
-    task = Task(
+    return Task(
         id=task_id,
         title=task_data.title,
         description=task_data.description,
@@ -111,14 +127,29 @@ async def create_task(db: AsyncSession, task_data: TaskCreate) -> Task:
         project_id=task_data.project_id,
         parent_id=task_data.parent_id,
         steps=steps_data,
+        depends_on=task_data.depends_on,
+        budget=(
+            task_data.budget.model_dump(exclude_none=True) if task_data.budget else None
+        ),
         # Delegation fields (Phase 11B)
-        sandbox_dir=sandbox_dir,
+        sandbox_dir=generate_sandbox_dir(task_id),
         target_path=task_data.target_path,
         read_paths=task_data.read_paths,
         allowed_mcps=task_data.allowed_mcps,
         template=task_data.template,
         source=task_data.source,
     )
+
+
+async def create_task(db: AsyncSession, task_data: TaskCreate) -> Task:
+    """Create a new task in the database.
+
+    Generates sandbox_dir; the directory itself is created by the first
+    agent run (see services/sandbox.py).
+    Publishes task_created event with full task data.
+    """
+    task = _new_task(task_data)
+
     db.add(task)
     await db.commit()
     await db.refresh(task)
@@ -132,16 +163,119 @@ async def create_task(db: AsyncSession, task_data: TaskCreate) -> Task:
     return task
 
 
+async def create_tasks(db: AsyncSession, items: Sequence[TaskCreate]) -> list[Task]:
+    """Create many tasks in one transaction.
+
+    A single tasks_batch event carries all created tasks.
+    """
+    tasks = [_new_task(task_data) for task_data in items]
+
+    db.add_all(tasks)
+    await db.commit()
+
+    await _publish_batch(created=tasks)
+    return tasks
+
+
 async def get_task(db: AsyncSession, task_id: str) -> Task | None:
     """Get a single task by ID."""
     result = await db.execute(select(Task).where(Task.id == task_id))
     return result.scalar_one_or_none()
 
 
-async def get_all_tasks(db: AsyncSession) -> list[Task]:
-    """Get all tasks ordered by creation date (newest first)."""
-    result = await db.execute(select(Task).order_by(Task.created_at.desc()))
-    return list(result.scalars().all())
+# created_at exactly as stored; a datetime parsed and re-bound by the
+# DateTime type would not compare equal (CURRENT_TIMESTAMP has no fraction)
+_CREATED_TEXT = type_coerce(Task.created_at, String)
+
+
+def _encode_cursor(created: str, task_id: str) -> str:
+    """Opaque cursor for the page after the task (created, task_id)."""
+    return base64.urlsafe_b64encode(json.dumps([created, task_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    """(created_at, id) of the last task of the previous page."""
+    try:
+        created, task_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if isinstance(created, str) and isinstance(task_id, str):
+        return created, task_id
+    raise ValueError(f"Invalid cursor: {cursor}")
+
+
+async def list_tasks(
+    db: AsyncSession,
+    filters: dict[str, str] | None = None,
+    after: str | None = None,
+    limit: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> tuple[list[Task], str | None]:
+    """List tasks newest first, ordered by (created_at, id).
+
+    Args:
+        filters: Column equality filters (project_id, status, type, ...)
+        after: Keyset cursor returned with the previous page
+        limit: Maximum number of tasks (None = all)
+        fields: Columns to load; others are deferred (None = all)
+
+    Returns:
+        The tasks, and the cursor of the next page (None when this page
+        is not full). The cursor carries the (created_at, id) values
+        themselves, so it stays valid if its task is deleted.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    query = select(Task, _CREATED_TEXT.label("cursor_created")).order_by(
+        Task.created_at.desc(), Task.id.desc()
+    )
+    for column, value in (filters or {}).items():
+        query = query.where(getattr(Task, column) == value)
+
+    if after is not None:
+        created, task_id = _decode_cursor(after)
+        query = query.where(
+            or_(
+                _CREATED_TEXT < created,
+                and_(_CREATED_TEXT == created, Task.id < task_id),
+            )
+        )
+
+    if fields:
+        query = query.options(
+            load_only(*(getattr(Task, name) for name in {"id", *fields}))
+        )
+    if limit is not None:
+        query = query.limit(limit)
+
+    # Refresh rows already in the session (e.g. from a version-only read)
+    query = query.execution_options(populate_existing=True)
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if limit is not None and len(rows) == limit:
+        last, created = rows[-1]
+        next_cursor = _encode_cursor(created, last.id)
+    return [task for task, _ in rows], next_cursor
+
+
+def _apply_update(task: Task, update_data: dict[str, Any]) -> None:
+    """Set the explicitly provided fields on a task."""
+    for field, value in update_data.items():
+        # Convert steps Pydantic models to dicts for JSON storage
+        if field == "steps" and value is not None:
+            value = [step if isinstance(step, dict) else step for step in value]
+        setattr(task, field, value)
+
+
+def _needs_copy_to_target(old_status: str, task: Task) -> bool:
+    """Whether a status change should copy the sandbox to target_path."""
+    return (
+        old_status != TaskStatus.DONE
+        and task.status == TaskStatus.DONE
+        and bool(task.target_path)
+        and bool(task.sandbox_dir)
+    )
 
 
 async def update_task(
@@ -155,7 +289,8 @@ async def update_task(
     Publishes task_updated event with full task data.
 
     Copy-to-target: When status changes to DONE and target_path is set,
-    copies sandbox contents to target directory.
+    copies sandbox contents to target directory and reports the
+    SyncReport in the event's 'sync' field.
 
     Returns:
         Updated task or None if not found.
@@ -168,40 +303,79 @@ async def update_task(
     old_status = task.status
 
     # Apply only provided fields
-    update_data = task_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        # Convert steps Pydantic models to dicts for JSON storage
-        if field == "steps" and value is not None:
-            value = [step if isinstance(step, dict) else step for step in value]
-        setattr(task, field, value)
+    _apply_update(task, task_data.model_dump(exclude_unset=True))
 
     await db.commit()
     await db.refresh(task)
 
     # Copy to target when transitioning to DONE (if target_path is set)
-    new_status = task.status
-    if (
-        old_status != TaskStatus.DONE
-        and new_status == TaskStatus.DONE
-        and task.target_path
-        and task.sandbox_dir
-    ):
-        await copy_sandbox_to_target(task.sandbox_dir, task.target_path)
+    sync = None
+    if _needs_copy_to_target(old_status, task):
+        sync = await copy_sandbox_to_target(task.sandbox_dir, task.target_path)
 
     await event_bus.publish(
         TaskEvent(
             event_type=EventType.TASK_UPDATED,
-            data=_task_to_event_data(task),
+            data=_task_to_event_data(task, sync),
         )
     )
     return task
 
 
+async def _get_tasks_by_id(
+    db: AsyncSession, task_ids: Sequence[str]
+) -> dict[str, Task]:
+    """Load tasks by ID, raising if any is missing.
+
+    Raises:
+        ValueError: If some of the tasks do not exist.
+    """
+    result = await db.execute(select(Task).where(Task.id.in_(set(task_ids))))
+    tasks = {task.id: task for task in result.scalars()}
+    missing = [task_id for task_id in task_ids if task_id not in tasks]
+    if missing:
+        raise ValueError(f"Tasks not found: {', '.join(missing)}")
+    return tasks
+
+
+async def update_tasks(
+    db: AsyncSession, items: Sequence[TaskBulkUpdateItem]
+) -> list[Task]:
+    """Apply partial updates to many tasks in one transaction.
+
+    All-or-nothing: nothing is written if any task is missing. Publishes
+    one tasks_batch event and copies sandboxes of tasks moved to DONE.
+
+    Raises:
+        ValueError: If some of the tasks do not exist.
+    """
+    tasks = await _get_tasks_by_id(db, [item.id for item in items])
+    old_status = {task_id: task.status for task_id, task in tasks.items()}
+
+    for item in items:
+        _apply_update(
+            tasks[item.id], item.model_dump(exclude_unset=True, exclude={"id"})
+        )
+    await db.commit()
+
+    updated = list(tasks.values())
+    copied = [t for t in updated if _needs_copy_to_target(old_status[t.id], t)]
+    reports = await asyncio.gather(
+        *(copy_sandbox_to_target(t.sandbox_dir, t.target_path) for t in copied)
+    )
+
+    await _publish_batch(
+        updated=updated,
+        syncs={task.id: report for task, report in zip(copied, reports, strict=True)},
+    )
+    return updated
+
+
 async def delete_task(db: AsyncSession, task_id: str) -> bool:
     """Delete a task by ID.
 
     Uses SQLAlchemy 2.0 delete statement pattern.
-    Publishes task_deleted event.
+    Removes the task's sandbox directory and publishes task_deleted event.
 
     Returns:
         True if deleted, False if task not found.
@@ -214,11 +388,65 @@ async def delete_task(db: AsyncSession, task_id: str) -> bool:
     # Delete using statement (SQLAlchemy 2.0 pattern)
     await db.execute(delete(Task).where(Task.id == task_id))
     await db.commit()
+    await asyncio.to_thread(remove_sandboxes, [task.sandbox_dir])
 
     await event_bus.publish(
         TaskEvent(
             event_type=EventType.TASK_DELETED,
-            data={"id": task_id},
+            data={
+                "id": task_id,
+                "project_id": task.project_id,
+                "parent_id": task.parent_id,
+            },
         )
     )
     return True
+
+
+async def delete_tasks(db: AsyncSession, task_ids: Sequence[str]) -> None:
+    """Delete many tasks in one transaction.
+
+    All-or-nothing: nothing is deleted if any task is missing. Publishes
+    one tasks_batch event listing the deleted tasks and removes their
+    sandbox directories.
+
+    Raises:
+        ValueError: If some of the tasks do not exist.
+    """
+    tasks = await _get_tasks_by_id(db, task_ids)
+
+    await db.execute(delete(Task).where(Task.id.in_(tasks.keys())))
+    await db.commit()
+    await asyncio.to_thread(
+        remove_sandboxes, [task.sandbox_dir for task in tasks.values()]
+    )
+
+    await _publish_batch(deleted=list(tasks.values()))
+
+
+async def _publish_batch(
+    created: Sequence[Task] = (),
+    updated: Sequence[Task] = (),
+    deleted: Sequence[Task] = (),
+    syncs: dict[str, SyncReport | None] | None = None,
+) -> None:
+    """Publish one tasks_batch event for a bulk operation.
+
+    syncs maps updated task IDs to the sandbox sync they triggered.
+    """
+    syncs = syncs or {}
+    await event_bus.publish(
+        TaskEvent(
+            event_type=EventType.TASKS_BATCH,
+            data={
+                "created": [_task_to_event_data(task) for task in created],
+                "updated": [
+                    _task_to_event_data(task, syncs.get(task.id)) for task in updated
+                ],
+                "deleted": [
+                    {"id": t.id, "project_id": t.project_id, "parent_id": t.parent_id}
+                    for t in deleted
+                ],
+            },
+        )
+    )
@@ -1,20 +1,98 @@
 """Async database configuration for SQLite + SQLAlchemy 2.0."""
 
+import logging
 import os
 from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any
 
+from sqlalchemy import Connection, event, inspect, text
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateColumn
+
+logger = logging.getLogger(__name__)
 
 # Support in-memory DB for tests via environment variable
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///./kanban.db")
 
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORE = {"DEFAULT", "FILE", "MEMORY"}
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """Per-connection SQLite tuning applied on connect.
+
+    WAL lets readers proceed while a background agent run commits, and
+    busy_timeout makes writers wait for the lock instead of failing.
+    """
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    busy_timeout_ms: int = 5000
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -64_000  # Negative = KiB, i.e. ~64 MB page cache
+    temp_store: str = "MEMORY"
+
+    def __post_init__(self) -> None:
+        """Reject values that cannot be passed to PRAGMA safely."""
+        if self.journal_mode.upper() not in _JOURNAL_MODES:
+            raise ValueError(f"Invalid SQLite journal_mode: {self.journal_mode}")
+        if self.synchronous.upper() not in _SYNCHRONOUS:
+            raise ValueError(f"Invalid SQLite synchronous: {self.synchronous}")
+        if self.temp_store.upper() not in _TEMP_STORE:
+            raise ValueError(f"Invalid SQLite temp_store: {self.temp_store}")
+
+    @classmethod
+    def from_env(cls) -> "SQLiteProfile":
+        """Build profile from SQLITE_* environment variables."""
+        defaults = cls()
+        return cls(
+            journal_mode=os.environ.get("SQLITE_JOURNAL_MODE", defaults.journal_mode),
+            synchronous=os.environ.get("SQLITE_SYNCHRONOUS", defaults.synchronous),
+            busy_timeout_ms=int(
+                os.environ.get("SQLITE_BUSY_TIMEOUT_MS", defaults.busy_timeout_ms)
+            ),
+            mmap_size=int(os.environ.get("SQLITE_MMAP_SIZE", defaults.mmap_size)),
+            cache_size=int(os.environ.get("SQLITE_CACHE_SIZE", defaults.cache_size)),
+            temp_store=os.environ.get("SQLITE_TEMP_STORE", defaults.temp_store),
+        )
+
+    def pragmas(self) -> list[str]:
+        """PRAGMA statements for this profile."""
+        return [
+            f"PRAGMA journal_mode={self.journal_mode.upper()}",
+            f"PRAGMA synchronous={self.synchronous.upper()}",
+            f"PRAGMA busy_timeout={self.busy_timeout_ms:d}",
+            f"PRAGMA mmap_size={self.mmap_size:d}",
+            f"PRAGMA cache_size={self.cache_size:d}",
+            f"PRAGMA temp_store={self.temp_store.upper()}",
+        ]
+
+
+def apply_sqlite_profile(engine: AsyncEngine, profile: SQLiteProfile) -> None:
+    """Run the profile's PRAGMAs on every new DBAPI connection."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection: Any, _record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in profile.pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+
 engine = create_async_engine(DATABASE_URL, echo=False)
 
+if engine.dialect.name == "sqlite":
+    apply_sqlite_profile(engine, SQLiteProfile.from_env())
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -32,7 +110,66 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def sqlite_settings(db_engine: AsyncEngine = engine) -> dict[str, Any]:
+    """Read the effective SQLite settings of a connection."""
+    names = [
+        "journal_mode",
+        "synchronous",
+        "busy_timeout",
+        "mmap_size",
+        "cache_size",
+        "temp_store",
+    ]
+    async with db_engine.connect() as conn:
+        return {
+            name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+            for name in names
+        }
+
+
+def _add_missing_columns(conn: Connection) -> None:
+    """Add columns declared on models to tables that predate them.
+
+    Only suitable for nullable columns or columns with a server default,
+    which is what SQLite's ALTER TABLE ADD COLUMN supports.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            logger.info("Adding column %s.%s", table.name, column.name)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+
+# Indexes created by earlier versions and since replaced; kept around they
+# would only slow down writes
+RETIRED_INDEXES = [
+    "ix_tasks_created_at",  # Superseded by ix_tasks_created_at_id
+]
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    """Add indexes declared on models to tables that predate them.
+
+    create_all() skips existing tables entirely, so databases created by
+    an older version would never get newly declared indexes. Retired
+    indexes left behind by those versions are dropped.
+    """
+    for name in RETIRED_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 async def init_db() -> None:
-    """Create all database tables."""
+    """Create all database tables and report effective SQLite settings."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+    if engine.dialect.name == "sqlite":
+        logger.info("SQLite settings: %s", await sqlite_settings())
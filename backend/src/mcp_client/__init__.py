@@ -5,7 +5,9 @@ from .registry import (
     get_available_mcps,
     get_defaults,
     get_mcp_config,
+    invalidate_mcp_registry,
     load_mcp_registry,
+    reload_mcp_registry,
 )
 
 __all__ = [
@@ -13,5 +15,7 @@ __all__ = [
     "get_available_mcps",
     "get_defaults",
     "get_mcp_config",
+    "invalidate_mcp_registry",
     "load_mcp_registry",
+    "reload_mcp_registry",
 ]
@@ -0,0 +1,287 @@
+"""Warm pool of MCP server processes shared across agent runs.
+
+The SDK spawns every stdio MCP server from scratch for each run. Servers
+marked `pool: true` in the registry are instead started once as local
+streamable-HTTP servers and handed to runs by URL. Instances are keyed by
+server identity (command, args and static env), leased to one run at a time
+and recycled after MCP_POOL_MAX_USES runs or MCP_POOL_IDLE_SECONDS without
+use.
+
+Env entries templated from ${WORKSPACE_PATH} or ${SANDBOX_DIR} change with
+every run, so they are not part of the key and not set on the process;
+runs send them per request in the X-MCP-Env header (JSON) instead. A
+pooled server therefore has to support (see the filesystem server):
+
+    MCP_TRANSPORT=streamable-http  - serve MCP over HTTP on 127.0.0.1
+    MCP_PORT=0                     - bind a free port, print "MCP_PORT=<n>"
+    MCP_AUTH_TOKEN                 - require "Authorization: Bearer <token>"
+    X-MCP-Env                      - per-run env of the request
+
+A server that fails to start falls back to its normal stdio config.
+MCP_POOL_ENABLED=false turns pooling off entirely.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import secrets
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from .registry import MCPServerConfig, load_mcp_registry
+
+logger = logging.getLogger(__name__)
+
+MCP_POOL_ENABLED = os.environ.get("MCP_POOL_ENABLED", "true").lower() == "true"
+MCP_POOL_MAX_USES = int(os.environ.get("MCP_POOL_MAX_USES", "20"))
+MCP_POOL_IDLE_SECONDS = float(os.environ.get("MCP_POOL_IDLE_SECONDS", "300"))
+MCP_POOL_MAX_IDLE = int(os.environ.get("MCP_POOL_MAX_IDLE", "4"))  # Per key
+MCP_POOL_START_TIMEOUT = float(os.environ.get("MCP_POOL_START_TIMEOUT", "15"))
+
+# Registry env values that differ per run (sent per request, not pooled)
+PER_RUN_VALUES = ("${WORKSPACE_PATH}", "${SANDBOX_DIR}")
+
+# (name, command, args, static env)
+PoolKey = tuple[str, str, tuple[str, ...], tuple[tuple[str, str], ...]]
+
+
+@dataclass
+class PooledServer:
+    """One warm MCP server process."""
+
+    key: PoolKey
+    process: asyncio.subprocess.Process
+    url: str
+    token: str
+    uses: int = 0
+    idle_since: float = field(default_factory=time.monotonic)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+
+@dataclass
+class MCPLease:
+    """MCP servers of one run: SDK config plus the pooled instances used."""
+
+    servers: dict[str, Any]
+    pooled: list[PooledServer] = field(default_factory=list)
+
+
+def _is_pooled(name: str) -> bool:
+    """Whether the registry opts this server into the pool."""
+    server = load_mcp_registry().get("servers", {}).get(name) or {}
+    return bool(server.get("pool", False))
+
+
+def _per_run_keys(name: str) -> set[str]:
+    """Env names the registry fills from the run's workspace or sandbox."""
+    server = load_mcp_registry().get("servers", {}).get(name) or {}
+    return {
+        key
+        for key, value in (server.get("env") or {}).items()
+        if value in PER_RUN_VALUES
+    }
+
+
+def _split_env(
+    name: str, config: MCPServerConfig
+) -> tuple[PoolKey, dict[str, str], dict[str, str]]:
+    """Pool key, static env (for the process) and per-run env (per request)."""
+    per_run_keys = _per_run_keys(name)
+    env = config.get("env", {})
+    static = {k: v for k, v in env.items() if k not in per_run_keys}
+    per_run = {k: v for k, v in env.items() if k in per_run_keys}
+    key: PoolKey = (
+        name,
+        config["command"],
+        tuple(config.get("args", [])),
+        tuple(sorted(static.items())),
+    )
+    return key, static, per_run
+
+
+class MCPProcessPool:
+    """Leases warm MCP server processes to agent runs."""
+
+    def __init__(
+        self,
+        enabled: bool = MCP_POOL_ENABLED,
+        max_uses: int = MCP_POOL_MAX_USES,
+        idle_seconds: float = MCP_POOL_IDLE_SECONDS,
+        max_idle: int = MCP_POOL_MAX_IDLE,
+        start_timeout: float = MCP_POOL_START_TIMEOUT,
+    ) -> None:
+        self.enabled = enabled
+        self.max_uses = max(1, max_uses)
+        self.idle_seconds = idle_seconds
+        self.max_idle = max_idle
+        self.start_timeout = start_timeout
+        self._idle: dict[PoolKey, list[PooledServer]] = {}
+        self._lock = asyncio.Lock()
+        self._reaper: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        """Start reaping idle instances in the background."""
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def close(self) -> None:
+        """Stop the reaper and all idle instances."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reaper
+            self._reaper = None
+        async with self._lock:
+            idle = [server for servers in self._idle.values() for server in servers]
+            self._idle.clear()
+        await asyncio.gather(*(self._stop(server) for server in idle))
+
+    @property
+    def idle_count(self) -> int:
+        return sum(len(servers) for servers in self._idle.values())
+
+    async def acquire(self, config: dict[str, MCPServerConfig]) -> MCPLease:
+        """Swap pooled servers in config for leased warm instances."""
+        lease = MCPLease(servers=dict(config))
+        if not self.enabled:
+            return lease
+        for name, server_config in config.items():
+            if not _is_pooled(name):
+                continue
+            key, static_env, per_run_env = _split_env(name, server_config)
+            try:
+                server = await self._checkout(key, static_env)
+            except Exception:
+                logger.exception("MCP pool: %s failed to start, using stdio", name)
+                continue
+            lease.pooled.append(server)
+            lease.servers[name] = {
+                "type": "http",
+                "url": server.url,
+                "headers": {
+                    "Authorization": f"Bearer {server.token}",
+                    "X-MCP-Env": json.dumps(per_run_env),
+                },
+            }
+        return lease
+
+    async def release(self, lease: MCPLease) -> None:
+        """Return a run's instances; recycle worn-out or dead ones."""
+        retired: list[PooledServer] = []
+        async with self._lock:
+            for server in lease.pooled:
+                idle = self._idle.setdefault(server.key, [])
+                if (
+                    not server.alive
+                    or server.uses >= self.max_uses
+                    or len(idle) >= self.max_idle
+                ):
+                    retired.append(server)
+                    continue
+                server.idle_since = time.monotonic()
+                idle.append(server)
+        await asyncio.gather(*(self._stop(server) for server in retired))
+
+    async def _checkout(self, key: PoolKey, env: dict[str, str]) -> PooledServer:
+        """Take a live idle instance for this key, or start one."""
+        async with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                server = idle.pop()
+                if server.alive:
+                    break
+            else:
+                server = None
+        if server is None:
+            server = await self._spawn(key, env)
+        server.uses += 1
+        return server
+
+    async def _spawn(self, key: PoolKey, env: dict[str, str]) -> PooledServer:
+        """Start a server on a port of its choosing and wait until it is up."""
+        name, command, args, _ = key
+        if command == "python":
+            command = sys.executable  # Same interpreter as the backend
+        token = secrets.token_urlsafe(32)
+        child_env = {
+            **os.environ,
+            **env,
+            "MCP_TRANSPORT": "streamable-http",
+            "MCP_PORT": "0",
+            "MCP_AUTH_TOKEN": token,
+        }
+        for per_run in _per_run_keys(name):
+            child_env.pop(per_run, None)  # Only ever taken from the request
+        process = await asyncio.create_subprocess_exec(
+            command,
+            *args,
+            env=child_env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            port = await asyncio.wait_for(
+                self._read_port(process), timeout=self.start_timeout
+            )
+        except (TimeoutError, RuntimeError):
+            await self._stop(PooledServer(key, process, "", token))
+            raise RuntimeError(f"MCP server {name} did not start") from None
+        logger.info("MCP pool: started %s on port %d", name, port)
+        return PooledServer(key, process, f"http://127.0.0.1:{port}/mcp", token)
+
+    @staticmethod
+    async def _read_port(process: asyncio.subprocess.Process) -> int:
+        """Port the child reports once it listens ("MCP_PORT=<n>" on stdout)."""
+        assert process.stdout is not None
+        async for line in process.stdout:
+            prefix, _, port = line.decode(errors="replace").strip().partition("=")
+            if prefix == "MCP_PORT" and port.isdigit():
+                return int(port)
+        raise RuntimeError("MCP server exited before reporting its port")
+
+    async def _reap_forever(self) -> None:
+        """Stop instances idle for longer than idle_seconds."""
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_seconds / 4))
+            await self.reap()
+
+    async def reap(self) -> None:
+        """Stop expired or dead idle instances now."""
+        cutoff = time.monotonic() - self.idle_seconds
+        expired: list[PooledServer] = []
+        async with self._lock:
+            for key, servers in list(self._idle.items()):
+                keep = [s for s in servers if s.alive and s.idle_since > cutoff]
+                expired.extend(s for s in servers if s not in keep)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+        await asyncio.gather(*(self._stop(server) for server in expired))
+
+    async def _stop(self, server: PooledServer) -> None:
+        """Terminate an instance (kill it if it does not exit promptly)."""
+        if not server.alive:
+            return
+        with contextlib.suppress(ProcessLookupError):
+            server.process.terminate()
+        try:
+            await asyncio.wait_for(server.process.wait(), timeout=5)
+        except TimeoutError:
+            with contextlib.suppress(ProcessLookupError):
+                server.process.kill()
+            await server.process.wait()
+
+
+# Global pool instance
+mcp_pool = MCPProcessPool()
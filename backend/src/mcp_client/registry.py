@@ -1,8 +1,15 @@
-"""MCP Server Registry for dynamic tool loading from YAML config."""
+"""MCP Server Registry for dynamic tool loading from YAML config.
 
+The parsed YAML is cached in-process and re-read only when the file's
+inode, mtime or size changes (one stat() per lookup). Call
+invalidate_mcp_registry() or reload_mcp_registry() to force a re-read.
+"""
+
+import logging
 import os
+import threading
 from pathlib import Path
-from typing import TypedDict
+from typing import Any, TypedDict
 
 import yaml
 
@@ -30,9 +37,15 @@ class MCPDefaults(TypedDict):
     template: str | None
 
 
+logger = logging.getLogger(__name__)
+
 # Path to YAML config file
 CONFIG_PATH = Path(__file__).parent.parent.parent / ".kanban" / "mcps.yaml"
 
+# (path, inode, mtime_ns, size) of the cached file, and its parsed content
+_cache: tuple[tuple[str, int, int, int], dict[str, Any]] | None = None
+_cache_lock = threading.Lock()
+
 # Default YAML content for auto-creation
 DEFAULT_CONFIG = """\
 # MCP Server Registry Configuration
@@ -51,6 +64,7 @@ servers:
     env:
       WORKSPACE_PATH: "${WORKSPACE_PATH}"
     description: "Filesystem operations in workspace"
+    pool: true  # Keep warm instances across runs (see mcp_client/pool.py)
 
   perplexity:
     enabled: false
@@ -70,13 +84,39 @@ def _ensure_config_exists() -> None:
 
 
 def load_mcp_registry() -> dict:
-    """Load MCP registry from YAML config file.
+    """Load MCP registry from YAML config file (cached until it changes).
 
     Returns:
         Parsed YAML content with 'defaults' and 'servers' sections.
+        The dict is shared between callers and must not be modified.
     """
+    global _cache
     _ensure_config_exists()
-    return yaml.safe_load(CONFIG_PATH.read_text())  # type: ignore[no-any-return]
+    stat = CONFIG_PATH.stat()
+    key = (str(CONFIG_PATH), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        if _cache is not None and _cache[0] == key:
+            return _cache[1]
+        config = yaml.safe_load(CONFIG_PATH.read_text()) or {}
+        _cache = (key, config)
+    logger.debug("Loaded MCP registry from %s", CONFIG_PATH)
+    return config
+
+
+def invalidate_mcp_registry() -> None:
+    """Drop the cached registry; the next lookup re-reads the file."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def reload_mcp_registry() -> dict:
+    """Re-read the registry now and refresh MCP_REGISTRY in place."""
+    invalidate_mcp_registry()
+    config = load_mcp_registry()
+    MCP_REGISTRY.clear()
+    MCP_REGISTRY.update(_load_legacy_registry())
+    return config
 
 
 def get_defaults() -> MCPDefaults:
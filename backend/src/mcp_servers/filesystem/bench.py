@@ -0,0 +1,78 @@
+"""Startup benchmark for the filesystem MCP server.
+
+Measures wall time from spawning the server to its first tools/list
+response over stdio, in fast mode and with FastMCP:
+
+    python -m src.mcp_servers.filesystem.bench [runs]
+
+Functions:
+    time_to_list_tools: Seconds from spawn to the first tools/list answer
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULE = "src.mcp_servers.filesystem.server"
+
+_REQUESTS = [
+    {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "bench", "version": "0"},
+        },
+    },
+    {"jsonrpc": "2.0", "method": "notifications/initialized"},
+    {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+]
+
+
+def time_to_list_tools(fast: bool = True, workspace: str = ".") -> float:
+    """Spawn the server and return seconds until tools/list is answered."""
+    env = {
+        **os.environ,
+        "WORKSPACE_PATH": workspace,
+        "MCP_TRANSPORT": "stdio",
+        "MCP_FAST_START": "true" if fast else "false",
+    }
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", MODULE],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        text=True,
+    )
+    assert process.stdin is not None and process.stdout is not None
+    try:
+        process.stdin.write("".join(json.dumps(r) + "\n" for r in _REQUESTS))
+        process.stdin.flush()
+        for line in process.stdout:
+            if json.loads(line).get("id") == 2:
+                return time.perf_counter() - start
+        raise RuntimeError("Server exited before answering tools/list")
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for label, fast in [("fast", True), ("fastmcp", False)]:
+        times = [time_to_list_tools(fast) for _ in range(runs)]
+        print(
+            f"{label:8} median {statistics.median(times) * 1000:7.1f} ms  "
+            f"min {min(times) * 1000:7.1f} ms  ({runs} runs)"
+        )
+
+
+if __name__ == "__main__":
+    main()
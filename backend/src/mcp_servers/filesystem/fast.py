@@ -0,0 +1,164 @@
+"""Minimal stdio MCP server for the filesystem tools (fast start).
+
+Importing the mcp package costs most of a second; the filesystem server is
+spawned once per agent run over stdio, so that delay sits in front of every
+run's first tool call. This module speaks the small subset of MCP the
+tools need - initialize, ping, tools/list, tools/call - as newline-delimited
+JSON-RPC using only the standard library. Results are rendered the way
+FastMCP renders them.
+
+Functions:
+    tool_schema: JSON schema for a tool's arguments from its signature
+    handle: Answer one JSON-RPC message (None for notifications)
+    serve: Read requests from stdin and answer on stdout until EOF
+"""
+
+import inspect
+import json
+import sys
+from collections.abc import Callable
+from typing import IO, Any
+
+from .tools import TOOLS
+
+# Keep in sync with mcp.shared.version (checked in tests)
+SUPPORTED_PROTOCOL_VERSIONS = ["2024-11-05", "2025-03-26", "2025-06-18", "2025-11-25"]
+LATEST_PROTOCOL_VERSION = SUPPORTED_PROTOCOL_VERSIONS[-1]
+
+SERVER_INFO = {"name": "Filesystem MCP", "version": "1.0.0"}
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+_TOOLS: dict[str, Callable[..., Any]] = {tool.__name__: tool for tool in TOOLS}
+
+
+def tool_schema(tool: Callable[..., Any]) -> dict[str, Any]:
+    """JSON schema for a tool's arguments (str/int/float/bool parameters)."""
+    properties: dict[str, Any] = {}
+    required: list[str] = []
+    for name, param in inspect.signature(tool).parameters.items():
+        prop: dict[str, Any] = {"type": _JSON_TYPES[param.annotation]}
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+        else:
+            prop["default"] = param.default
+        properties[name] = prop
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def _content(result: Any) -> list[dict[str, str]]:
+    """Tool result as MCP text content, matching FastMCP's conversion."""
+    if isinstance(result, list | tuple):
+        return [block for item in result for block in _content(item)]
+    if not isinstance(result, str):
+        result = json.dumps(result, indent=2)
+    return [{"type": "text", "text": result}]
+
+
+def _call_tool(params: dict[str, Any]) -> dict[str, Any]:
+    name = params.get("name")
+    if not isinstance(name, str):
+        raise TypeError("Tool name must be a string")
+    tool = _TOOLS.get(name)
+    if tool is None:
+        raise LookupError(f"Unknown tool: {name}")
+    arguments = params.get("arguments") or {}
+    if not isinstance(arguments, dict):
+        raise TypeError("Tool arguments must be an object")
+    try:
+        result = tool(**arguments)
+    except Exception as e:
+        text = f"Error executing tool {name}: {e}"
+        return {"content": [{"type": "text", "text": text}], "isError": True}
+    return {"content": _content(result), "isError": False}
+
+
+def _initialize(params: dict[str, Any]) -> dict[str, Any]:
+    requested = params.get("protocolVersion")
+    return {
+        "protocolVersion": requested
+        if requested in SUPPORTED_PROTOCOL_VERSIONS
+        else LATEST_PROTOCOL_VERSION,
+        "capabilities": {"tools": {"listChanged": False}},
+        "serverInfo": SERVER_INFO,
+    }
+
+
+def _list_tools(params: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "tools": [
+            {
+                "name": name,
+                "description": inspect.getdoc(tool) or "",
+                "inputSchema": tool_schema(tool),
+            }
+            for name, tool in _TOOLS.items()
+        ]
+    }
+
+
+_METHODS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "initialize": _initialize,
+    "ping": lambda params: {},
+    "tools/list": _list_tools,
+    "tools/call": _call_tool,
+}
+
+
+def handle(message: dict[str, Any]) -> dict[str, Any] | None:
+    """Answer one JSON-RPC message; notifications get no response."""
+    if "id" not in message:
+        return None
+    response: dict[str, Any] = {"jsonrpc": "2.0", "id": message["id"]}
+    name = message.get("method", "")
+    if not isinstance(name, str):
+        response["error"] = {"code": INVALID_REQUEST, "message": "Invalid request"}
+        return response
+    method = _METHODS.get(name)
+    if method is None:
+        response["error"] = {
+            "code": METHOD_NOT_FOUND,
+            "message": f"Method not found: {name}",
+        }
+        return response
+    params = message.get("params") or {}
+    if not isinstance(params, dict):
+        response["error"] = {
+            "code": INVALID_PARAMS,
+            "message": "Params must be an object",
+        }
+        return response
+    try:
+        response["result"] = method(params)
+    except (LookupError, TypeError) as e:
+        response["error"] = {"code": INVALID_PARAMS, "message": str(e)}
+    return response
+
+
+def _error(code: int, message: str) -> dict[str, Any]:
+    """Error response to a message whose id could not be read."""
+    return {"jsonrpc": "2.0", "id": None, "error": {"code": code, "message": message}}
+
+
+def serve(stdin: IO[str] = sys.stdin, stdout: IO[str] = sys.stdout) -> None:
+    """Serve newline-delimited JSON-RPC until stdin closes."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = _error(PARSE_ERROR, f"Parse error: {e}")
+        else:
+            if isinstance(message, dict):
+                response = handle(message)
+            else:
+                response = _error(INVALID_REQUEST, "Invalid request")
+        if response is not None:
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
@@ -1,124 +1,157 @@
 """Filesystem MCP Server for workspace file operations.
 
 This MCP server provides sandboxed file I/O within a specified workspace directory.
+
+Over stdio it starts in fast mode (fast.py, stdlib only) unless
+MCP_FAST_START=false. FastMCP is imported lazily, only for HTTP transports
+(the MCP process pool) or when fast start is off.
+
+Over HTTP one process serves runs in different workspaces: each request
+names its workspace in the X-MCP-Env header (JSON, e.g.
+{"WORKSPACE_PATH": "..."}), and with MCP_AUTH_TOKEN set requests must send
+"Authorization: Bearer <token>". MCP_PORT=0 binds a free port, which is
+printed to stdout as "MCP_PORT=<port>" once the server accepts connections.
+
+Functions:
+    build_server: FastMCP server with the filesystem tools registered
+    main: Run the server on MCP_TRANSPORT (default stdio)
 """
 
+import functools
+import json
 import os
-from pathlib import Path
-
-from mcp.server import FastMCP  # type: ignore[import-untyped]
-
-# Get workspace from environment
-WORKSPACE_PATH = os.environ.get("WORKSPACE_PATH", ".")
-workspace = Path(WORKSPACE_PATH).resolve()
-
-# Create FastMCP server
-mcp = FastMCP("Filesystem MCP")
-
-
-def _validate_path(path: str) -> Path:
-    """Validate that path is within workspace. Raises ValueError if not."""
-    full_path = (workspace / path).resolve()
-    if not str(full_path).startswith(str(workspace)):
-        raise ValueError(f"Path {path} is outside workspace")
-    return full_path
-
-
-@mcp.tool()
-def read_file(path: str) -> str:
-    """Read contents of a file within the workspace.
-
-    Args:
-        path: Relative path to the file from workspace root
-    """
-    file_path = _validate_path(path)
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
-    if not file_path.is_file():
-        raise ValueError(f"Not a file: {path}")
-    return file_path.read_text(encoding="utf-8")
-
-
-@mcp.tool()
-def write_file(path: str, content: str) -> str:
-    """Write content to a file within the workspace.
-
-    Args:
-        path: Relative path to the file from workspace root
-        content: Content to write to the file
-    """
-    file_path = _validate_path(path)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    file_path.write_text(content, encoding="utf-8")
-    return f"Successfully wrote {len(content)} characters to {path}"
-
-
-@mcp.tool()
-def list_directory(path: str = ".") -> list[dict[str, str]]:
-    """List contents of a directory within the workspace.
-
-    Args:
-        path: Relative path to the directory from workspace root
-    """
-    dir_path = _validate_path(path)
-    if not dir_path.exists():
-        raise FileNotFoundError(f"Directory not found: {path}")
-    if not dir_path.is_dir():
-        raise ValueError(f"Not a directory: {path}")
-
-    entries = []
-    for entry in sorted(dir_path.iterdir()):
-        entries.append(
-            {
-                "name": entry.name,
-                "type": "directory" if entry.is_dir() else "file",
-                "size": str(entry.stat().st_size) if entry.is_file() else "",
-            }
-        )
-    return entries
-
-
-@mcp.tool()
-def create_directory(path: str) -> str:
-    """Create a directory within the workspace.
-
-    Args:
-        path: Relative path to the directory from workspace root
-    """
-    dir_path = _validate_path(path)
-    dir_path.mkdir(parents=True, exist_ok=True)
-    return f"Created directory: {path}"
-
-
-@mcp.tool()
-def delete_file(path: str) -> str:
-    """Delete a file within the workspace.
-
-    Args:
-        path: Relative path to the file from workspace root
-    """
-    file_path = _validate_path(path)
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
-    if not file_path.is_file():
-        raise ValueError(f"Not a file: {path}")
-    file_path.unlink()
-    return f"Deleted file: {path}"
-
-
-@mcp.tool()
-def file_exists(path: str) -> bool:
-    """Check if a file or directory exists within the workspace.
-
-    Args:
-        path: Relative path from workspace root
-    """
+import secrets
+import socket
+from collections.abc import Callable
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from .tools import (
+    TOOLS,
+    create_directory,
+    delete_file,
+    file_exists,
+    list_directory,
+    read_file,
+    use_workspace,
+    write_file,
+)
+
+if TYPE_CHECKING:
+    from mcp.server import FastMCP  # type: ignore[import-untyped]
+
+__all__ = [
+    "build_server",
+    "create_directory",
+    "delete_file",
+    "file_exists",
+    "list_directory",
+    "main",
+    "read_file",
+    "write_file",
+]
+
+MCP_FAST_START = os.environ.get("MCP_FAST_START", "true").lower() == "true"
+
+
+@cache
+def build_server() -> "FastMCP":
+    """Create (once) the FastMCP server with the filesystem tools registered."""
+    from mcp.server import FastMCP  # ~1s of imports; only when needed
+
+    mcp = FastMCP("Filesystem MCP")
+    for tool in TOOLS:
+        mcp.tool()(_scoped(tool))
+    return mcp
+
+
+def _request_env() -> dict[str, str]:
+    """Per-run env sent by the MCP process pool with the current request."""
+    from mcp.server.lowlevel.server import request_ctx
+
     try:
-        full_path = _validate_path(path)
-        return full_path.exists()
-    except ValueError:
-        return False
+        request = request_ctx.get().request
+    except LookupError:
+        return {}
+    header = request.headers.get("x-mcp-env") if request is not None else None
+    return json.loads(header) if header else {}
+
+
+def _scoped(tool: Callable[..., Any]) -> Callable[..., Any]:
+    """Run tool in the workspace named by the request, if any."""
+
+    @functools.wraps(tool)  # FastMCP reads the signature through __wrapped__
+    def call(**kwargs: Any) -> Any:
+        with use_workspace(_request_env().get("WORKSPACE_PATH")):
+            return tool(**kwargs)
+
+    return call
+
+
+def _require_token(app: Any, token: str) -> Any:
+    """ASGI wrapper rejecting HTTP requests without the bearer token."""
+    expected = f"Bearer {token}".encode()
+
+    async def guarded(scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] == "http":
+            auth = dict(scope["headers"]).get(b"authorization", b"")
+            if not secrets.compare_digest(auth, expected):
+                await send(
+                    {"type": "http.response.start", "status": 401, "headers": []}
+                )
+                await send({"type": "http.response.body", "body": b"Unauthorized"})
+                return
+        await app(scope, receive, send)
+
+    return guarded
+
+
+def _serve_http(mcp: "FastMCP") -> None:
+    """Serve streamable HTTP on 127.0.0.1:MCP_PORT (0 = any free port)."""
+    import anyio
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind((mcp.settings.host, int(os.environ.get("MCP_PORT", mcp.settings.port))))
+    app = mcp.streamable_http_app()
+    if token := os.environ.get("MCP_AUTH_TOKEN"):
+        app = _require_token(app, token)
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+
+    async def serve() -> None:
+        async with anyio.create_task_group() as group:
+            group.start_soon(server.serve, [sock])
+            while not server.started:
+                await anyio.sleep(0.01)
+            # Bound by us, so the reported port is the one in use (no race)
+            print(f"MCP_PORT={sock.getsockname()[1]}", flush=True)
+
+    anyio.run(serve)
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from ...filesystem.server import mcp` working without the import cost
+    if name == "mcp":
+        return build_server()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main() -> None:
+    """Run the server on MCP_TRANSPORT (stdio by default)."""
+    transport = os.environ.get("MCP_TRANSPORT", "stdio")
+    if transport == "stdio" and MCP_FAST_START:
+        from .fast import serve
+
+        serve()
+        return
+
+    mcp = build_server()
+    if transport == "streamable-http":  # How the MCP process pool runs it
+        _serve_http(mcp)
+        return
+    mcp.settings.port = int(os.environ.get("MCP_PORT", mcp.settings.port))
+    mcp.run(transport=transport)  # type: ignore[arg-type]
 
 
 if __name__ == "__main__":
-    mcp.run()
+    main()
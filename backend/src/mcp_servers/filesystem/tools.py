@@ -0,0 +1,150 @@
+"""Filesystem tool implementations (stdlib only, no MCP imports).
+
+Kept free of the mcp package so the stdio fast path in fast.py starts
+without importing it. server.py registers the same functions with FastMCP.
+
+Functions:
+    workspace: Workspace root of the current request, else WORKSPACE_PATH
+    use_workspace: Scope workspace() to another root (pooled HTTP servers)
+    read_file, write_file, list_directory, create_directory, delete_file,
+    file_exists: The tools exposed by the server
+"""
+
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from pathlib import Path
+
+# Set per request when one server process serves several workspaces
+_scoped_workspace: ContextVar[Path | None] = ContextVar("workspace", default=None)
+
+
+@cache
+def _default_workspace() -> Path:
+    return Path(os.environ.get("WORKSPACE_PATH", ".")).resolve()
+
+
+def workspace() -> Path:
+    """Workspace root: the scoped one, else WORKSPACE_PATH (resolved once)."""
+    return _scoped_workspace.get() or _default_workspace()
+
+
+@contextmanager
+def use_workspace(path: str | None) -> Iterator[None]:
+    """Make workspace() return path inside the block (None: no change)."""
+    token = _scoped_workspace.set(Path(path).resolve() if path else None)
+    try:
+        yield
+    finally:
+        _scoped_workspace.reset(token)
+
+
+def _validate_path(path: str) -> Path:
+    """Validate that path is within workspace. Raises ValueError if not."""
+    root = workspace()
+    full_path = (root / path).resolve()
+    if not str(full_path).startswith(str(root)):
+        raise ValueError(f"Path {path} is outside workspace")
+    return full_path
+
+
+def read_file(path: str) -> str:
+    """Read contents of a file within the workspace.
+
+    Args:
+        path: Relative path to the file from workspace root
+    """
+    file_path = _validate_path(path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+    if not file_path.is_file():
+        raise ValueError(f"Not a file: {path}")
+    return file_path.read_text(encoding="utf-8")
+
+
+def write_file(path: str, content: str) -> str:
+    """Write content to a file within the workspace.
+
+    Args:
+        path: Relative path to the file from workspace root
+        content: Content to write to the file
+    """
+    file_path = _validate_path(path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(content, encoding="utf-8")
+    return f"Successfully wrote {len(content)} characters to {path}"
+
+
+def list_directory(path: str = ".") -> list[dict[str, str]]:
+    """List contents of a directory within the workspace.
+
+    Args:
+        path: Relative path to the directory from workspace root
+    """
+    dir_path = _validate_path(path)
+    if not dir_path.exists():
+        raise FileNotFoundError(f"Directory not found: {path}")
+    if not dir_path.is_dir():
+        raise ValueError(f"Not a directory: {path}")
+
+    entries = []
+    for entry in sorted(dir_path.iterdir()):
+        entries.append(
+            {
+                "name": entry.name,
+                "type": "directory" if entry.is_dir() else "file",
+                "size": str(entry.stat().st_size) if entry.is_file() else "",
+            }
+        )
+    return entries
+
+
+def create_directory(path: str) -> str:
+    """Create a directory within the workspace.
+
+    Args:
+        path: Relative path to the directory from workspace root
+    """
+    dir_path = _validate_path(path)
+    dir_path.mkdir(parents=True, exist_ok=True)
+    return f"Created directory: {path}"
+
+
+def delete_file(path: str) -> str:
+    """Delete a file within the workspace.
+
+    Args:
+        path: Relative path to the file from workspace root
+    """
+    file_path = _validate_path(path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+    if not file_path.is_file():
+        raise ValueError(f"Not a file: {path}")
+    file_path.unlink()
+    return f"Deleted file: {path}"
+
+
+def file_exists(path: str) -> bool:
+    """Check if a file or directory exists within the workspace.
+
+    Args:
+        path: Relative path from workspace root
+    """
+    try:
+        full_path = _validate_path(path)
+        return full_path.exists()
+    except ValueError:
+        return False
+
+
+TOOLS = [
+    read_file,
+    write_file,
+    list_directory,
+    create_directory,
+    delete_file,
+    file_exists,
+]
@@ -1,6 +1,14 @@
 # SQLAlchemy models
 from src.models.agent_run import AgentRun, AgentRunStatus
+from src.models.agent_run_log import AgentRunLog
 from src.models.project import Project
 from src.models.task import Task, TaskStatus
 
-__all__ = ["AgentRun", "AgentRunStatus", "Project", "Task", "TaskStatus"]
+__all__ = [
+    "AgentRun",
+    "AgentRunLog",
+    "AgentRunStatus",
+    "Project",
+    "Task",
+    "TaskStatus",
+]
@@ -6,12 +6,23 @@ from datetime import datetime
 from enum import StrEnum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy import (
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
 
 if TYPE_CHECKING:
+    from src.models.agent_run_log import AgentRunLog
     from src.models.task import Task
 
 
@@ -30,17 +41,50 @@ class AgentRun(Base):
     """Tracks individual agent execution runs."""
 
     __tablename__ = "agent_runs"
+    __table_args__ = (
+        # Active-run check in start_agent_run and filtered run listings
+        Index("ix_agent_runs_task_id_status", "task_id", "status"),
+        Index("ix_agent_runs_status_started_at", "status", "started_at"),
+        Index("ix_agent_runs_queue", "status", "priority", "queued_at"),
+    )
+    __mapper_args__ = {"eager_defaults": True}  # Fetch version via RETURNING
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
     )
+    # Bumped in SQL on every UPDATE; feeds ETags for conditional GETs
+    version: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", onupdate=text("version + 1")
+    )
     task_id: Mapped[str] = mapped_column(
         String(36), ForeignKey("tasks.id"), nullable=False
     )
     status: Mapped[str] = mapped_column(String(20), default=AgentRunStatus.PENDING)
-    logs: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON string
+    # Scheduling: PENDING runs are the persistent queue, served by priority
+    # (higher first), then FIFO by queued_at
+    priority: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    queued_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Lease: the worker executing a RUNNING run refreshes heartbeat_at; runs
+    # whose lease expired are re-queued (up to a number of attempts) or failed
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Budget usage, recorded when the run finishes
+    num_turns: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    input_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    output_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cost_usd: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Limit that stopped the run ("turns", "wall_time", "tokens")
+    budget_exceeded: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    # Worktree mode: branch kept because its changes did not apply cleanly
+    worktree_branch: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Legacy JSON blob - entries are persisted in agent_run_logs instead
+    logs: Mapped[str | None] = mapped_column(Text, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     started_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
@@ -52,3 +96,6 @@ class AgentRun(Base):
 
     # Relationships
     task: Mapped[Task] = relationship("Task", back_populates="agent_runs")
+    log_entries: Mapped[list[AgentRunLog]] = relationship(
+        "AgentRunLog", back_populates="agent_run", cascade="all, delete-orphan"
+    )
@@ -0,0 +1,32 @@
+"""SQLAlchemy AgentRunLog model for persisted agent output."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.database import Base
+
+if TYPE_CHECKING:
+    from src.models.agent_run import AgentRun
+
+
+class AgentRunLog(Base):
+    """Single log entry of an agent run (append-only)."""
+
+    __tablename__ = "agent_run_logs"
+
+    # Autoincrement id doubles as the pagination cursor
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    agent_run_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("agent_runs.id"), nullable=False, index=True
+    )
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    type: Mapped[str] = mapped_column(String(50))
+    content: Mapped[str] = mapped_column(Text)  # Full, untruncated content
+
+    # Relationships
+    agent_run: Mapped[AgentRun] = relationship("AgentRun", back_populates="log_entries")
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, String, func
+from sqlalchemy import DateTime, Integer, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -18,6 +18,7 @@ class Project(Base):
     """Project container with workspace path for agent execution."""
 
     __tablename__ = "projects"
+    __mapper_args__ = {"eager_defaults": True}  # Fetch version via RETURNING
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -26,6 +27,10 @@ class Project(Base):
         DateTime(timezone=True),
         server_default=func.now(),
     )
+    # Bumped in SQL on every UPDATE; feeds ETags for conditional GETs
+    version: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", onupdate=text("version + 1")
+    )
 
     # Relationships
     tasks: Mapped[list[Task]] = relationship(
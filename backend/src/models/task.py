@@ -6,7 +6,17 @@ from datetime import datetime
 from enum import StrEnum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, JSON, String, Text, func
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -46,18 +56,38 @@ class Task(Base):
     """Task model with project association and agent support."""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Subtask listing/execution and per-project boards, ordered by age
+        Index("ix_tasks_parent_id_created_at", "parent_id", "created_at"),
+        Index("ix_tasks_project_id_created_at", "project_id", "created_at"),
+        Index("ix_tasks_status", "status"),
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}  # Fetch version via RETURNING
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     result: Mapped[str | None] = mapped_column(Text, nullable=True)  # Agent result
     steps: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True, default=None)
+    # IDs of sibling subtasks that must be DONE before this one runs
+    depends_on: Mapped[list[str] | None] = mapped_column(
+        JSON, nullable=True, default=None
+    )
+    # Per-task run limits (max_turns, max_wall_seconds, max_tokens)
+    budget: Mapped[dict[str, int] | None] = mapped_column(
+        JSON, nullable=True, default=None
+    )
     status: Mapped[str] = mapped_column(String(20), default=TaskStatus.TODO)
     type: Mapped[str] = mapped_column(String(20), default=TaskType.NEUTRAL)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
     )
+    # Bumped in SQL on every UPDATE; feeds ETags for conditional GETs
+    version: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", onupdate=text("version + 1")
+    )
 
     # Delegation fields (Phase 11B)
     sandbox_dir: Mapped[str | None] = mapped_column(String(512), nullable=True)
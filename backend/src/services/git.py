@@ -1,43 +1,437 @@
-"""Git operations for task checkpoints."""
+"""Git operations for task checkpoints.
 
-import subprocess
+Git runs in child processes via asyncio, so a slow `git add -A` on a large
+repo never blocks the event loop (and with it every API request and SSE
+stream). Operations that touch a workspace's index hold that workspace's
+lock, so concurrent runs in one repo take turns instead of racing on
+`.git/index.lock`.
+
+Functions:
+    run_git: Run a git command asynchronously and capture its output
+    workspace_lock: asyncio.Lock serialising git writes per workspace
+    checkpoint_ref: Ref name holding a task's latest checkpoint
+    create_checkpoint: Snapshot the workspace before a task runs
+    restore_checkpoint: Reset the working tree to a task's checkpoint
+    create_worktree: Check out a private worktree for one agent run
+    merge_worktree: Apply a worktree run's changes to the workspace
+    remove_worktree: Delete a run's worktree (and optionally its branch)
+    create_commit: Commit all changes after a task succeeds
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import weakref
+from dataclasses import dataclass
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+GIT_TIMEOUT = float(os.environ.get("GIT_TIMEOUT", "30"))
+# "ref": snapshot commits under refs/kanban/checkpoints (default)
+# "commit": commit all changes on the working branch (previous behaviour)
+GIT_CHECKPOINT_MODE = os.environ.get("GIT_CHECKPOINT_MODE", "ref")
+
+CHECKPOINT_REF_PREFIX = "refs/kanban/checkpoints"
+WORKTREE_BRANCH_PREFIX = "kanban/run-"
+WORKTREE_DIR = "kanban-worktrees"  # Inside the repository's git dir
+CHECKPOINT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "Kanban Orchestrator",
+    "GIT_AUTHOR_EMAIL": "kanban@localhost",
+    "GIT_COMMITTER_NAME": "Kanban Orchestrator",
+    "GIT_COMMITTER_EMAIL": "kanban@localhost",
+}
+
+# One lock per resolved workspace path; dropped once no coroutine holds it
+_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+
+@dataclass
+class GitResult:
+    """Outcome of a git command (returncode -1: failed to run or timed out)."""
+
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
 
-def _run_git_command(cmd: list[str], cwd: Path, timeout: int = 30) -> bool:
-    """Run git command with error handling.
 
-    Returns True on success or exit code 1 (nothing to commit).
-    Returns False on error or timeout.
+def workspace_lock(workspace: Path) -> asyncio.Lock:
+    """Lock serialising index-changing git commands in one workspace."""
+    key = str(Path(workspace).resolve())
+    lock = _locks.get(key)
+    if lock is None:
+        lock = _locks[key] = asyncio.Lock()
+    return lock
+
+
+async def _kill(process: asyncio.subprocess.Process) -> None:
+    """Kill git and its children (hooks would otherwise hold the pipes open)."""
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(process.pid, signal.SIGKILL)
+    await process.wait()
+
+
+async def run_git(
+    args: list[str],
+    cwd: Path,
+    timeout: float | None = None,
+    env: dict[str, str] | None = None,
+    input: bytes | None = None,
+) -> GitResult:
+    """Run `git <args>` in cwd without blocking the event loop.
+
+    The process is killed if it outlives the timeout (GIT_TIMEOUT default).
+    env entries are added to the inherited environment; input is fed to
+    stdin.
     """
     try:
-        result = subprocess.run(
-            cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            cwd=cwd,
+            env={**os.environ, **env} if env else None,
+            stdin=asyncio.subprocess.DEVNULL
+            if input is None
+            else asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
         )
+    except (FileNotFoundError, NotADirectoryError) as e:
+        return GitResult(-1, stderr=str(e))
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(input), timeout or GIT_TIMEOUT
+        )
+    except TimeoutError:
+        logger.warning("git %s timed out in %s", args[0], cwd)
+        await _kill(process)
+        return GitResult(-1, stderr="timed out")
+    except asyncio.CancelledError:
+        await _kill(process)
+        raise
+    return GitResult(
+        process.returncode or 0,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+    )
+
+
+async def _commit_all(workspace: Path, message: str) -> bool:
+    """Stage everything and commit; True on success or nothing to commit."""
+    async with workspace_lock(workspace):
+        if not (await run_git(["add", "-A"], workspace)).ok:
+            return False
+        # Exit code 1: nothing to commit
+        result = await run_git(["commit", "-m", message], workspace)
         return result.returncode in (0, 1)
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+
+
+def checkpoint_ref(task_id: str) -> str:
+    """Ref holding the latest checkpoint of a task."""
+    return f"{CHECKPOINT_REF_PREFIX}/{task_id}"
+
+
+async def _git_dir(workspace: Path) -> Path | None:
+    result = await run_git(["rev-parse", "--absolute-git-dir"], workspace)
+    return Path(result.stdout.strip()) if result.ok else None
+
+
+async def _snapshot_tree(workspace: Path, git_dir: Path) -> str | None:
+    """Tree of the working tree, built in a throwaway index.
+
+    Only files under workspace are re-read; the rest of the repository is
+    taken as staged. The index is seeded from the real one so `add -A` can
+    reuse its stat cache; the real index and the checked-out branch are
+    never touched.
+    """
+    fd, name = tempfile.mkstemp(prefix="kanban-index-", dir=git_dir)
+    os.close(fd)
+    index = Path(name)
+    try:
+        real_index = git_dir / "index"
+        if real_index.exists():
+            await asyncio.to_thread(shutil.copyfile, real_index, index)
+        else:
+            index.unlink()  # git treats an empty file as a corrupt index
+        env = {"GIT_INDEX_FILE": str(index)}
+        if not (await run_git(["add", "-A", "--", "."], workspace, env=env)).ok:
+            return None
+        result = await run_git(["write-tree"], workspace, env=env)
+        return result.stdout.strip() if result.ok else None
+    finally:
+        index.unlink(missing_ok=True)
+
+
+async def _create_checkpoint_ref(workspace: Path, task_id: str) -> bool:
+    git_dir = await _git_dir(workspace)
+    if git_dir is None:
         return False
+    tree = await _snapshot_tree(workspace, git_dir)
+    if tree is None:
+        return False
+    head = await run_git(["rev-parse", "--verify", "-q", "HEAD"], workspace)
+    parents = ["-p", head.stdout.strip()] if head.ok else []
+    commit = await run_git(
+        ["commit-tree", tree, *parents, "-m", f"checkpoint: before task-{task_id[:8]}"],
+        workspace,
+        env=CHECKPOINT_IDENTITY,
+    )
+    if not commit.ok:
+        return False
+    ref = await run_git(
+        [
+            "update-ref",
+            "--create-reflog",
+            checkpoint_ref(task_id),
+            commit.stdout.strip(),
+        ],
+        workspace,
+    )
+    return ref.ok
 
 
-def create_checkpoint(workspace: Path, task_id: str) -> bool:
+async def create_checkpoint(workspace: Path, task_id: str) -> bool:
     """Create a git checkpoint before task execution.
 
-    Stages all changes and creates a checkpoint commit.
+    In "ref" mode (default) the workspace is snapshotted into a commit under
+    refs/kanban/checkpoints/<task_id>, leaving branch, index and history
+    alone. In "commit" mode all changes are committed on the current branch
+    (the ref then points at that commit).
     Returns True if successful (or nothing to commit), False on error.
     """
-    if not _run_git_command(["git", "add", "-A"], workspace):
+    if GIT_CHECKPOINT_MODE == "ref":
+        return await _create_checkpoint_ref(workspace, task_id)
+    if not await _commit_all(workspace, f"checkpoint: before task-{task_id[:8]}"):
         return False
-    return _run_git_command(
-        ["git", "commit", "-m", f"checkpoint: before task-{task_id[:8]}"], workspace
+    result = await run_git(["update-ref", checkpoint_ref(task_id), "HEAD"], workspace)
+    return result.ok
+
+
+async def restore_checkpoint(workspace: Path, task_id: str) -> str | None:
+    """Reset the workspace's files to a task's checkpoint.
+
+    Files changed or deleted since the checkpoint are rewritten from it,
+    files added since are removed (ignored files are left alone). Only
+    paths under workspace are touched, also when it is a subdirectory of
+    the repository. HEAD and the index are not moved.
+
+    Returns:
+        The checkpoint commit hash, or None if the task has no checkpoint.
+
+    Raises:
+        ValueError: If the workspace is not a git repository or git fails.
+    """
+    ref = checkpoint_ref(task_id)
+    commit = await run_git(
+        ["rev-parse", "--verify", "-q", f"{ref}^{{commit}}"], workspace
     )
+    if not commit.ok:
+        return None
+    checkpoint = commit.stdout.strip()
+    git_dir = await _git_dir(workspace)
+    prefix = await run_git(["rev-parse", "--show-prefix"], workspace)
+    if git_dir is None or not prefix.ok:
+        raise ValueError(f"Not a git repository: {workspace}")
+    # Limit the diff to the workspace, with paths relative to it
+    relative = [f"--relative={prefix.stdout.strip()}"] if prefix.stdout.strip() else []
+
+    async with workspace_lock(workspace):
+        current = await _snapshot_tree(workspace, git_dir)
+        if current is None:
+            raise ValueError("Could not snapshot the working tree")
+        diff = await run_git(
+            [
+                "diff-tree",
+                "-r",
+                "-z",
+                "--no-renames",
+                "--name-status",
+                *relative,
+                checkpoint,
+                current,
+            ],
+            workspace,
+        )
+        if not diff.ok:
+            raise ValueError(f"git diff-tree failed: {diff.stderr.strip()}")
+        fields = diff.stdout.split("\0")
+        changes = list(zip(fields[0::2], fields[1::2], strict=False))
+        added = [path for status, path in changes if status == "A"]
+        restore = [path for status, path in changes if status != "A"]
+
+        try:
+            await asyncio.to_thread(_remove_files, workspace, added)
+        except OSError as e:
+            raise ValueError(f"Could not remove added files: {e}") from e
+        if restore:
+            await _checkout_paths(workspace, git_dir, checkpoint, restore)
+    logger.info(
+        "Restored checkpoint %s: %d rewritten, %d removed",
+        checkpoint[:8],
+        len(restore),
+        len(added),
+    )
+    return checkpoint
+
 
+def _remove_files(workspace: Path, paths: list[str]) -> None:
+    """Delete files and any directories they leave empty."""
+    root = workspace.resolve()
+    for path in paths:
+        file = root / path
+        file.unlink(missing_ok=True)
+        for parent in file.parents:
+            if parent == root or any(parent.iterdir()):
+                break
+            parent.rmdir()
 
-def create_commit(workspace: Path, message: str) -> bool:
+
+async def _checkout_paths(
+    workspace: Path, git_dir: Path, commit: str, paths: list[str]
+) -> None:
+    """Write paths from commit into the working tree via a temporary index."""
+    fd, name = tempfile.mkstemp(prefix="kanban-index-", dir=git_dir)
+    os.close(fd)
+    index = Path(name)
+    index.unlink()
+    env = {"GIT_INDEX_FILE": str(index)}
+    try:
+        if not (await run_git(["read-tree", commit], workspace, env=env)).ok:
+            raise ValueError("git read-tree failed")
+        result = await run_git(
+            ["checkout-index", "-f", "-z", "--stdin"],
+            workspace,
+            env=env,
+            input="\0".join(paths).encode(),
+        )
+        if not result.ok:
+            raise ValueError(f"git checkout-index failed: {result.stderr.strip()}")
+    finally:
+        index.unlink(missing_ok=True)
+
+
+async def create_commit(workspace: Path, message: str) -> bool:
     """Create a git commit after successful task completion.
 
     Stages all changes and commits with the given message.
     Returns True if successful (or nothing to commit), False on error.
     """
-    if not _run_git_command(["git", "add", "-A"], workspace):
+    return await _commit_all(workspace, message)
+
+
+@dataclass
+class Worktree:
+    """Private checkout of one agent run."""
+
+    path: Path
+    branch: str
+    base: str  # Commit the run started from
+    toplevel: Path  # Root of the workspace's own checkout
+    prefix: str = ""  # Workspace directory relative to the repository root
+
+    @property
+    def cwd(self) -> Path:
+        """Directory in the worktree that corresponds to the workspace."""
+        return self.path / self.prefix
+
+
+async def create_worktree(
+    workspace: Path, run_id: str, base: str = "HEAD"
+) -> Worktree | None:
+    """Check out base into a new worktree on branch kanban/run-<run_id>.
+
+    Pass a checkpoint ref as base so the run also sees uncommitted changes.
+    Returns None if the workspace is not a git repository or git fails.
+    """
+    common = await run_git(
+        ["rev-parse", "--path-format=absolute", "--git-common-dir"], workspace
+    )
+    commit = await run_git(
+        ["rev-parse", "--verify", "-q", f"{base}^{{commit}}"], workspace
+    )
+    top = await run_git(["rev-parse", "--show-toplevel", "--show-prefix"], workspace)
+    if not (common.ok and commit.ok and top.ok):
+        return None
+    toplevel, prefix = (top.stdout.split("\n") + [""])[:2]
+    worktree = Worktree(
+        path=Path(common.stdout.strip()) / WORKTREE_DIR / run_id,
+        branch=f"{WORKTREE_BRANCH_PREFIX}{run_id}",
+        base=commit.stdout.strip(),
+        toplevel=Path(toplevel),
+        prefix=prefix,
+    )
+    async with workspace_lock(workspace):
+        result = await run_git(
+            [
+                "worktree",
+                "add",
+                "-q",
+                "-b",
+                worktree.branch,
+                str(worktree.path),
+                worktree.base,
+            ],
+            workspace,
+        )
+    if not result.ok:
+        logger.warning("git worktree add failed: %s", result.stderr.strip())
+        return None
+    return worktree
+
+
+async def merge_worktree(workspace: Path, worktree: Worktree, message: str) -> bool:
+    """Commit the run's changes on its branch and apply them to the workspace.
+
+    The patch (base..branch) is applied to the workspace's working tree
+    atomically; if it does not apply cleanly nothing is changed and False
+    is returned, leaving the branch for manual review.
+    """
+    if not (await run_git(["add", "-A"], worktree.path)).ok:
         return False
-    return _run_git_command(["git", "commit", "-m", message], workspace)
+    commit = await run_git(["commit", "-q", "-m", message], worktree.path)
+    if commit.returncode not in (0, 1):
+        return False
+    # Patch goes through a file: run_git output is decoded text
+    fd, name = tempfile.mkstemp(prefix="kanban-run-", suffix=".patch")
+    os.close(fd)
+    patch = Path(name)
+    try:
+        diff = await run_git(
+            ["diff", "--binary", f"--output={patch}", worktree.base, "HEAD"],
+            worktree.path,
+        )
+        if not diff.ok:
+            return False
+        if patch.stat().st_size == 0:
+            return True
+        async with workspace_lock(workspace):
+            result = await run_git(["apply", "--binary", str(patch)], worktree.toplevel)
+    finally:
+        patch.unlink(missing_ok=True)
+    if not result.ok:
+        logger.warning(
+            "Run changes do not apply to %s, kept on %s: %s",
+            workspace,
+            worktree.branch,
+            result.stderr.strip(),
+        )
+    return result.ok
+
+
+async def remove_worktree(
+    workspace: Path, worktree: Worktree, delete_branch: bool = True
+) -> None:
+    """Remove a run's worktree; the branch is kept unless delete_branch."""
+    async with workspace_lock(workspace):
+        await run_git(["worktree", "remove", "--force", str(worktree.path)], workspace)
+        if delete_branch:
+            await run_git(["branch", "-D", worktree.branch], workspace)
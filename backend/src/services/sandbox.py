@@ -0,0 +1,360 @@
+"""Task sandbox directories (output/<task_id>/).
+
+Sandboxes are created on first agent use, not with the task, and removed
+with it. SandboxCollector sweeps output/ in the background: sandboxes
+without a task, empty ones and ones untouched for SANDBOX_MAX_AGE_DAYS are
+removed, then the oldest are evicted until each project fits
+SANDBOX_PROJECT_QUOTA_MB. Sandboxes of tasks that are in progress or have a
+queued or running agent run are never touched.
+
+Functions:
+    ensure_sandbox: Create a task's sandbox directory if needed
+    remove_sandboxes: Delete sandbox directories
+    sync_tree: Incrementally copy a sandbox into its target directory
+    collect_sandboxes: One garbage-collection sweep over output/
+"""
+
+import asyncio
+import contextlib
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database import AsyncSessionLocal
+from src.models.agent_run import AgentRun, AgentRunStatus
+from src.models.task import Task, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# Sandbox output directory base
+OUTPUT_DIR = Path("output")
+
+SANDBOX_GC_INTERVAL = float(os.environ.get("SANDBOX_GC_INTERVAL", "3600"))
+SANDBOX_MAX_AGE_DAYS = float(os.environ.get("SANDBOX_MAX_AGE_DAYS", "30"))
+# Per project; 0 disables the quota
+SANDBOX_PROJECT_QUOTA_MB = float(os.environ.get("SANDBOX_PROJECT_QUOTA_MB", "1024"))
+
+_ID_CHUNK = 500  # Task IDs per IN (...) query
+
+# How changed files reach the target:
+#   auto     - reflink (copy-on-write clone) where supported, else copy
+#   copy     - always copy the bytes
+#   hardlink - hard link (same filesystem only, else copy); target and
+#              sandbox then share the file, so later sandbox edits show up
+SANDBOX_SYNC_MODE = os.environ.get("SANDBOX_SYNC_MODE", "auto")
+
+_FICLONE = 0x40049409  # linux/fs.h
+
+
+@dataclass
+class SyncReport:
+    """What a sync did."""
+
+    files_copied: int = 0
+    files_linked: int = 0  # Hard links and reflinks (no data copied)
+    files_unchanged: int = 0
+    bytes_copied: int = 0
+
+
+def _same_content(a: Path, b: Path) -> bool:
+    """Compare two files of equal size by content hash."""
+    digests = []
+    for path in (a, b):
+        with path.open("rb") as f:
+            digests.append(hashlib.file_digest(f, "blake2b").digest())
+    return digests[0] == digests[1]
+
+
+def _unchanged(source: Path, target: Path) -> bool:
+    """Size + mtime first; equal sizes with other mtimes are hashed."""
+    try:
+        dst = target.stat()
+    except FileNotFoundError:
+        return False
+    src = source.stat()
+    if src.st_size != dst.st_size:
+        return False
+    if src.st_mtime_ns == dst.st_mtime_ns:
+        return True
+    if not _same_content(source, target):
+        return False
+    shutil.copystat(source, target)  # Next sync takes the fast path
+    return True
+
+
+def _reflink(source: Path, target: Path) -> bool:
+    """Clone source to target (copy-on-write); False if unsupported."""
+    if sys.platform != "linux":
+        return False
+    import fcntl
+
+    with source.open("rb") as src, target.open("wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError as e:
+            if e.errno in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY):
+                return False
+            raise
+    shutil.copystat(source, target)
+    return True
+
+
+def _transfer(source: Path, target: Path, mode: str, report: SyncReport) -> None:
+    """Replace target with source atomically (temp file + rename)."""
+    tmp = target.with_name(f".{target.name}.sync-tmp")
+    tmp.unlink(missing_ok=True)  # Left over from an interrupted sync
+    try:
+        if mode == "hardlink":
+            try:
+                os.link(source, tmp)
+            except OSError:
+                pass  # Other filesystem (EXDEV) or no link support: copy
+            else:
+                os.replace(tmp, target)
+                report.files_linked += 1
+                return
+        elif mode == "auto" and _reflink(source, tmp):
+            os.replace(tmp, target)
+            report.files_linked += 1
+            return
+        shutil.copy2(source, tmp)
+        os.replace(tmp, target)
+        report.files_copied += 1
+        report.bytes_copied += source.stat().st_size
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def sync_tree(source: Path, target: Path, mode: str = SANDBOX_SYNC_MODE) -> SyncReport:
+    """Copy source's files into target, skipping files that are unchanged.
+
+    Blocking; call it via asyncio.to_thread from async code. Files only in
+    target are left alone.
+    """
+    report = SyncReport()
+    for dirpath, dirnames, filenames in os.walk(source, followlinks=True):
+        directory = Path(dirpath)
+        dest = target / directory.relative_to(source)
+        dest.mkdir(parents=True, exist_ok=True)
+        dirnames.sort()
+        for name in sorted(filenames):
+            src_file, dst_file = directory / name, dest / name
+            if not src_file.is_file():
+                continue  # Broken symlink, socket, ...
+            if _unchanged(src_file, dst_file):
+                report.files_unchanged += 1
+            else:
+                _transfer(src_file, dst_file, mode, report)
+    return report
+
+
+def ensure_sandbox(sandbox_dir: str | None) -> Path | None:
+    """Create the sandbox directory on first use and return its absolute path."""
+    if not sandbox_dir:
+        return None
+    path = Path(sandbox_dir).resolve()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def remove_sandboxes(sandbox_dirs: Iterable[str | None]) -> None:
+    """Delete sandbox directories (missing ones are ignored). Blocking."""
+    for sandbox_dir in sandbox_dirs:
+        if sandbox_dir:
+            shutil.rmtree(sandbox_dir, ignore_errors=True)
+
+
+@dataclass
+class _Sandbox:
+    path: Path
+    task_id: str
+    size: int
+    mtime: float  # Latest mtime of the directory and anything in it
+
+
+@dataclass
+class GCReport:
+    """What a collection sweep removed."""
+
+    removed: list[str] = field(default_factory=list)  # Task IDs
+    bytes_freed: int = 0
+
+
+def _measure(path: str) -> tuple[int, float]:
+    """Total file size and latest mtime under a sandbox directory. Blocking."""
+    size, mtime = 0, os.stat(path).st_mtime
+    for dirpath, _, filenames in os.walk(path):
+        with contextlib.suppress(OSError):
+            mtime = max(mtime, os.stat(dirpath).st_mtime)
+        for name in filenames:
+            with contextlib.suppress(OSError):
+                stat = os.lstat(os.path.join(dirpath, name))
+                size += stat.st_size
+                mtime = max(mtime, stat.st_mtime)
+    return size, mtime
+
+
+def _scan(root: Path) -> list[_Sandbox]:
+    """Size and last activity of every sandbox under root. Blocking."""
+    sandboxes = []
+    with contextlib.suppress(FileNotFoundError), os.scandir(root) as entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            size, mtime = _measure(entry.path)
+            sandboxes.append(_Sandbox(Path(entry.path), entry.name, size, mtime))
+    return sandboxes
+
+
+def _remove_idle(sandboxes: list[_Sandbox], since: float) -> list[_Sandbox]:
+    """Delete sandboxes not modified after since; return the ones deleted.
+
+    Blocking. Each sandbox is re-measured right before deletion, so one an
+    agent started writing to during the sweep is spared.
+    """
+    removed = []
+    for sandbox in sandboxes:
+        try:
+            _, mtime = _measure(str(sandbox.path))
+        except FileNotFoundError:
+            continue  # Already gone (task deleted meanwhile)
+        if mtime > since:
+            continue
+        shutil.rmtree(sandbox.path, ignore_errors=True)
+        removed.append(sandbox)
+    return removed
+
+
+async def _load_owners(
+    db: AsyncSession, task_ids: list[str]
+) -> tuple[dict[str, str | None], set[str]]:
+    """Project of each existing task, and the IDs of busy tasks."""
+    projects: dict[str, str | None] = {}
+    busy: set[str] = set()
+    for start in range(0, len(task_ids), _ID_CHUNK):
+        chunk = task_ids[start : start + _ID_CHUNK]
+        rows = await db.execute(
+            select(Task.id, Task.project_id, Task.status).where(Task.id.in_(chunk))
+        )
+        for task_id, project_id, status in rows:
+            projects[task_id] = project_id
+            if status == TaskStatus.IN_PROGRESS:
+                busy.add(task_id)
+        runs = await db.execute(
+            select(AgentRun.task_id).where(
+                AgentRun.task_id.in_(chunk),
+                AgentRun.status.in_([AgentRunStatus.PENDING, AgentRunStatus.RUNNING]),
+            )
+        )
+        busy.update(runs.scalars())
+    return projects, busy
+
+
+async def collect_sandboxes(
+    db: AsyncSession,
+    root: Path = OUTPUT_DIR,
+    max_age_days: float = SANDBOX_MAX_AGE_DAYS,
+    project_quota_mb: float = SANDBOX_PROJECT_QUOTA_MB,
+) -> GCReport:
+    """Remove orphaned, empty, expired and over-quota sandboxes under root.
+
+    A run can be claimed while the sweep is in progress, so busy status is
+    re-checked before deleting, and sandboxes modified since the sweep
+    started are skipped.
+    """
+    sweep_start = time.time()
+    sandboxes = await asyncio.to_thread(_scan, root)
+    projects, busy = await _load_owners(db, [s.task_id for s in sandboxes])
+    cutoff = time.time() - max_age_days * 86400
+
+    doomed: list[_Sandbox] = []
+    kept: dict[str | None, list[_Sandbox]] = defaultdict(list)
+    for sandbox in sandboxes:
+        if sandbox.task_id in busy:
+            kept[projects[sandbox.task_id]].append(sandbox)
+        elif (
+            sandbox.task_id not in projects
+            or sandbox.size == 0
+            or sandbox.mtime < cutoff
+        ):
+            doomed.append(sandbox)
+        else:
+            kept[projects[sandbox.task_id]].append(sandbox)
+
+    quota = int(project_quota_mb * 1024 * 1024)
+    if quota > 0:
+        for project_sandboxes in kept.values():
+            total = sum(s.size for s in project_sandboxes)
+            for sandbox in sorted(project_sandboxes, key=lambda s: s.mtime):
+                if total <= quota:
+                    break
+                if sandbox.task_id not in busy:
+                    doomed.append(sandbox)
+                    total -= sandbox.size
+
+    if doomed:
+        _, busy = await _load_owners(db, [s.task_id for s in doomed])
+        doomed = [s for s in doomed if s.task_id not in busy]
+    doomed = await asyncio.to_thread(_remove_idle, doomed, sweep_start)
+    report = GCReport(
+        removed=[s.task_id for s in doomed],
+        bytes_freed=sum(s.size for s in doomed),
+    )
+    if doomed:
+        logger.info(
+            "Sandbox GC removed %d sandboxes (%d bytes)",
+            len(report.removed),
+            report.bytes_freed,
+        )
+    return report
+
+
+class SandboxCollector:
+    """Runs collect_sandboxes every interval seconds in the background."""
+
+    def __init__(
+        self,
+        interval: float = SANDBOX_GC_INTERVAL,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        self.interval = interval
+        self.session_factory = session_factory
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._serve())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run_once(self) -> GCReport:
+        async with self.session_factory() as db:
+            return await collect_sandboxes(db)
+
+    async def _serve(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Sandbox GC failed")
+            await asyncio.sleep(self.interval)
+
+
+# Global collector instance
+sandbox_collector = SandboxCollector()
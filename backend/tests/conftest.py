@@ -13,6 +13,8 @@ from sqlalchemy.ext.asyncio import (
 
 # Set in-memory database BEFORE importing app
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+# Agent tests fake the SDK; don't start real MCP servers for them
+os.environ["MCP_POOL_ENABLED"] = "false"
 
 from main import app  # noqa: E402
 from src.database import Base, get_db  # noqa: E402
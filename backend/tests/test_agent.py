@@ -4,6 +4,9 @@ from unittest.mock import MagicMock
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.api.agent_log_service import append_run_logs
 
 
 @pytest.fixture(autouse=True)
@@ -74,6 +77,25 @@ async def test_start_agent_run_conflict(client: AsyncClient) -> None:
     assert "already has an active agent run" in response2.json()["detail"]
 
 
+async def test_start_agent_run_queue_position(client: AsyncClient) -> None:
+    """Queued runs report their position; higher priority goes first."""
+    ids = []
+    for title in ("Queued 1", "Queued 2"):
+        task_response = await client.post("/api/tasks", json={"title": title})
+        ids.append(task_response.json()["id"])
+
+    first = await client.post("/api/agent/run", json={"task_id": ids[0]})
+    assert first.json()["queue_position"] == 1
+    urgent = await client.post(
+        "/api/agent/run", json={"task_id": ids[1], "priority": 10}
+    )
+    assert urgent.json()["priority"] == 10
+    assert urgent.json()["queue_position"] == 1
+
+    response = await client.get(f"/api/agent/runs/{first.json()['id']}")
+    assert response.json()["queue_position"] == 2
+
+
 async def test_get_agent_run_not_found(client: AsyncClient) -> None:
     """GET /api/agent/runs/{id} returns 404 for unknown ID."""
     response = await client.get("/api/agent/runs/nonexistent-id")
@@ -87,7 +109,7 @@ async def test_stop_agent_not_found(client: AsyncClient) -> None:
 
 
 async def test_stop_agent_not_running(client: AsyncClient) -> None:
-    """POST /api/agent/stop returns 400 when agent is not running."""
+    """POST /api/agent/stop cancels a queued run; a finished one returns 400."""
     # Create task and start run (status will be PENDING)
     task_response = await client.post("/api/tasks", json={"title": "Stop Test"})
     task_id = task_response.json()["id"]
@@ -95,7 +117,12 @@ async def test_stop_agent_not_running(client: AsyncClient) -> None:
     run_response = await client.post("/api/agent/run", json={"task_id": task_id})
     run_id = run_response.json()["id"]
 
-    # Try to stop a PENDING agent (not RUNNING)
+    # A PENDING run is still in the queue and can be cancelled
+    response = await client.post(f"/api/agent/stop/{run_id}")
+    assert response.status_code == 200
+    assert response.json() == {"success": True, "status": "cancelled"}
+
+    # Once cancelled there is nothing left to stop
     response = await client.post(f"/api/agent/stop/{run_id}")
     assert response.status_code == 400
     assert "not running" in response.json()["detail"]
@@ -144,3 +171,78 @@ async def test_get_agent_run(client: AsyncClient) -> None:
     assert data["id"] == run_id
     assert data["task_id"] == task_id
     assert data["status"] == "pending"
+
+
+async def test_get_agent_run_etag(client: AsyncClient) -> None:
+    """GET /api/agent/runs/{id} honours If-None-Match."""
+    task_response = await client.post("/api/tasks", json={"title": "ETag Run"})
+    run_response = await client.post(
+        "/api/agent/run", json={"task_id": task_response.json()["id"]}
+    )
+    run_id = run_response.json()["id"]
+
+    etag = (await client.get(f"/api/agent/runs/{run_id}")).headers["ETag"]
+    response = await client.get(
+        f"/api/agent/runs/{run_id}", headers={"If-None-Match": f'W/{etag}, "other"'}
+    )
+    assert response.status_code == 304
+
+
+async def test_get_agent_run_logs_not_found(client: AsyncClient) -> None:
+    """GET /api/agent/runs/{id}/logs returns 404 for unknown run."""
+    response = await client.get("/api/agent/runs/nonexistent-id/logs")
+    assert response.status_code == 404
+
+
+async def test_get_agent_run_logs_paginated(client: AsyncClient, db_engine) -> None:
+    """Persisted logs are returned oldest first with an `after` cursor."""
+    task_response = await client.post("/api/tasks", json={"title": "Logs Test"})
+    run_response = await client.post(
+        "/api/agent/run", json={"task_id": task_response.json()["id"]}
+    )
+    run_id = run_response.json()["id"]
+
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    entries = [
+        {
+            "timestamp": "2026-01-01T00:00:00+00:00",
+            "type": "text",
+            "content": "x" * 900,
+        },
+        {"timestamp": "2026-01-01T00:00:01+00:00", "type": "tool", "content": "b"},
+        {"timestamp": "2026-01-01T00:00:02+00:00", "type": "result", "content": "c"},
+    ]
+    assert await append_run_logs(run_id, entries, session_factory)
+
+    response = await client.get(f"/api/agent/runs/{run_id}/logs?limit=2")
+    assert response.status_code == 200
+    page = response.json()
+    assert [e["type"] for e in page["entries"]] == ["text", "tool"]
+    assert len(page["entries"][0]["content"]) == 900  # Not truncated
+    assert page["next_after"] == page["entries"][1]["id"]
+
+    response = await client.get(
+        f"/api/agent/runs/{run_id}/logs?after={page['next_after']}&limit=2"
+    )
+    page = response.json()
+    assert [e["type"] for e in page["entries"]] == ["result"]
+    assert page["next_after"] is None
+
+
+async def test_execute_rejects_dependency_cycle(client: AsyncClient) -> None:
+    """POST /api/agent/execute/{id} returns 400 for cyclic subtask deps."""
+    parent = (await client.post("/api/tasks", json={"title": "Parent"})).json()
+    a = (
+        await client.post("/api/tasks", json={"title": "A", "parent_id": parent["id"]})
+    ).json()
+    b = (
+        await client.post(
+            "/api/tasks",
+            json={"title": "B", "parent_id": parent["id"], "depends_on": [a["id"]]},
+        )
+    ).json()
+    await client.put(f"/api/tasks/{a['id']}", json={"depends_on": [b["id"]]})
+
+    response = await client.post(f"/api/agent/execute/{parent['id']}")
+    assert response.status_code == 400
+    assert "cycle" in response.json()["detail"]
@@ -0,0 +1,189 @@
+"""Agent run budget tests."""
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from claude_agent_sdk.types import ResultMessage, StreamEvent
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.agents import executor
+from src.agents.budget import RunBudget, RunUsage
+from src.agents.executor import execute_agent_run
+from src.api.routes.settings import AgentSettings, BackendSettings
+from src.models.agent_run import AgentRun, AgentRunStatus
+from src.models.project import Project
+from src.models.task import Task, TaskStatus
+
+
+def _event(kind: str, **usage: int) -> StreamEvent:
+    """API stream event carrying a usage block."""
+    event: dict[str, Any] = {"type": kind}
+    if kind == "message_start":
+        event["message"] = {"usage": usage}
+    else:
+        event["usage"] = usage
+    return StreamEvent(uuid="u", session_id="s", event=event)
+
+
+def _result(subtype: str = "success", **usage: int) -> ResultMessage:
+    return ResultMessage(
+        subtype=subtype,
+        duration_ms=10,
+        duration_api_ms=5,
+        is_error=subtype != "success",
+        num_turns=3,
+        session_id="s",
+        total_cost_usd=0.25,
+        usage=usage,
+        result="done",
+    )
+
+
+def test_resolve_prefers_task_limits() -> None:
+    """Task budget fields override settings; missing ones fall back."""
+    settings = AgentSettings(max_turns=10, max_wall_seconds=600)
+
+    budget = RunBudget.resolve({"max_turns": 3, "max_tokens": None}, settings)
+
+    assert budget == RunBudget(max_turns=3, max_wall_seconds=600, max_tokens=None)
+    assert RunBudget.resolve(None, settings).max_turns == 10
+
+
+def test_usage_counts_streamed_tokens() -> None:
+    """message_delta output counts are cumulative per message."""
+    usage = RunUsage()
+    for event in [
+        _event("message_start", input_tokens=100, cache_creation_input_tokens=20),
+        _event("message_delta", output_tokens=30),
+        _event("message_delta", output_tokens=50),
+        _event("message_start", input_tokens=10, output_tokens=1),
+        _event("message_delta", output_tokens=5),
+    ]:
+        usage.add_stream_event(event.event)
+
+    assert usage.input_tokens == 130
+    assert usage.output_tokens == 55
+
+
+@pytest.fixture
+async def agent_run(db_session: AsyncSession, tmp_path: Path) -> AgentRun:
+    """RUNNING-ready run in a project without a git workspace."""
+    db_session.add(Project(id="p", name="p", workspace_path=str(tmp_path / "none")))
+    db_session.add(Task(id="t", title="Budgeted", project_id="p"))
+    run = AgentRun(id="r", task_id="t", status=AgentRunStatus.PENDING)
+    db_session.add(run)
+    await db_session.commit()
+    return run
+
+
+async def _execute(
+    db: AsyncSession,
+    run: AgentRun,
+    monkeypatch: pytest.MonkeyPatch,
+    fake_query: Callable[..., AsyncGenerator[Any]],
+    budget: dict[str, Any] | None = None,
+) -> None:
+    monkeypatch.setattr(executor, "query", fake_query)
+    task = await db.get(Task, run.task_id)
+    project = await db.get(Project, "p")
+    assert task is not None
+    task.budget = budget
+    await execute_agent_run(db, run, task, project, mcp_tools=["filesystem"])
+
+
+async def test_settings_model_and_turns_reach_the_sdk(
+    db_session: AsyncSession,
+    agent_run: AgentRun,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Global agent settings replace the hardcoded options; usage is recorded."""
+    seen: dict[str, Any] = {}
+
+    async def fake_query(prompt: str, options: Any) -> AsyncGenerator[Any]:
+        seen.update(max_turns=options.max_turns, model=options.model)
+        yield _result(input_tokens=40, output_tokens=2)
+
+    monkeypatch.setattr(
+        executor,
+        "load_settings",
+        lambda: BackendSettings(agent=AgentSettings(max_turns=7, model="m")),
+    )
+    await _execute(db_session, agent_run, monkeypatch, fake_query)
+
+    assert seen == {"max_turns": 7, "model": "m"}
+    assert agent_run.status == AgentRunStatus.COMPLETED
+    assert (agent_run.num_turns, agent_run.input_tokens) == (3, 40)
+    assert (agent_run.output_tokens, agent_run.cost_usd) == (2, 0.25)
+
+
+async def test_token_budget_stops_stream(
+    db_session: AsyncSession,
+    agent_run: AgentRun,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Going over max_tokens mid-stream fails the run and closes the stream."""
+    closed = asyncio.Event()
+
+    async def fake_query(prompt: str, options: Any) -> AsyncGenerator[Any]:
+        assert options.include_partial_messages
+        try:
+            yield _event("message_start", input_tokens=80)
+            yield _event("message_delta", output_tokens=30)
+            yield _result()  # pragma: no cover - budget stops before this
+        finally:
+            closed.set()
+
+    await _execute(
+        db_session, agent_run, monkeypatch, fake_query, budget={"max_tokens": 100}
+    )
+
+    assert closed.is_set()
+    assert agent_run.status == AgentRunStatus.FAILED
+    assert agent_run.budget_exceeded == "tokens"
+    assert agent_run.input_tokens + agent_run.output_tokens == 110
+    task = await db_session.get(Task, "t")
+    assert task is not None
+    assert task.status == TaskStatus.TODO
+
+
+async def test_wall_time_budget(
+    db_session: AsyncSession,
+    agent_run: AgentRun,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A run still streaming at its deadline is failed as wall_time."""
+
+    async def fake_query(prompt: str, options: Any) -> AsyncGenerator[Any]:
+        await asyncio.sleep(10)
+        yield _result()
+
+    await _execute(
+        db_session,
+        agent_run,
+        monkeypatch,
+        fake_query,
+        budget={"max_wall_seconds": 0.05},
+    )
+
+    assert agent_run.status == AgentRunStatus.FAILED
+    assert agent_run.budget_exceeded == "wall_time"
+
+
+async def test_sdk_turn_limit_is_a_budget_failure(
+    db_session: AsyncSession,
+    agent_run: AgentRun,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The SDK's error_max_turns result fails the run instead of completing it."""
+
+    async def fake_query(prompt: str, options: Any) -> AsyncGenerator[Any]:
+        yield _result("error_max_turns")
+
+    await _execute(db_session, agent_run, monkeypatch, fake_query)
+
+    assert agent_run.status == AgentRunStatus.FAILED
+    assert agent_run.budget_exceeded == "turns"
+    assert agent_run.num_turns == 3
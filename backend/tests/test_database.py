@@ -0,0 +1,121 @@
+"""Database configuration tests."""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.database import (
+    Base,
+    SQLiteProfile,
+    _add_missing_columns,
+    _create_missing_indexes,
+    apply_sqlite_profile,
+    sqlite_settings,
+)
+
+
+async def test_sqlite_profile_applied_on_connect(tmp_path: Path) -> None:
+    """Every new connection gets the profile's PRAGMAs."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    apply_sqlite_profile(
+        engine,
+        SQLiteProfile(busy_timeout_ms=1234, cache_size=-2000, temp_store="MEMORY"),
+    )
+    try:
+        settings = await sqlite_settings(engine)
+    finally:
+        await engine.dispose()
+
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == 1  # NORMAL
+    assert settings["busy_timeout"] == 1234
+    assert settings["cache_size"] == -2000
+    assert settings["temp_store"] == 2  # MEMORY
+
+
+def test_sqlite_profile_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    """SQLITE_* environment variables override the defaults."""
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "delete")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "100")
+
+    profile = SQLiteProfile.from_env()
+    assert profile.journal_mode == "delete"
+    assert profile.busy_timeout_ms == 100
+    assert "PRAGMA journal_mode=DELETE" in profile.pragmas()
+
+
+def test_sqlite_profile_rejects_invalid_values() -> None:
+    """Unknown PRAGMA values are rejected before reaching SQL."""
+    with pytest.raises(ValueError, match="journal_mode"):
+        SQLiteProfile(journal_mode="WAL; DROP TABLE tasks")
+
+
+async def _index_names(engine: AsyncEngine) -> set[str]:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index'")
+        )
+        return {row[0] for row in result}
+
+
+async def test_missing_indexes_added_to_existing_tables(db_engine: AsyncEngine) -> None:
+    """Databases created before indexes were declared get them on startup."""
+    async with db_engine.begin() as conn:
+        await conn.execute(text("DROP INDEX ix_tasks_parent_id_created_at"))
+        await conn.execute(text("DROP INDEX ix_agent_runs_task_id_status"))
+    assert "ix_tasks_parent_id_created_at" not in await _index_names(db_engine)
+
+    async with db_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
+
+    names = await _index_names(db_engine)
+    assert "ix_tasks_parent_id_created_at" in names
+    assert "ix_agent_runs_task_id_status" in names
+
+
+async def test_retired_indexes_dropped(db_engine: AsyncEngine) -> None:
+    """Indexes replaced by newer versions do not linger on upgraded databases."""
+    async with db_engine.begin() as conn:
+        await conn.execute(
+            text("CREATE INDEX ix_tasks_created_at ON tasks (created_at)")
+        )
+        await conn.run_sync(_create_missing_indexes)
+
+    names = await _index_names(db_engine)
+    assert "ix_tasks_created_at" not in names
+    assert "ix_tasks_created_at_id" in names
+
+
+async def test_subtask_query_uses_index(db_engine: AsyncEngine) -> None:
+    """Listing subtasks by parent is an index search, not a table scan."""
+    async with db_engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT * FROM tasks "
+                "WHERE parent_id = 'x' ORDER BY created_at"
+            )
+        )
+        plan = " ".join(str(row[-1]) for row in result)
+
+    assert "ix_tasks_parent_id_created_at" in plan
+
+
+async def test_missing_columns_added_to_existing_tables(
+    db_engine: AsyncEngine,
+) -> None:
+    """Columns added to models are added to older databases on startup."""
+    async with db_engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE projects DROP COLUMN version"))
+        await conn.execute(
+            text(
+                "INSERT INTO projects (id, name, workspace_path) "
+                "VALUES ('p1', 'Old', '/tmp')"
+            )
+        )
+        await conn.run_sync(_add_missing_columns)
+        version = await conn.scalar(text("SELECT version FROM projects"))
+
+    assert version == 1
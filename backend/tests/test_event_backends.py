@@ -0,0 +1,134 @@
+"""Cross-process event backend tests."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.api.event_backends import SQLiteEventBackend, create_backend
+from src.api.events import EventBus, EventType, TaskEvent
+
+
+async def _get(queue: asyncio.Queue[TaskEvent]) -> TaskEvent:
+    return await asyncio.wait_for(queue.get(), timeout=2.0)
+
+
+async def test_sqlite_backend_shares_events_between_buses(tmp_path: Path) -> None:
+    """Event published on one bus reaches subscribers of another bus."""
+    path = tmp_path / "events.db"
+    worker1, worker3 = EventBus(), EventBus()
+    await worker1.start(SQLiteEventBackend(path))
+    await worker3.start(SQLiteEventBackend(path))
+    try:
+        local = worker1.subscribe()
+        remote = worker3.subscribe()
+
+        await worker1.publish(TaskEvent(EventType.TASK_CREATED, {"id": "t1"}))
+
+        received_local = await _get(local)
+        received_remote = await _get(remote)
+        assert received_remote.data == {"id": "t1"}
+        assert received_remote.event_id == received_local.event_id
+    finally:
+        await worker1.stop()
+        await worker3.stop()
+
+
+async def test_sqlite_backend_orders_ids_across_buses(tmp_path: Path) -> None:
+    """Ids are global and every bus sees events in the same order."""
+    path = tmp_path / "events.db"
+    bus_a, bus_b = EventBus(), EventBus()
+    await bus_a.start(SQLiteEventBackend(path))
+    await bus_b.start(SQLiteEventBackend(path))
+    try:
+        queue = bus_b.subscribe()
+        await bus_a.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+        await bus_b.publish(TaskEvent(EventType.TASK_UPDATED, {"id": "1"}))
+
+        first, second = await _get(queue), await _get(queue)
+        assert (first.event_type, second.event_type) == (
+            EventType.TASK_CREATED,
+            EventType.TASK_UPDATED,
+        )
+        assert second.event_id == first.event_id + 1
+    finally:
+        await bus_a.stop()
+        await bus_b.stop()
+
+
+async def test_sqlite_backend_resumes_after_restart(tmp_path: Path) -> None:
+    """A restarted bus continues ids and replays from the shared log."""
+    path = tmp_path / "events.db"
+    bus = EventBus()
+    await bus.start(SQLiteEventBackend(path))
+    queue = bus.subscribe()
+    await bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+    await bus.publish(TaskEvent(EventType.TASK_UPDATED, {"id": "1"}))
+    first = (await _get(queue)).event_id
+    last = (await _get(queue)).event_id
+    await bus.stop()
+
+    restarted = EventBus()
+    await restarted.start(SQLiteEventBackend(path))
+    try:
+        assert restarted.stats()["last_event_id"] == last
+        # Ids from before the restart are still in the backfilled buffer
+        resumed = restarted.subscribe(last_event_id=first)
+        replayed = await _get(resumed)
+        assert (replayed.event_type, replayed.event_id) == (
+            EventType.TASK_UPDATED,
+            last,
+        )
+        # A client that connected before the first event gets both
+        early = restarted.subscribe(last_event_id=first - 1)
+        assert (await _get(early)).event_type == EventType.TASK_CREATED
+    finally:
+        await restarted.stop()
+
+
+async def test_sqlite_backend_resyncs_beyond_backfill(tmp_path: Path) -> None:
+    """Events older than the replay buffer still trigger a resync."""
+    path = tmp_path / "events.db"
+    bus = EventBus()
+    await bus.start(SQLiteEventBackend(path))
+    for i in range(3):
+        await bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": str(i)}))
+    await bus.stop()
+
+    restarted = EventBus(replay_size=1)
+    await restarted.start(SQLiteEventBackend(path))
+    try:
+        resumed = restarted.subscribe(
+            last_event_id=restarted.stats()["last_event_id"] - 2
+        )
+        assert (await _get(resumed)).event_type == EventType.RESYNC
+    finally:
+        await restarted.stop()
+
+
+async def test_sqlite_backend_publish_after_stop_raises(tmp_path: Path) -> None:
+    """Publishing on a stopped backend is an error, not a silent assert."""
+    backend = SQLiteEventBackend(tmp_path / "events.db")
+    await backend.start(lambda event: None)
+    await backend.stop()
+
+    with pytest.raises(RuntimeError, match="not started"):
+        await backend.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+
+
+def test_create_backend_memory_default() -> None:
+    """'memory' selects the in-process bus."""
+    assert create_backend("memory") is None
+
+
+def test_create_backend_sqlite(tmp_path: Path) -> None:
+    """sqlite:/// URLs build a SQLite backend for that path."""
+    backend = create_backend(f"sqlite:///{tmp_path}/bus.db")
+    assert isinstance(backend, SQLiteEventBackend)
+    assert backend.path == tmp_path / "bus.db"
+
+
+def test_create_backend_unknown_scheme() -> None:
+    """Unsupported schemes raise ValueError."""
+    with pytest.raises(ValueError, match="Unsupported"):
+        create_backend("redis://localhost")
@@ -1,10 +1,18 @@
 """EventBus tests for SSE event broadcasting."""
 
 import asyncio
+import json
 
 import pytest
 
-from src.api.events import EventBus, EventType, TaskEvent
+from src.api.events import (
+    EventBus,
+    EventFilter,
+    EventType,
+    OverflowPolicy,
+    TaskEvent,
+    event_generator,
+)
 
 
 @pytest.fixture
@@ -105,3 +113,235 @@ async def test_unsubscribed_queue_misses_events(event_bus: EventBus) -> None:
 
     # Queue should be empty
     assert queue.empty()
+
+
+async def test_publish_drop_oldest_when_full() -> None:
+    """Full queue discards oldest event and counts the drop."""
+    bus = EventBus(max_queue_size=2, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    queue = bus.subscribe()
+
+    for i in range(3):
+        await bus.publish(TaskEvent(event_type=EventType.AGENT_LOG, data={"n": i}))
+
+    assert queue.qsize() == 2
+    assert queue.dropped == 1
+    assert (await queue.get()).data == {"n": 1}
+    assert (await queue.get()).data == {"n": 2}
+
+
+async def test_publish_coalesces_task_updates() -> None:
+    """Coalesce policy replaces queued update for the same task in place."""
+    bus = EventBus(max_queue_size=2, overflow_policy=OverflowPolicy.COALESCE)
+    queue = bus.subscribe()
+
+    await bus.publish(TaskEvent(EventType.TASK_UPDATED, {"id": "a", "status": "todo"}))
+    await bus.publish(TaskEvent(EventType.TASK_UPDATED, {"id": "b", "status": "todo"}))
+    await bus.publish(TaskEvent(EventType.TASK_UPDATED, {"id": "a", "status": "done"}))
+
+    assert queue.coalesced == 1
+    assert queue.dropped == 0
+    assert (await queue.get()).data == {"id": "a", "status": "done"}
+    assert (await queue.get()).data == {"id": "b", "status": "todo"}
+
+
+async def test_publish_disconnects_slow_subscriber() -> None:
+    """Disconnect policy removes a full subscriber and frees its buffer."""
+    bus = EventBus(max_queue_size=1, overflow_policy=OverflowPolicy.DISCONNECT)
+    slow = bus.subscribe()
+    fast = bus.subscribe(max_size=0)
+
+    await bus.publish(TaskEvent(EventType.AGENT_LOG, {"n": 1}))
+    await bus.publish(TaskEvent(EventType.AGENT_LOG, {"n": 2}))
+
+    assert slow.closed
+    assert slow.empty()
+    assert slow not in bus._queues
+    assert fast.qsize() == 2
+    assert bus.stats()["disconnected"] == 1
+
+
+async def test_stats_reports_queue_depth(event_bus: EventBus) -> None:
+    """stats() exposes per-subscriber depth and drop counters."""
+    queue = event_bus.subscribe()
+    await event_bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+
+    stats = event_bus.stats()
+    assert stats["subscribers"] == 1
+    assert stats["queues"][0]["depth"] == 1
+    assert stats["queues"][0]["dropped"] == 0
+    await queue.get()
+    assert event_bus.stats()["queues"][0]["depth"] == 0
+
+
+async def test_publish_encodes_frame_once(event_bus: EventBus) -> None:
+    """All subscribers share the same pre-encoded SSE frame."""
+    queue1 = event_bus.subscribe()
+    queue2 = event_bus.subscribe()
+
+    await event_bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+
+    frame1 = (await queue1.get()).encode()
+    frame2 = (await queue2.get()).encode()
+    assert frame1 is frame2
+    assert b"\nevent: task_created\ndata: " in frame1
+    assert frame1.endswith(b"\n\n")
+    payload = frame1.split(b"data: ", 1)[1].strip()
+    assert json.loads(payload) == {"id": "1"}
+
+
+async def test_event_generator_yields_frames(event_bus: EventBus) -> None:
+    """event_generator streams the cached frame bytes."""
+    queue = event_bus.subscribe()
+    event = TaskEvent(EventType.TASK_DELETED, {"id": "9"})
+    await event_bus.publish(event)
+
+    stream = event_generator(queue)
+    assert await anext(stream) is event.encode()
+    await stream.aclose()
+
+
+async def test_filtered_subscriber_receives_matching_project(
+    event_bus: EventBus,
+) -> None:
+    """Project filter only delivers events for that project."""
+    queue = event_bus.subscribe(event_filter=EventFilter(project_id="p1"))
+    firehose = event_bus.subscribe()
+
+    await event_bus.publish(
+        TaskEvent(EventType.TASK_CREATED, {"id": "1", "project_id": "p1"})
+    )
+    await event_bus.publish(
+        TaskEvent(EventType.TASK_CREATED, {"id": "2", "project_id": "p2"})
+    )
+
+    assert queue.qsize() == 1
+    assert (await queue.get()).data["id"] == "1"
+    assert firehose.qsize() == 2
+
+
+async def test_filter_by_run_and_type(event_bus: EventBus) -> None:
+    """Run filter combined with event types narrows agent logs."""
+    queue = event_bus.subscribe(
+        event_filter=EventFilter(
+            agent_run_id="r1", event_types=frozenset({EventType.AGENT_LOG})
+        )
+    )
+
+    await event_bus.publish(
+        TaskEvent(EventType.AGENT_LOG, {"task_id": "t", "agent_run_id": "r1"})
+    )
+    await event_bus.publish(
+        TaskEvent(EventType.AGENT_LOG, {"task_id": "t", "agent_run_id": "r2"})
+    )
+    await event_bus.publish(
+        TaskEvent(EventType.TASK_UPDATED, {"id": "t", "agent_run_id": "r1"})
+    )
+
+    assert queue.qsize() == 1
+    assert (await queue.get()).data["agent_run_id"] == "r1"
+
+
+async def test_task_filter_includes_subtasks(event_bus: EventBus) -> None:
+    """Task filter matches the task itself, its subtasks and its logs."""
+    queue = event_bus.subscribe(event_filter=EventFilter(task_id="parent"))
+
+    await event_bus.publish(TaskEvent(EventType.TASK_UPDATED, {"id": "parent"}))
+    await event_bus.publish(
+        TaskEvent(EventType.TASK_CREATED, {"id": "c", "parent_id": "parent"})
+    )
+    await event_bus.publish(TaskEvent(EventType.AGENT_LOG, {"task_id": "parent"}))
+    await event_bus.publish(TaskEvent(EventType.TASK_UPDATED, {"id": "other"}))
+
+    assert queue.qsize() == 3
+
+
+async def test_filter_matches_any_task_in_batch(event_bus: EventBus) -> None:
+    """A tasks_batch event reaches subscribers of any task it contains."""
+    project = event_bus.subscribe(event_filter=EventFilter(project_id="p2"))
+    task = event_bus.subscribe(event_filter=EventFilter(task_id="t3"))
+    other = event_bus.subscribe(event_filter=EventFilter(project_id="p9"))
+
+    await event_bus.publish(
+        TaskEvent(
+            EventType.TASKS_BATCH,
+            {
+                "created": [{"id": "t1", "project_id": "p1"}],
+                "updated": [{"id": "t2", "project_id": "p2"}],
+                "deleted": [{"id": "t3", "project_id": None, "parent_id": None}],
+            },
+        )
+    )
+
+    assert project.qsize() == 1
+    assert task.qsize() == 1
+    assert other.qsize() == 0
+
+
+async def test_unsubscribe_cleans_topic_index(event_bus: EventBus) -> None:
+    """unsubscribe() removes the queue from the topic index."""
+    queue = event_bus.subscribe(event_filter=EventFilter(task_id="t1"))
+    assert ("task", "t1") in event_bus._index
+
+    event_bus.unsubscribe(queue)
+    assert ("task", "t1") not in event_bus._index
+
+
+async def test_publish_assigns_increasing_ids(event_bus: EventBus) -> None:
+    """Events get monotonically increasing ids written into the frame."""
+    queue = event_bus.subscribe()
+    await event_bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+    await event_bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": "2"}))
+
+    first = await queue.get()
+    second = await queue.get()
+    assert second.event_id == first.event_id + 1
+    assert first.encode().startswith(f"id: {first.event_id}\n".encode())
+
+
+async def test_subscribe_replays_missed_events(event_bus: EventBus) -> None:
+    """Reconnecting with last_event_id replays only the gap."""
+    queue = event_bus.subscribe()
+    await event_bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+    seen = await queue.get()
+    event_bus.unsubscribe(queue)
+
+    await event_bus.publish(TaskEvent(EventType.TASK_UPDATED, {"id": "1"}))
+    await event_bus.publish(TaskEvent(EventType.TASK_DELETED, {"id": "1"}))
+
+    resumed = event_bus.subscribe(last_event_id=seen.event_id)
+    assert [(await resumed.get()).event_type for _ in range(2)] == [
+        EventType.TASK_UPDATED,
+        EventType.TASK_DELETED,
+    ]
+    assert resumed.empty()
+
+
+async def test_subscribe_up_to_date_gets_nothing(event_bus: EventBus) -> None:
+    """A client that saw the latest event gets no replay."""
+    await event_bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+    last_id = event_bus.stats()["last_event_id"]
+
+    queue = event_bus.subscribe(last_event_id=last_id)
+    assert queue.empty()
+
+
+async def test_subscribe_resync_when_gap_evicted() -> None:
+    """Gap older than the replay buffer yields a single resync event."""
+    bus = EventBus(replay_size=2)
+    queue = bus.subscribe()
+    await bus.publish(TaskEvent(EventType.TASK_CREATED, {"id": "1"}))
+    seen = await queue.get()
+    for i in range(3):
+        await bus.publish(TaskEvent(EventType.TASK_UPDATED, {"id": str(i)}))
+
+    resumed = bus.subscribe(last_event_id=seen.event_id)
+    assert resumed.qsize() == 1
+    resync = await resumed.get()
+    assert resync.event_type == EventType.RESYNC
+    assert resync.event_id == bus.stats()["last_event_id"]
+
+
+async def test_subscribe_resync_for_unknown_id(event_bus: EventBus) -> None:
+    """An id from another process (or the future) forces a resync."""
+    queue = event_bus.subscribe(last_event_id=1)
+    assert (await queue.get()).event_type == EventType.RESYNC
@@ -0,0 +1,130 @@
+"""Filesystem MCP server fast-start tests."""
+
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.shared.version import SUPPORTED_PROTOCOL_VERSIONS
+
+from src.mcp_servers.filesystem import fast
+from src.mcp_servers.filesystem.bench import MODULE, time_to_list_tools
+from src.mcp_servers.filesystem.server import build_server
+
+# Measured ~5 ms import / ~90 ms spawn-to-tools/list; FastMCP takes ~1 s
+IMPORT_BUDGET_SECONDS = 0.2
+STARTUP_BUDGET_SECONDS = 0.5
+
+IMPORT_PROBE = """\
+import sys, time
+start = time.perf_counter()
+import src.mcp_servers.filesystem.server, src.mcp_servers.filesystem.fast
+elapsed = time.perf_counter() - start
+print(elapsed, any(m == "mcp" or m.startswith("mcp.") for m in sys.modules))
+"""
+
+
+def test_fast_path_import_budget() -> None:
+    """The stdio fast path imports no mcp modules and stays within budget."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    assert output[1] == "False"
+    assert float(output[0]) < IMPORT_BUDGET_SECONDS
+
+
+def test_time_to_first_list_tools(tmp_path: Path) -> None:
+    """Spawn to first tools/list answer stays within the startup budget."""
+    best = min(time_to_list_tools(fast=True, workspace=str(tmp_path)) for _ in range(3))
+
+    assert best < STARTUP_BUDGET_SECONDS
+
+
+async def test_fast_server_speaks_mcp(tmp_path: Path) -> None:
+    """A real MCP client sees the same tools as FastMCP and can call them."""
+    (tmp_path / "notes.txt").write_text("hello")
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=["-m", MODULE],
+        env={**os.environ, "WORKSPACE_PATH": str(tmp_path)},
+    )
+
+    async with (
+        stdio_client(params) as (read, write),
+        ClientSession(read, write) as session,
+    ):
+        await session.initialize()
+        tools = (await session.list_tools()).tools
+        read_result = await session.call_tool("read_file", {"path": "notes.txt"})
+        missing = await session.call_tool("read_file", {"path": "nope.txt"})
+        listing = await session.call_tool("list_directory", {})
+
+    expected = await build_server().list_tools()
+    assert {t.name: set(t.inputSchema["required"]) for t in tools} == {
+        t.name: set(t.inputSchema.get("required", [])) for t in expected
+    }
+    assert read_result.content[0].text == "hello"  # type: ignore[union-attr]
+    assert missing.isError
+    entry = json.loads(listing.content[0].text)  # type: ignore[union-attr]
+    assert entry == {"name": "notes.txt", "type": "file", "size": "5"}
+
+
+def test_protocol_versions_match_sdk() -> None:
+    """The hand-written fast path tracks the mcp package's protocol versions."""
+    assert fast.SUPPORTED_PROTOCOL_VERSIONS == list(SUPPORTED_PROTOCOL_VERSIONS)
+
+
+def test_unknown_method_and_notifications() -> None:
+    """Unknown requests get a JSON-RPC error; notifications get no reply."""
+    assert fast.handle({"jsonrpc": "2.0", "method": "notifications/x"}) is None
+
+    response = fast.handle({"jsonrpc": "2.0", "id": 7, "method": "resources/list"})
+
+    assert response is not None
+    assert response["error"]["code"] == fast.METHOD_NOT_FOUND
+
+
+def test_malformed_lines_get_errors_and_server_keeps_serving() -> None:
+    """Bad input gets a JSON-RPC error instead of killing the server."""
+    requests = [
+        {"jsonrpc": "2.0", "id": 1, "method": ["x"]},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": [1]},
+        {
+            "jsonrpc": "2.0",
+            "id": 3,
+            "method": "tools/call",
+            "params": {"name": ["read_file"]},
+        },
+        {
+            "jsonrpc": "2.0",
+            "id": 4,
+            "method": "tools/call",
+            "params": {"name": "list_directory", "arguments": [1]},
+        },
+        {"jsonrpc": "2.0", "id": 5, "method": "ping"},
+    ]
+    stdin = io.StringIO(
+        "{not json\n[1, 2]\n" + "".join(json.dumps(r) + "\n" for r in requests)
+    )
+    stdout = io.StringIO()
+
+    fast.serve(stdin, stdout)
+
+    parse, invalid, *responses, ping = map(json.loads, stdout.getvalue().splitlines())
+    assert (parse["id"], parse["error"]["code"]) == (None, fast.PARSE_ERROR)
+    assert (invalid["id"], invalid["error"]["code"]) == (None, fast.INVALID_REQUEST)
+    assert [(r["id"], r["error"]["code"]) for r in responses] == [
+        (1, fast.INVALID_REQUEST),
+        (2, fast.INVALID_PARAMS),
+        (3, fast.INVALID_PARAMS),
+        (4, fast.INVALID_PARAMS),
+    ]
+    assert ping == {"jsonrpc": "2.0", "id": 5, "result": {}}
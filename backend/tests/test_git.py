@@ -1,12 +1,33 @@
 """Git service tests."""
 
+import asyncio
+import os
 import subprocess
+import time
+from collections.abc import AsyncGenerator
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
+from claude_agent_sdk.types import ResultMessage
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.services.git import create_checkpoint, create_commit
+from src.agents import executor
+from src.agents.executor import execute_agent_run
+from src.api.routes.settings import BackendSettings, GitSettings
+from src.models.agent_run import AgentRun, AgentRunStatus
+from src.models.project import Project
+from src.models.task import Task
+from src.services import git
+from src.services.git import (
+    checkpoint_ref,
+    create_checkpoint,
+    create_commit,
+    create_worktree,
+    merge_worktree,
+    remove_worktree,
+    restore_checkpoint,
+)
 
 
 @pytest.fixture
@@ -32,57 +53,81 @@ def git_repo(tmp_path: Path) -> Path:
     return tmp_path
 
 
-def test_create_checkpoint_with_changes(git_repo: Path) -> None:
-    """create_checkpoint commits staged changes."""
-    # Create new file
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, capture_output=True, text=True, check=True
+    ).stdout
+
+
+async def test_create_checkpoint_with_changes(git_repo: Path) -> None:
+    """create_checkpoint snapshots into a ref without touching the branch."""
     (git_repo / "test.txt").write_text("Hello")
 
-    result = create_checkpoint(git_repo, "task-12345678")
+    result = await create_checkpoint(git_repo, "task-12345678")
     assert result is True
 
-    # Verify commit was created
-    log = subprocess.run(
-        ["git", "log", "--oneline", "-1"],
-        cwd=git_repo,
-        capture_output=True,
-        text=True,
-    )
-    assert "checkpoint: before task-task-123" in log.stdout
+    ref = checkpoint_ref("task-12345678")
+    assert _git(git_repo, "show", f"{ref}:test.txt") == "Hello"
+    assert "checkpoint: before task-task-123" in _git(git_repo, "log", "-1", ref)
+    # Branch history and index are left alone
+    assert _git(git_repo, "log", "--format=%s") == "Initial commit\n"
+    assert _git(git_repo, "status", "--porcelain") == "?? test.txt\n"
 
 
-def test_create_checkpoint_no_changes(git_repo: Path) -> None:
+async def test_create_checkpoint_commit_mode(git_repo: Path, monkeypatch) -> None:
+    """GIT_CHECKPOINT_MODE=commit keeps the old branch commit (and sets the ref)."""
+    monkeypatch.setattr(git, "GIT_CHECKPOINT_MODE", "commit")
+    (git_repo / "test.txt").write_text("Hello")
+
+    assert await create_checkpoint(git_repo, "task-12345678") is True
+
+    head = _git(git_repo, "rev-parse", "HEAD")
+    assert _git(git_repo, "rev-parse", checkpoint_ref("task-12345678")) == head
+    assert "checkpoint: before task-task-123" in _git(git_repo, "log", "-1")
+
+
+async def test_create_checkpoint_no_changes(git_repo: Path) -> None:
     """create_checkpoint succeeds even when nothing to commit."""
     # No changes made
-    result = create_checkpoint(git_repo, "task-12345678")
+    result = await create_checkpoint(git_repo, "task-12345678")
     assert result is True  # Return code 1 (nothing to commit) is treated as success
 
 
-def test_create_checkpoint_not_git_repo(tmp_path: Path) -> None:
+async def test_create_checkpoint_not_git_repo(tmp_path: Path) -> None:
     """create_checkpoint returns False for non-git directory."""
-    result = create_checkpoint(tmp_path, "task-12345678")
+    result = await create_checkpoint(tmp_path, "task-12345678")
     assert result is False
 
 
-def test_create_checkpoint_nonexistent_path() -> None:
+async def test_create_checkpoint_nonexistent_path() -> None:
     """create_checkpoint returns False for nonexistent path."""
-    result = create_checkpoint(Path("/nonexistent/path"), "task-12345678")
+    result = await create_checkpoint(Path("/nonexistent/path"), "task-12345678")
     assert result is False
 
 
-def test_create_checkpoint_timeout() -> None:
-    """create_checkpoint handles subprocess timeout."""
-    with patch("src.services.git.subprocess.run") as mock_run:
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd="git", timeout=30)
-        result = create_checkpoint(Path("/tmp"), "task-12345678")
-        assert result is False
+async def test_create_checkpoint_timeout(
+    git_repo: Path, tmp_path_factory: pytest.TempPathFactory, monkeypatch
+) -> None:
+    """create_checkpoint kills a git process that outlives GIT_TIMEOUT."""
+    bin_dir = tmp_path_factory.mktemp("bin")
+    (bin_dir / "git").write_text("#!/bin/sh\nsleep 5\n")
+    (bin_dir / "git").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+    monkeypatch.setattr(git, "GIT_TIMEOUT", 0.1)
+
+    started = time.monotonic()
+    result = await create_checkpoint(git_repo, "task-12345678")
+
+    assert result is False
+    assert time.monotonic() - started < 2
 
 
-def test_create_commit_with_changes(git_repo: Path) -> None:
+async def test_create_commit_with_changes(git_repo: Path) -> None:
     """create_commit commits changes with custom message."""
     # Create new file
     (git_repo / "feature.txt").write_text("New feature")
 
-    result = create_commit(git_repo, "feat: add new feature")
+    result = await create_commit(git_repo, "feat: add new feature")
     assert result is True
 
     # Verify commit message
@@ -95,13 +140,228 @@ def test_create_commit_with_changes(git_repo: Path) -> None:
     assert "feat: add new feature" in log.stdout
 
 
-def test_create_commit_no_changes(git_repo: Path) -> None:
+async def test_create_commit_no_changes(git_repo: Path) -> None:
     """create_commit succeeds when nothing to commit."""
-    result = create_commit(git_repo, "empty commit")
+    result = await create_commit(git_repo, "empty commit")
     assert result is True
 
 
-def test_create_commit_not_git_repo(tmp_path: Path) -> None:
+async def test_create_commit_not_git_repo(tmp_path: Path) -> None:
     """create_commit returns False for non-git directory."""
-    result = create_commit(tmp_path, "test commit")
+    result = await create_commit(tmp_path, "test commit")
     assert result is False
+
+
+async def test_git_does_not_block_event_loop(
+    git_repo: Path, tmp_path_factory: pytest.TempPathFactory, monkeypatch
+) -> None:
+    """Other coroutines keep running while a slow git command is in flight."""
+    bin_dir = tmp_path_factory.mktemp("bin")
+    (bin_dir / "git").write_text("#!/bin/sh\nsleep 0.3\n")
+    (bin_dir / "git").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    await create_commit(git_repo, "slow")
+    ticking.cancel()
+
+    assert ticks >= 20  # ~60 possible during two 0.3 s git calls
+
+
+async def test_concurrent_commits_share_workspace_lock(git_repo: Path) -> None:
+    """Parallel commits in one repo are serialised instead of racing on the index."""
+    for i in range(5):
+        (git_repo / f"file{i}.txt").write_text(str(i))
+
+    results = await asyncio.gather(
+        *(create_commit(git_repo, f"commit {i}") for i in range(5))
+    )
+
+    assert all(results)
+    status = subprocess.run(
+        ["git", "status", "--porcelain"], cwd=git_repo, capture_output=True, text=True
+    )
+    assert status.stdout == ""
+
+
+async def test_restore_checkpoint(git_repo: Path) -> None:
+    """Restore rewrites changed/deleted files and removes added ones."""
+    (git_repo / "keep.txt").write_text("original")
+    (git_repo / "gone.txt").write_text("deleted later")
+    await create_checkpoint(git_repo, "task-1")
+
+    (git_repo / "keep.txt").write_text("agent edit")
+    (git_repo / "gone.txt").unlink()
+    (git_repo / "new" / "dir").mkdir(parents=True)
+    (git_repo / "new" / "dir" / "added.txt").write_text("agent output")
+
+    checkpoint = await restore_checkpoint(git_repo, "task-1")
+
+    assert checkpoint == _git(git_repo, "rev-parse", checkpoint_ref("task-1")).strip()
+    assert (git_repo / "keep.txt").read_text() == "original"
+    assert (git_repo / "gone.txt").read_text() == "deleted later"
+    assert not (git_repo / "new").exists()
+    assert await restore_checkpoint(git_repo, "task-unknown") is None
+
+
+async def test_restore_endpoint(
+    client: AsyncClient, db_session: AsyncSession, git_repo: Path
+) -> None:
+    """POST /api/agent/restore/{task_id} rolls the project workspace back."""
+    db_session.add(Project(id="p", name="p", workspace_path=str(git_repo)))
+    db_session.add(Task(id="t", title="Restore me", project_id="p"))
+    await db_session.commit()
+    await create_checkpoint(git_repo, "t")
+    (git_repo / "README.md").write_text("broken by agent")
+
+    response = await client.post("/api/agent/restore/t")
+
+    assert response.status_code == 200
+    assert response.json()["checkpoint"]
+    assert (git_repo / "README.md").read_text() == "# Test"
+
+    db_session.add(AgentRun(id="r", task_id="t", status=AgentRunStatus.RUNNING))
+    await db_session.commit()
+    assert (await client.post("/api/agent/restore/t")).status_code == 409
+    assert (await client.post("/api/agent/restore/missing")).status_code == 404
+
+
+async def test_worktree_changes_are_applied(git_repo: Path) -> None:
+    """A run's worktree sees uncommitted work; its changes land in the workspace."""
+    (git_repo / "wip.txt").write_text("uncommitted")
+    await create_checkpoint(git_repo, "task-1")
+    worktree = await create_worktree(git_repo, "run-1", checkpoint_ref("task-1"))
+    assert worktree is not None
+    assert (worktree.cwd / "wip.txt").read_text() == "uncommitted"
+
+    (worktree.cwd / "README.md").write_text("# Changed by agent")
+    (worktree.cwd / "new.bin").write_bytes(bytes(range(256)))
+
+    assert await merge_worktree(git_repo, worktree, "feat: run 1") is True
+    await remove_worktree(git_repo, worktree)
+
+    assert (git_repo / "README.md").read_text() == "# Changed by agent"
+    assert (git_repo / "new.bin").read_bytes() == bytes(range(256))
+    assert not worktree.path.exists()
+    assert _git(git_repo, "branch", "--list", worktree.branch) == ""
+
+
+async def test_conflicting_worktree_keeps_branch(git_repo: Path) -> None:
+    """Changes that no longer apply leave the workspace alone and keep the branch."""
+    worktree = await create_worktree(git_repo, "run-2")
+    assert worktree is not None
+    (worktree.cwd / "README.md").write_text("# From the agent")
+    (git_repo / "README.md").write_text("# Edited meanwhile")
+
+    assert await merge_worktree(git_repo, worktree, "feat: run 2") is False
+    await remove_worktree(git_repo, worktree, delete_branch=False)
+
+    assert (git_repo / "README.md").read_text() == "# Edited meanwhile"
+    assert _git(git_repo, "show", f"{worktree.branch}:README.md") == "# From the agent"
+
+
+async def test_executor_runs_agent_in_worktree(
+    db_session: AsyncSession, git_repo: Path, monkeypatch
+) -> None:
+    """With use_worktrees the agent's cwd is a private worktree."""
+    seen: dict[str, str] = {}
+
+    async def fake_query(prompt: str, options) -> AsyncGenerator:
+        seen["cwd"] = str(options.cwd)
+        (Path(options.cwd) / "out.txt").write_text("agent output")
+        yield ResultMessage(
+            subtype="success",
+            duration_ms=1,
+            duration_api_ms=1,
+            is_error=False,
+            num_turns=1,
+            session_id="s",
+            result="done",
+        )
+
+    monkeypatch.setattr(executor, "query", fake_query)
+    monkeypatch.setattr(
+        executor,
+        "load_settings",
+        lambda: BackendSettings(git=GitSettings(use_worktrees=True)),
+    )
+    project = Project(id="p", name="p", workspace_path=str(git_repo))
+    task = Task(id="t", title="Parallel", project_id="p")
+    run = AgentRun(id="r", task_id="t", status=AgentRunStatus.PENDING)
+    db_session.add_all([project, task, run])
+    await db_session.commit()
+
+    await execute_agent_run(db_session, run, task, project, mcp_tools=["filesystem"])
+
+    assert run.status == AgentRunStatus.COMPLETED
+    assert seen["cwd"] != str(git_repo)
+    assert not Path(seen["cwd"]).exists()
+    assert (git_repo / "out.txt").read_text() == "agent output"
+    assert _git(git_repo, "log", "-1", "--format=%s") == "feat: Parallel\n"
+    assert run.worktree_branch is None
+
+
+async def test_restore_checkpoint_in_subdirectory(git_repo: Path) -> None:
+    """A workspace below the repo root only restores files inside it."""
+    workspace = git_repo / "sub"
+    workspace.mkdir()
+    (workspace / "app.txt").write_text("original")
+    (git_repo / "outside.txt").write_text("before")
+    await create_checkpoint(workspace, "task-1")
+
+    (workspace / "app.txt").write_text("agent edit")
+    (workspace / "added.txt").write_text("agent output")
+    (git_repo / "outside.txt").write_text("edited elsewhere")
+    (git_repo / "outside-new.txt").write_text("also elsewhere")
+
+    assert await restore_checkpoint(workspace, "task-1")
+
+    assert (workspace / "app.txt").read_text() == "original"
+    assert not (workspace / "added.txt").exists()
+    assert (git_repo / "outside.txt").read_text() == "edited elsewhere"
+    assert (git_repo / "outside-new.txt").exists()
+
+
+async def test_executor_cleans_up_worktree_when_setup_fails(
+    db_session: AsyncSession, git_repo: Path, monkeypatch
+) -> None:
+    """A setup error after the worktree exists still removes it."""
+    created: list[Path] = []
+    real_create = executor.create_worktree
+
+    async def tracking_create(*args, **kwargs):
+        worktree = await real_create(*args, **kwargs)
+        created.append(worktree.path)
+        return worktree
+
+    def broken_config(*args, **kwargs):
+        raise RuntimeError("bad mcps.yaml")
+
+    monkeypatch.setattr(executor, "create_worktree", tracking_create)
+    monkeypatch.setattr(executor, "get_mcp_config", broken_config)
+    monkeypatch.setattr(
+        executor,
+        "load_settings",
+        lambda: BackendSettings(git=GitSettings(use_worktrees=True)),
+    )
+    project = Project(id="p", name="p", workspace_path=str(git_repo))
+    task = Task(id="t", title="Broken", project_id="p")
+    run = AgentRun(id="r", task_id="t", status=AgentRunStatus.PENDING)
+    db_session.add_all([project, task, run])
+    await db_session.commit()
+
+    result = await execute_agent_run(db_session, run, task, project)
+
+    assert result.status == AgentRunStatus.FAILED
+    assert run.status == AgentRunStatus.FAILED
+    assert result.error == "bad mcps.yaml"
+    assert len(created) == 1
+    assert not created[0].exists()
+    assert _git(git_repo, "branch", "--list", "kanban/*") == ""
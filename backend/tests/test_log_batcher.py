@@ -0,0 +1,118 @@
+"""Agent log batcher tests."""
+
+import asyncio
+
+import pytest
+
+from src.agents import log_batcher
+from src.agents.log_batcher import AgentLogBatcher
+from src.api.events import EventFilter, EventType, event_bus
+
+
+def _entry(n: int) -> dict[str, str]:
+    return {"timestamp": "2026-01-01T00:00:00+00:00", "type": "text", "content": str(n)}
+
+
+async def test_batcher_flushes_when_full() -> None:
+    """Reaching max_entries publishes one batch immediately."""
+    queue = event_bus.subscribe(event_filter=EventFilter(agent_run_id="run-full"))
+    batcher = AgentLogBatcher("task", "run-full", window_ms=10_000, max_entries=3)
+    try:
+        for i in range(3):
+            await batcher.add(_entry(i))
+
+        event = queue.get_nowait()
+        assert event.event_type == EventType.AGENT_LOG_BATCH
+        assert [log["content"] for log in event.data["logs"]] == ["0", "1", "2"]
+        assert event.data["task_id"] == "task"
+        assert queue.empty()
+    finally:
+        await batcher.close()
+        event_bus.unsubscribe(queue)
+
+
+async def test_batcher_flushes_after_window() -> None:
+    """Entries below the size limit are published once the window elapses."""
+    queue = event_bus.subscribe(event_filter=EventFilter(agent_run_id="run-window"))
+    batcher = AgentLogBatcher("task", "run-window", window_ms=10, max_entries=100)
+    try:
+        await batcher.add(_entry(1))
+        await batcher.add(_entry(2))
+        assert queue.empty()
+
+        event = await asyncio.wait_for(queue.get(), timeout=1.0)
+        assert len(event.data["logs"]) == 2
+    finally:
+        await batcher.close()
+        event_bus.unsubscribe(queue)
+
+
+async def test_batcher_close_flushes_remaining() -> None:
+    """close() publishes pending entries and leaves nothing scheduled."""
+    queue = event_bus.subscribe(event_filter=EventFilter(agent_run_id="run-close"))
+    batcher = AgentLogBatcher("task", "run-close", window_ms=10_000, max_entries=100)
+
+    await batcher.add(_entry(1))
+    await batcher.close()
+
+    assert len(queue.get_nowait().data["logs"]) == 1
+    await batcher.close()
+    assert queue.empty()
+    event_bus.unsubscribe(queue)
+
+
+async def test_close_waits_for_window_flush_in_progress(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A window flush stuck persisting still publishes before close() returns."""
+    persisting = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_append(agent_run_id: str, entries: list[dict[str, str]]) -> bool:
+        if not persisting.is_set():  # Only the first batch is slow
+            persisting.set()
+            await release.wait()
+        return True
+
+    monkeypatch.setattr(log_batcher, "append_run_logs", slow_append)
+    queue = event_bus.subscribe(event_filter=EventFilter(agent_run_id="run-slow"))
+    batcher = AgentLogBatcher(
+        "task", "run-slow", window_ms=1, max_entries=100, persist=True
+    )
+    try:
+        await batcher.add(_entry(1))
+        await persisting.wait()  # Window flush is now inside append_run_logs
+        await batcher.add(_entry(2))
+
+        closing = asyncio.create_task(batcher.close())
+        await asyncio.sleep(0.01)
+        assert not closing.done()
+        release.set()
+        await closing
+
+        batches = [queue.get_nowait(), queue.get_nowait()]
+        assert [b.data["logs"][0]["content"] for b in batches] == ["1", "2"]
+    finally:
+        event_bus.unsubscribe(queue)
+
+
+async def test_persistence_failure_is_surfaced(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Batches that fail to persist are flagged and counted, not hidden."""
+
+    async def failing_append(agent_run_id: str, entries: list[dict[str, str]]) -> bool:
+        return False
+
+    monkeypatch.setattr(log_batcher, "append_run_logs", failing_append)
+    queue = event_bus.subscribe(event_filter=EventFilter(agent_run_id="run-lost"))
+    batcher = AgentLogBatcher(
+        "task", "run-lost", window_ms=10_000, max_entries=100, persist=True
+    )
+    try:
+        await batcher.add(_entry(1))
+        await batcher.add(_entry(2))
+        await batcher.close()
+
+        assert queue.get_nowait().data["persisted"] is False
+        assert batcher.unpersisted == 2
+    finally:
+        event_bus.unsubscribe(queue)
@@ -0,0 +1,136 @@
+"""MCP process pool tests (spawn the real filesystem server over HTTP)."""
+
+from collections.abc import AsyncGenerator, Generator
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+
+from src.mcp_client import registry
+from src.mcp_client.pool import MCPProcessPool
+
+CONFIG = """\
+servers:
+  filesystem:
+    enabled: true
+    command: python
+    args: ["-m", "src.mcp_servers.filesystem.server"]
+    env:
+      WORKSPACE_PATH: "${WORKSPACE_PATH}"
+    pool: true
+  other:
+    enabled: true
+    command: other-mcp
+"""
+
+
+@pytest.fixture(autouse=True)
+def config_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[Path]:
+    """Registry with a pooled filesystem server and an unpooled one."""
+    path = tmp_path / "mcps.yaml"
+    path.write_text(CONFIG)
+    monkeypatch.setattr(registry, "CONFIG_PATH", path)
+    registry.invalidate_mcp_registry()
+    yield path
+    registry.invalidate_mcp_registry()
+
+
+@pytest.fixture
+async def pool() -> AsyncGenerator[MCPProcessPool]:
+    pool = MCPProcessPool(enabled=True, max_uses=2)
+    yield pool
+    await pool.close()
+
+
+async def _read(server: dict[str, Any], path: str) -> str:
+    """Call read_file on a leased HTTP server, as the SDK would."""
+    async with (
+        httpx.AsyncClient(headers=server["headers"]) as http,
+        streamable_http_client(server["url"], http_client=http) as (read, write, _),
+        ClientSession(read, write) as session,
+    ):
+        await session.initialize()
+        result = await session.call_tool("read_file", {"path": path})
+    return result.content[0].text  # type: ignore[union-attr]
+
+
+async def test_pooled_server_is_reused_across_workspaces(
+    pool: MCPProcessPool, tmp_path: Path
+) -> None:
+    """Runs in other workspaces share one warm process; each sees its own files."""
+    for name in ("one", "two"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "hello.txt").write_text(f"hi from {name}")
+    config = registry.get_mcp_config(["filesystem", "other"], str(tmp_path / "one"))
+
+    first = await pool.acquire(config)
+    url = first.servers["filesystem"]["url"]
+    assert first.servers["filesystem"]["type"] == "http"
+    assert first.servers["other"] == config["other"]
+    assert await _read(first.servers["filesystem"], "hello.txt") == "hi from one"
+    await pool.release(first)
+
+    config = registry.get_mcp_config(["filesystem"], str(tmp_path / "two"))
+    second = await pool.acquire(config)
+
+    assert second.servers["filesystem"]["url"] == url
+    assert pool.idle_count == 0
+    assert await _read(second.servers["filesystem"], "hello.txt") == "hi from two"
+    await pool.release(second)
+
+
+async def test_pooled_server_requires_its_token(
+    pool: MCPProcessPool, tmp_path: Path
+) -> None:
+    """Other local processes cannot use a pooled server without the token."""
+    lease = await pool.acquire(registry.get_mcp_config(["filesystem"], str(tmp_path)))
+    url = lease.servers["filesystem"]["url"]
+    try:
+        async with httpx.AsyncClient() as http:
+            anonymous = await http.post(url, json={})
+            wrong = await http.post(
+                url, json={}, headers={"Authorization": "Bearer guess"}
+            )
+    finally:
+        await pool.release(lease)
+
+    assert anonymous.status_code == wrong.status_code == 401
+
+
+async def test_worn_out_and_dead_servers_are_replaced(
+    pool: MCPProcessPool, tmp_path: Path
+) -> None:
+    """max_uses retires an instance; a crashed idle one is never handed out."""
+    config = registry.get_mcp_config(["filesystem"], str(tmp_path))
+
+    lease = await pool.acquire(config)
+    process = lease.pooled[0].process
+    await pool.release(lease)
+    lease = await pool.acquire(config)
+    await pool.release(lease)  # Second use: retired
+
+    assert process.returncode is not None
+    assert pool.idle_count == 0
+
+    lease = await pool.acquire(config)
+    crashed = lease.pooled[0]
+    await pool.release(lease)
+    crashed.process.kill()
+    await crashed.process.wait()
+    lease = await pool.acquire(config)
+
+    assert lease.pooled[0] is not crashed
+    await pool.release(lease)
+
+
+async def test_disabled_pool_passes_config_through(tmp_path: Path) -> None:
+    """With pooling off the SDK spawns stdio servers as before."""
+    config = registry.get_mcp_config(["filesystem"], str(tmp_path))
+
+    lease = await MCPProcessPool(enabled=False).acquire(config)
+
+    assert lease.servers == config
+    assert lease.pooled == []
@@ -0,0 +1,90 @@
+"""MCP registry cache tests."""
+
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+from httpx import AsyncClient
+
+from src.mcp_client import registry
+
+CONFIG = """\
+defaults:
+  allowed_mcps: [filesystem]
+servers:
+  filesystem:
+    enabled: true
+    command: python
+    description: "Files"
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[Path]:
+    """Point the registry at a temporary file with an empty cache."""
+    path = tmp_path / "mcps.yaml"
+    path.write_text(CONFIG)
+    monkeypatch.setattr(registry, "CONFIG_PATH", path)
+    legacy = dict(registry.MCP_REGISTRY)
+    registry.invalidate_mcp_registry()
+    yield path
+    registry.invalidate_mcp_registry()
+    registry.MCP_REGISTRY.clear()
+    registry.MCP_REGISTRY.update(legacy)
+
+
+@pytest.fixture
+def parses(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record every YAML parse."""
+    calls: list[str] = []
+    safe_load = yaml.safe_load
+
+    def counting_load(text: str) -> Any:
+        calls.append(text)
+        return safe_load(text)
+
+    monkeypatch.setattr(registry.yaml, "safe_load", counting_load)
+    return calls
+
+
+def test_registry_is_parsed_once(config_path: Path, parses: list[str]) -> None:
+    """Repeated lookups reuse the parsed file."""
+    registry.get_defaults()
+    registry.get_available_mcps()
+    registry.get_mcp_config(["filesystem"], "/workspace")
+
+    assert len(parses) == 1
+
+
+def test_registry_reloads_when_file_changes(
+    config_path: Path, parses: list[str]
+) -> None:
+    """A changed file is picked up without explicit invalidation."""
+    assert [m["value"] for m in registry.get_available_mcps()] == ["filesystem"]
+
+    config_path.write_text(CONFIG.replace("enabled: true", "enabled: false"))
+
+    assert registry.get_available_mcps() == []
+    assert len(parses) == 2
+
+
+def test_invalidate_forces_reparse(config_path: Path, parses: list[str]) -> None:
+    """Explicit invalidation re-reads an unchanged file."""
+    registry.load_mcp_registry()
+    registry.invalidate_mcp_registry()
+    registry.load_mcp_registry()
+
+    assert len(parses) == 2
+
+
+async def test_reload_endpoint(client: AsyncClient, config_path: Path) -> None:
+    """POST /api/settings/mcps/reload returns the freshly read registry."""
+    response = await client.post("/api/settings/mcps/reload")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["defaults"]["allowed_mcps"] == ["filesystem"]
+    assert [m["value"] for m in data["mcp_options"]] == ["filesystem"]
+    assert "filesystem" in registry.MCP_REGISTRY
@@ -112,3 +112,15 @@ async def test_delete_project_not_found(client: AsyncClient) -> None:
     """DELETE /api/projects/{id} returns 404 for unknown ID."""
     response = await client.delete("/api/projects/nonexistent-id")
     assert response.status_code == 404
+
+
+async def test_list_projects_etag(client: AsyncClient) -> None:
+    """GET /api/projects returns 304 until a project is added."""
+    etag = (await client.get("/api/projects")).headers["ETag"]
+    response = await client.get("/api/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.post("/api/projects", json={"name": "New", "workspace_path": "/tmp"})
+    response = await client.get("/api/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
@@ -0,0 +1,220 @@
+"""Sandbox sync, lazy creation and garbage collection tests."""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.events import EventType, event_bus
+from src.api.task_service import copy_sandbox_to_target
+from src.models.agent_run import AgentRun, AgentRunStatus
+from src.models.project import Project
+from src.models.task import Task, TaskStatus
+from src.services import sandbox
+from src.services.sandbox import (
+    SyncReport,
+    collect_sandboxes,
+    ensure_sandbox,
+    sync_tree,
+)
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    """Sandbox with a nested file."""
+    root = tmp_path / "sandbox"
+    (root / "docs").mkdir(parents=True)
+    (root / "a.txt").write_text("alpha")
+    (root / "docs" / "b.txt").write_text("bravo!")
+    return root
+
+
+def test_second_sync_copies_nothing(source: Path, tmp_path: Path) -> None:
+    """Only new or changed files are transferred."""
+    target = tmp_path / "target"
+
+    first = sync_tree(source, target, mode="copy")
+    second = sync_tree(source, target, mode="copy")
+
+    assert first == SyncReport(files_copied=2, bytes_copied=11)
+    assert second == SyncReport(files_unchanged=2)
+    assert (target / "docs" / "b.txt").read_text() == "bravo!"
+
+
+def test_changed_content_is_detected(source: Path, tmp_path: Path) -> None:
+    """Touched-but-identical files are hashed and skipped; edits are copied."""
+    target = tmp_path / "target"
+    sync_tree(source, target, mode="copy")
+    os.utime(source / "a.txt", ns=(0, 0))  # Same content, other mtime
+    (source / "docs" / "b.txt").write_text("BRAVO!")  # Same size, new content
+
+    report = sync_tree(source, target, mode="copy")
+
+    assert report == SyncReport(files_copied=1, files_unchanged=1, bytes_copied=6)
+    assert (target / "docs" / "b.txt").read_text() == "BRAVO!"
+    assert (target / "a.txt").stat().st_mtime_ns == 0  # Fast path next time
+
+
+def test_hardlink_mode(source: Path, tmp_path: Path) -> None:
+    """hardlink mode shares inodes instead of copying bytes."""
+    target = tmp_path / "target"
+
+    report = sync_tree(source, target, mode="hardlink")
+
+    assert report == SyncReport(files_linked=2)
+    assert (target / "a.txt").stat().st_ino == (source / "a.txt").stat().st_ino
+
+
+def test_auto_mode_falls_back_to_copy(
+    source: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Without reflink support auto mode copies."""
+    monkeypatch.setattr(sandbox, "_reflink", lambda src, dst: False)
+
+    report = sync_tree(source, tmp_path / "target", mode="auto")
+
+    assert report.files_copied == 2
+    assert report.bytes_copied == 11
+
+
+async def test_copy_sandbox_to_target_reports(source: Path, tmp_path: Path) -> None:
+    """The task service syncs off the event loop and returns the report."""
+    report = await copy_sandbox_to_target(str(source), str(tmp_path / "target"))
+
+    assert report is not None
+    assert report.files_copied + report.files_linked == 2
+    assert await copy_sandbox_to_target(str(tmp_path / "none"), "x") is None
+
+
+def _sandbox(root: Path, task_id: str, size: int = 0, age_days: float = 0) -> Path:
+    path = root / task_id
+    path.mkdir(parents=True)
+    if size:
+        (path / "out.bin").write_bytes(b"x" * size)
+    stamp = time.time() - age_days * 86400
+    for item in [*path.iterdir(), path]:
+        os.utime(item, (stamp, stamp))
+    return path
+
+
+async def test_collect_sandboxes(db_session: AsyncSession, tmp_path: Path) -> None:
+    """Orphaned, empty and expired sandboxes go; busy and fresh ones stay."""
+    root = tmp_path / "output"
+    db_session.add_all(
+        [
+            Task(id="fresh", title="t", project_id=None),
+            Task(id="empty", title="t"),
+            Task(id="old", title="t"),
+            Task(id="running", title="t", status=TaskStatus.IN_PROGRESS),
+            Task(id="queued", title="t"),
+            AgentRun(id="r", task_id="queued", status=AgentRunStatus.PENDING),
+        ]
+    )
+    await db_session.commit()
+    _sandbox(root, "fresh", size=10)
+    _sandbox(root, "empty")
+    _sandbox(root, "old", size=10, age_days=40)
+    _sandbox(root, "orphan", size=10)
+    _sandbox(root, "running")
+    _sandbox(root, "queued", age_days=40)
+
+    report = await collect_sandboxes(db_session, root, max_age_days=30)
+
+    assert sorted(report.removed) == ["empty", "old", "orphan"]
+    assert report.bytes_freed == 20
+    assert sorted(p.name for p in root.iterdir()) == ["fresh", "queued", "running"]
+
+
+async def test_project_quota_evicts_oldest(
+    db_session: AsyncSession, tmp_path: Path
+) -> None:
+    """Over quota, a project's least recently used sandboxes are removed first."""
+    root = tmp_path / "output"
+    db_session.add(Project(id="p", name="p", workspace_path=str(tmp_path)))
+    db_session.add_all(Task(id=f"t{i}", title="t", project_id="p") for i in range(3))
+    await db_session.commit()
+    for i in range(3):
+        _sandbox(root, f"t{i}", size=400 * 1024, age_days=3 - i)  # t0 oldest
+
+    report = await collect_sandboxes(db_session, root, project_quota_mb=1)
+
+    assert report.removed == ["t0"]
+    assert sorted(p.name for p in root.iterdir()) == ["t1", "t2"]
+
+
+async def test_collect_spares_sandboxes_claimed_during_sweep(
+    db_session: AsyncSession, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A run queued or an agent writing after the scan keeps its sandbox."""
+    root = tmp_path / "output"
+    db_session.add_all(Task(id=name, title="t") for name in ["claimed", "written"])
+    await db_session.commit()
+    for name in ["claimed", "written", "idle"]:
+        _sandbox(root, name, size=10, age_days=40)
+    real_scan, real_load_owners = sandbox._scan, sandbox._load_owners
+
+    def scan_then_write(root: Path) -> list:
+        sandboxes = real_scan(root)
+        (root / "written" / "new.txt").write_text("agent output")
+        return sandboxes
+
+    async def load_owners_then_claim(db: AsyncSession, task_ids: list[str]):
+        owners = await real_load_owners(db, task_ids)
+        if "claimed" not in owners[1]:
+            db.add(AgentRun(id="r", task_id="claimed", status=AgentRunStatus.PENDING))
+            await db.commit()
+        return owners
+
+    monkeypatch.setattr(sandbox, "_scan", scan_then_write)
+    monkeypatch.setattr(sandbox, "_load_owners", load_owners_then_claim)
+
+    report = await collect_sandboxes(db_session, root, max_age_days=30)
+
+    assert report.removed == ["idle"]
+    assert sorted(p.name for p in root.iterdir()) == ["claimed", "written"]
+
+
+async def test_sandbox_created_lazily_and_removed_with_task(
+    client: AsyncClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Creating a task makes no directory; deleting it removes the sandbox."""
+    monkeypatch.chdir(tmp_path)
+
+    task = (await client.post("/api/tasks", json={"title": "Note"})).json()
+    sandbox_dir = tmp_path / task["sandbox_dir"]
+    assert not sandbox_dir.exists()
+
+    assert ensure_sandbox(task["sandbox_dir"]) == sandbox_dir.resolve()
+    (sandbox_dir / "result.txt").write_text("output")
+
+    assert (await client.delete(f"/api/tasks/{task['id']}")).status_code == 204
+    assert not sandbox_dir.exists()
+
+
+async def test_done_update_reports_sync(
+    client: AsyncClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Moving a task to DONE publishes the sandbox sync in task_updated."""
+    monkeypatch.chdir(tmp_path)
+    target = tmp_path / "target"
+    task = (
+        await client.post(
+            "/api/tasks", json={"title": "Report", "target_path": str(target)}
+        )
+    ).json()
+    ensure_sandbox(task["sandbox_dir"])
+    (tmp_path / task["sandbox_dir"] / "report.md").write_text("findings")
+
+    queue = event_bus.subscribe()
+    try:
+        await client.put(f"/api/tasks/{task['id']}", json={"status": "done"})
+        event = queue.get_nowait()
+    finally:
+        event_bus.unsubscribe(queue)
+
+    assert event.event_type == EventType.TASK_UPDATED
+    assert event.data["sync"]["files_copied"] + event.data["sync"]["files_linked"] == 1
+    assert (target / "report.md").read_text() == "findings"
@@ -0,0 +1,330 @@
+"""Agent run scheduler tests."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.agents import executor, scheduler
+from src.agents.executor import stop_agent_run
+from src.agents.scheduler import AgentRunScheduler, queue_positions
+from src.agents.types import AgentResult
+from src.database import Base
+from src.models.agent_run import AgentRun, AgentRunStatus
+from src.models.project import Project
+from src.models.task import Task, TaskStatus
+
+QUEUED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def session_factory(
+    tmp_path: Path,
+) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    """File-backed database so concurrent sessions get their own connections."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/scheduler.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+class GatedAgent:
+    """Stand-in for execute_agent_run that blocks until released."""
+
+    def __init__(self) -> None:
+        self.started: list[str] = []
+        self.release = asyncio.Event()
+
+    async def __call__(
+        self, db: AsyncSession, agent_run: AgentRun, task: Task, project: object
+    ) -> AgentResult:
+        self.started.append(agent_run.id)
+        await self.release.wait()
+        agent_run.status = AgentRunStatus.COMPLETED
+        await db.commit()
+        return AgentResult(status=AgentRunStatus.COMPLETED)
+
+
+async def _queue(
+    session_factory: async_sessionmaker[AsyncSession],
+    runs: list[tuple[str, str, int]],
+) -> None:
+    """Queue one run per (run_id, project_id, priority), in list order."""
+    async with session_factory() as db:
+        for project_id in {project_id for _, project_id, _ in runs}:
+            db.add(Project(id=project_id, name=project_id, workspace_path="."))
+        for offset, (run_id, project_id, priority) in enumerate(runs):
+            db.add(Task(id=f"task-{run_id}", title=run_id, project_id=project_id))
+            db.add(
+                AgentRun(
+                    id=run_id,
+                    task_id=f"task-{run_id}",
+                    status=AgentRunStatus.PENDING,
+                    priority=priority,
+                    queued_at=QUEUED_AT + timedelta(seconds=offset),
+                )
+            )
+        await db.commit()
+
+
+async def _statuses(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> dict[str, AgentRunStatus]:
+    async with session_factory() as db:
+        result = await db.execute(select(AgentRun.id, AgentRun.status))
+        return {run_id: status for run_id, status in result}
+
+
+async def test_global_limit_caps_running_runs(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """No more than max_concurrent runs are RUNNING; the rest stay queued."""
+    await _queue(session_factory, [(f"r{i}", f"p{i}", 0) for i in range(4)])
+    agent = GatedAgent()
+    monkeypatch.setattr(scheduler, "execute_agent_run", agent)
+    runs = AgentRunScheduler(
+        max_concurrent=2, max_per_project=2, session_factory=session_factory
+    )
+
+    assert await runs.dispatch() == ["r0", "r1"]
+    assert await runs.dispatch() == []  # Full - nothing more is claimed
+    statuses = await _statuses(session_factory)
+    assert [statuses[f"r{i}"] for i in range(4)] == [
+        AgentRunStatus.RUNNING,
+        AgentRunStatus.RUNNING,
+        AgentRunStatus.PENDING,
+        AgentRunStatus.PENDING,
+    ]
+
+    # Finishing runs frees slots for the rest of the queue
+    await runs.start()
+    agent.release.set()
+    for _ in range(100):
+        if set((await _statuses(session_factory)).values()) == {
+            AgentRunStatus.COMPLETED
+        }:
+            break
+        await asyncio.sleep(0.02)
+    await asyncio.gather(*runs._active.values())
+    await runs.stop()
+    assert sorted(agent.started) == ["r0", "r1", "r2", "r3"]
+    assert runs.active_runs == []
+
+
+async def test_per_project_limit(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A busy project does not block queued runs of other projects."""
+    await _queue(session_factory, [("a1", "a", 0), ("a2", "a", 0), ("b1", "b", 0)])
+    agent = GatedAgent()
+    monkeypatch.setattr(scheduler, "execute_agent_run", agent)
+    runs = AgentRunScheduler(
+        max_concurrent=3, max_per_project=1, session_factory=session_factory
+    )
+
+    assert await runs.dispatch() == ["a1", "b1"]
+    assert (await _statuses(session_factory))["a2"] == AgentRunStatus.PENDING
+
+    agent.release.set()
+    await asyncio.gather(*runs._active.values())
+    assert await runs.dispatch() == ["a2"]
+    await asyncio.gather(*runs._active.values())
+
+
+async def test_queue_order_is_priority_then_fifo(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Higher priority is served first, equal priorities in queue order."""
+    await _queue(
+        session_factory,
+        [("low", "p", -5), ("first", "p", 0), ("urgent", "p", 10), ("second", "p", 0)],
+    )
+
+    async with session_factory() as db:
+        positions = await queue_positions(db)
+
+    assert positions == {"urgent": 1, "first": 2, "second": 3, "low": 4}
+
+
+async def test_wait_for_sees_runs_executed_by_another_worker(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Waiting watches the run's row, not the scheduler that claims it."""
+    agent = GatedAgent()
+    agent.release.set()
+    monkeypatch.setattr(scheduler, "execute_agent_run", agent)
+    waiter = AgentRunScheduler(poll_interval=0.02, session_factory=session_factory)
+    worker = AgentRunScheduler(poll_interval=0.02, session_factory=session_factory)
+    await _queue(session_factory, [("r1", "p", 0)])
+
+    outcome = asyncio.create_task(waiter.wait_for("r1", timeout=5))
+    await worker.start()
+    try:
+        result = await outcome
+    finally:
+        await worker.stop()
+
+    assert result.status == AgentRunStatus.COMPLETED
+    assert agent.started == ["r1"]
+
+
+async def test_wait_for_times_out(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """A run nobody executes raises TimeoutError instead of hanging."""
+    runs = AgentRunScheduler(poll_interval=0.02, session_factory=session_factory)
+    await _queue(session_factory, [("r1", "p", 0)])
+
+    with pytest.raises(TimeoutError):
+        await runs.wait_for("r1", timeout=0.1)
+
+
+async def test_recover_requeues_or_fails_expired_runs(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Expired leases are re-queued until attempts run out, then failed."""
+    now = datetime.now(timezone.utc)
+    await _queue(
+        session_factory, [("fresh", "p", 0), ("stale", "p", 0), ("dead", "p", 0)]
+    )
+    async with session_factory() as db:
+        for run_id, heartbeat, attempts in [
+            ("fresh", now, 1),
+            ("stale", now - timedelta(minutes=5), 1),
+            ("dead", None, 2),
+        ]:
+            run = await db.get(AgentRun, run_id)
+            assert run is not None
+            run.status = AgentRunStatus.RUNNING
+            run.heartbeat_at = heartbeat
+            run.attempts = attempts
+        task = await db.get(Task, "task-dead")
+        assert task is not None
+        task.status = TaskStatus.IN_PROGRESS
+        await db.commit()
+
+    runs = AgentRunScheduler(
+        lease_seconds=60, max_attempts=2, session_factory=session_factory
+    )
+    report = await runs.recover()
+
+    assert report.requeued == ["stale"]
+    assert report.failed == ["dead"]
+    statuses = await _statuses(session_factory)
+    assert statuses == {
+        "fresh": AgentRunStatus.RUNNING,
+        "stale": AgentRunStatus.PENDING,
+        "dead": AgentRunStatus.FAILED,
+    }
+    async with session_factory() as db:
+        task = await db.get(Task, "task-dead")
+        assert task is not None
+        assert task.status == TaskStatus.TODO
+
+
+async def test_claim_takes_lease_and_renewal_keeps_version(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Claimed runs get a heartbeat; renewing it does not change the ETag."""
+    await _queue(session_factory, [("r1", "p", 0)])
+    agent = GatedAgent()
+    monkeypatch.setattr(scheduler, "execute_agent_run", agent)
+    runs = AgentRunScheduler(session_factory=session_factory)
+
+    assert await runs.dispatch() == ["r1"]
+    async with session_factory() as db:
+        claimed = await db.get(AgentRun, "r1")
+        assert claimed is not None
+        assert claimed.attempts == 1
+        assert claimed.heartbeat_at is not None
+        heartbeat, version = claimed.heartbeat_at, claimed.version
+
+    await runs.renew_leases()
+    async with session_factory() as db:
+        renewed = await db.get(AgentRun, "r1")
+        assert renewed is not None
+        assert renewed.heartbeat_at > heartbeat
+        assert renewed.version == version
+
+    agent.release.set()
+    await asyncio.gather(*runs._active.values())
+
+
+async def test_stop_cancels_running_agent(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Stopping a run cancels its task, closes the SDK stream, frees the slot."""
+    started = asyncio.Event()
+    closed = asyncio.Event()
+
+    async def endless_query(prompt: str, options: object) -> AsyncGenerator[object]:
+        try:
+            started.set()
+            await asyncio.Event().wait()
+            yield None
+        finally:
+            closed.set()
+
+    monkeypatch.setattr(executor, "query", endless_query)
+    await _queue(session_factory, [("r1", "p", 0), ("r2", "p", 0)])
+    async with session_factory() as db:
+        project = await db.get(Project, "p")
+        assert project is not None
+        project.workspace_path = str(tmp_path / "missing")  # No git checkpoint
+        await db.commit()
+    runs = AgentRunScheduler(
+        max_concurrent=1, session_factory=session_factory, poll_interval=60
+    )
+    monkeypatch.setattr(scheduler, "agent_scheduler", runs)
+
+    assert await runs.dispatch() == ["r1"]
+    await asyncio.wait_for(started.wait(), timeout=5)
+    async with session_factory() as db:
+        agent_run = await db.get(AgentRun, "r1")
+        assert agent_run is not None
+        assert await stop_agent_run(db, agent_run) is True
+        assert agent_run.status == AgentRunStatus.CANCELLED
+        task = await db.get(Task, "task-r1")
+        assert task is not None
+        assert task.status == TaskStatus.TODO
+
+    assert closed.is_set()
+    assert runs.active_runs == []
+    started.clear()
+    assert await runs.dispatch() == ["r2"]
+    await asyncio.wait_for(started.wait(), timeout=5)
+    await runs.cancel("r2")
+
+
+async def test_renew_leases_cancels_runs_stopped_elsewhere(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A run marked CANCELLED by another worker is cancelled by its owner."""
+    await _queue(session_factory, [("r1", "p", 0)])
+    monkeypatch.setattr(scheduler, "execute_agent_run", GatedAgent())
+    runs = AgentRunScheduler(session_factory=session_factory)
+    assert await runs.dispatch() == ["r1"]
+    task = runs._active["r1"]
+
+    async with session_factory() as db:
+        agent_run = await db.get(AgentRun, "r1")
+        assert agent_run is not None
+        agent_run.status = AgentRunStatus.CANCELLED
+        await db.commit()
+    await runs.renew_leases()
+
+    await asyncio.wait({task}, timeout=5)
+    assert task.cancelled()
+    assert runs.active_runs == []
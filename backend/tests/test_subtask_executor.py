@@ -0,0 +1,184 @@
+"""Dependency-aware subtask executor tests."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.agents import scheduler, subtask_executor
+from src.agents.scheduler import AgentRunScheduler
+from src.agents.subtask_executor import build_subtask_graph, execute_subtasks
+from src.agents.types import AgentResult
+from src.database import Base
+from src.models.agent_run import AgentRun, AgentRunStatus
+from src.models.task import Task, TaskStatus
+
+
+@pytest.fixture
+async def session_factory(
+    tmp_path: Path,
+) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    """File-backed database so concurrent sessions get their own connections."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/subtasks.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+class FakeAgent:
+    """Stand-in for execute_agent_run that records ordering and overlap."""
+
+    def __init__(self, fail: set[str] | None = None) -> None:
+        self.fail = fail or set()
+        self.started: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(
+        self, db: AsyncSession, agent_run: AgentRun, task: Task, project: object
+    ) -> AgentResult:
+        self.started.append(task.title)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.1)
+        self.running -= 1
+
+        failed = task.title in self.fail
+        task.status = TaskStatus.TODO if failed else TaskStatus.DONE
+        await db.commit()
+        status = AgentRunStatus.FAILED if failed else AgentRunStatus.COMPLETED
+        return AgentResult(status=status)
+
+
+async def _plan(
+    session_factory: async_sessionmaker[AsyncSession],
+    deps: dict[str, list[str]],
+) -> None:
+    """Create a parent with one subtask per key, depending on the listed titles."""
+    async with session_factory() as db:
+        db.add(Task(id="parent", title="Parent"))
+        for title, needs in deps.items():
+            db.add(
+                Task(
+                    id=title,
+                    title=title,
+                    parent_id="parent",
+                    depends_on=needs or None,
+                )
+            )
+        await db.commit()
+
+
+async def _run(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+    agent: FakeAgent,
+    max_parallel: int,
+) -> Task:
+    monkeypatch.setattr(scheduler, "execute_agent_run", agent)
+    runs = AgentRunScheduler(
+        max_concurrent=10,
+        max_per_project=10,
+        poll_interval=0.05,
+        session_factory=session_factory,
+    )
+    monkeypatch.setattr(subtask_executor, "agent_scheduler", runs)
+    await runs.start()
+    try:
+        async with session_factory() as db:
+            parent = await db.get(Task, "parent")
+            assert parent is not None
+            await execute_subtasks(
+                db,
+                parent,
+                max_parallel=max_parallel,
+                session_factory=session_factory,
+            )
+            return parent
+    finally:
+        await runs.stop()
+
+
+async def test_independent_subtasks_run_concurrently(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Subtasks without dependencies overlap up to max_parallel."""
+    await _plan(session_factory, {f"r{i}": [] for i in range(5)})
+    agent = FakeAgent()
+
+    parent = await _run(session_factory, monkeypatch, agent, max_parallel=3)
+
+    assert agent.max_running == 3
+    assert sorted(agent.started) == ["r0", "r1", "r2", "r3", "r4"]
+    assert parent.status == TaskStatus.DONE
+
+
+async def test_dependencies_run_in_order(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A subtask starts only after everything it depends on is done."""
+    await _plan(session_factory, {"a": [], "b": [], "c": ["a", "b"], "d": ["c"]})
+    agent = FakeAgent()
+
+    await _run(session_factory, monkeypatch, agent, max_parallel=4)
+
+    assert set(agent.started[:2]) == {"a", "b"}
+    assert agent.started[2:] == ["c", "d"]
+
+
+async def test_failed_dependency_skips_dependents(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Dependents of a failed subtask are not run; the parent needs review."""
+    await _plan(session_factory, {"a": [], "b": ["a"], "c": []})
+    agent = FakeAgent(fail={"a"})
+
+    parent = await _run(session_factory, monkeypatch, agent, max_parallel=2)
+
+    assert sorted(agent.started) == ["a", "c"]
+    assert parent.status == TaskStatus.NEEDS_REVIEW
+    async with session_factory() as db:
+        runs = (await db.execute(select(AgentRun.task_id))).scalars().all()
+    assert sorted(runs) == ["a", "c"]
+
+
+async def test_unfinished_subtask_run_times_out_and_is_cancelled(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A run nobody executes does not hang the parent; it is cancelled."""
+    await _plan(session_factory, {"a": []})
+    idle = AgentRunScheduler(poll_interval=0.02, session_factory=session_factory)
+    monkeypatch.setattr(subtask_executor, "agent_scheduler", idle)  # Never started
+
+    async with session_factory() as db:
+        parent = await db.get(Task, "parent")
+        assert parent is not None
+        await execute_subtasks(
+            db, parent, session_factory=session_factory, run_timeout=0.1
+        )
+
+    assert parent.status == TaskStatus.NEEDS_REVIEW
+    async with session_factory() as db:
+        statuses = (await db.execute(select(AgentRun.status))).scalars().all()
+    assert statuses == [AgentRunStatus.CANCELLED]
+
+
+def test_build_subtask_graph_rejects_cycles_and_unknown_ids() -> None:
+    """Invalid dependency graphs are reported before anything runs."""
+    with pytest.raises(ValueError, match="cycle"):
+        build_subtask_graph(
+            [
+                Task(id="a", title="a", depends_on=["b"]),
+                Task(id="b", title="b", depends_on=["a"]),
+            ]
+        )
+    with pytest.raises(ValueError, match="unknown"):
+        build_subtask_graph([Task(id="a", title="a", depends_on=["zzz"])])
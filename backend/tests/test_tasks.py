@@ -1,6 +1,12 @@
 """Task API endpoint tests."""
 
+import pytest
 from httpx import AsyncClient
+from sqlalchemy import update
+
+from src.api import task_service
+from src.api.events import EventType, event_bus
+from src.models.task import Task
 
 
 async def test_create_task(client: AsyncClient) -> None:
@@ -29,6 +35,30 @@ async def test_create_task_validation_error(client: AsyncClient) -> None:
     assert response.status_code == 422
 
 
+async def test_task_budget_round_trip(client: AsyncClient) -> None:
+    """Per-task run budgets are stored, validated and updatable."""
+    response = await client.post(
+        "/api/tasks", json={"title": "Budgeted", "budget": {"max_turns": 5}}
+    )
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+    assert response.json()["budget"] == {
+        "max_turns": 5,
+        "max_wall_seconds": None,
+        "max_tokens": None,
+    }
+
+    response = await client.put(
+        f"/api/tasks/{task_id}", json={"budget": {"max_tokens": 2000}}
+    )
+    assert response.json()["budget"]["max_tokens"] == 2000
+
+    response = await client.post(
+        "/api/tasks", json={"title": "Bad", "budget": {"max_turns": 0}}
+    )
+    assert response.status_code == 422
+
+
 async def test_list_tasks_empty(client: AsyncClient) -> None:
     """GET /api/tasks returns empty list initially."""
     response = await client.get("/api/tasks")
@@ -102,3 +132,218 @@ async def test_delete_task_not_found(client: AsyncClient) -> None:
     """DELETE /api/tasks/{id} returns 404 for unknown ID."""
     response = await client.delete("/api/tasks/nonexistent-id")
     assert response.status_code == 404
+
+
+async def test_list_tasks_keyset_pagination(client: AsyncClient) -> None:
+    """GET /api/tasks?limit= pages newest first via X-Next-Cursor."""
+    for i in range(5):
+        await client.post("/api/tasks", json={"title": f"Task {i}"})
+    all_ids = [t["id"] for t in (await client.get("/api/tasks")).json()]
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        response = await client.get("/api/tasks", params=params)
+        assert response.status_code == 200
+        seen += [t["id"] for t in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    assert seen == all_ids
+
+
+async def test_list_tasks_cursor_survives_deleted_task(client: AsyncClient) -> None:
+    """Deleting the last task of a page does not break the next page."""
+    for i in range(4):
+        await client.post("/api/tasks", json={"title": f"Task {i}"})
+    all_ids = [t["id"] for t in (await client.get("/api/tasks")).json()]
+
+    first = await client.get("/api/tasks", params={"limit": 2})
+    await client.delete(f"/api/tasks/{all_ids[1]}")
+    response = await client.get(
+        "/api/tasks",
+        params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+    )
+
+    assert response.status_code == 200
+    assert [t["id"] for t in response.json()] == all_ids[2:]
+
+
+async def test_list_tasks_invalid_cursor(client: AsyncClient) -> None:
+    """GET /api/tasks rejects a cursor it did not issue."""
+    response = await client.get("/api/tasks", params={"cursor": "missing"})
+    assert response.status_code == 400
+
+
+async def test_list_tasks_filters(client: AsyncClient) -> None:
+    """GET /api/tasks filters by status, type and parent."""
+    parent = (await client.post("/api/tasks", json={"title": "Parent"})).json()
+    await client.post(
+        "/api/tasks", json={"title": "Child", "parent_id": parent["id"], "type": "dev"}
+    )
+    await client.put(f"/api/tasks/{parent['id']}", json={"status": "done"})
+
+    done = (await client.get("/api/tasks", params={"status": "done"})).json()
+    assert [t["title"] for t in done] == ["Parent"]
+
+    children = await client.get(
+        "/api/tasks", params={"parent_id": parent["id"], "type": "dev"}
+    )
+    assert [t["title"] for t in children.json()] == ["Child"]
+
+
+async def test_list_tasks_field_projection(client: AsyncClient) -> None:
+    """GET /api/tasks?fields= returns only the requested fields plus id."""
+    await client.post("/api/tasks", json={"title": "Light"})
+
+    response = await client.get("/api/tasks", params={"fields": "title,status"})
+    assert response.status_code == 200
+    [task] = response.json()
+    assert set(task) == {"id", "title", "status"}
+
+    response = await client.get("/api/tasks", params={"fields": "title,bogus"})
+    assert response.status_code == 400
+
+
+async def test_get_task_etag(client: AsyncClient) -> None:
+    """GET /api/tasks/{id} returns 304 until the task changes."""
+    task_id = (await client.post("/api/tasks", json={"title": "Cached"})).json()["id"]
+
+    response = await client.get(f"/api/tasks/{task_id}")
+    etag = response.headers["ETag"]
+    response = await client.get(
+        f"/api/tasks/{task_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    await client.put(f"/api/tasks/{task_id}", json={"title": "Changed"})
+    response = await client.get(
+        f"/api/tasks/{task_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["title"] == "Changed"
+
+
+async def test_list_tasks_etag(client: AsyncClient) -> None:
+    """GET /api/tasks ETag changes with the rows and the query string."""
+    task_id = (await client.post("/api/tasks", json={"title": "A"})).json()["id"]
+    etag = (await client.get("/api/tasks")).headers["ETag"]
+
+    response = await client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    projected = await client.get("/api/tasks", params={"fields": "title"})
+    assert projected.headers["ETag"] != etag
+
+    await client.delete(f"/api/tasks/{task_id}")
+    response = await client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+async def test_list_tasks_etag_matches_body_after_concurrent_write(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A write between the version read and the row read changes the ETag."""
+    task_id = (await client.post("/api/tasks", json={"title": "Old"})).json()["id"]
+    list_tasks = task_service.list_tasks
+
+    async def write_after_version_read(db, *args, **kwargs):
+        result = await list_tasks(db, *args, **kwargs)
+        if kwargs.get("fields") == ["version"]:
+            # As another worker would: without touching this session's rows
+            await db.execute(
+                update(Task).where(Task.id == task_id).values(title="New"),
+                execution_options={"synchronize_session": False},
+            )
+            await db.commit()
+        return result
+
+    monkeypatch.setattr(task_service, "list_tasks", write_after_version_read)
+    response = await client.get("/api/tasks")
+    monkeypatch.undo()
+
+    assert response.json()[0]["title"] == "New"
+    assert response.headers["ETag"] == (await client.get("/api/tasks")).headers["ETag"]
+
+
+async def test_bulk_create_tasks(client: AsyncClient) -> None:
+    """POST /api/tasks/bulk creates all tasks and publishes one event."""
+    queue = event_bus.subscribe()
+    try:
+        response = await client.post(
+            "/api/tasks/bulk",
+            json={"tasks": [{"title": f"Imported {i}"} for i in range(3)]},
+        )
+        assert response.status_code == 201
+        assert [t["title"] for t in response.json()] == [
+            "Imported 0",
+            "Imported 1",
+            "Imported 2",
+        ]
+        assert queue.qsize() == 1
+        event = queue.get_nowait()
+    finally:
+        event_bus.unsubscribe(queue)
+
+    assert event.event_type == EventType.TASKS_BATCH
+    assert len(event.data["created"]) == 3
+    assert len((await client.get("/api/tasks")).json()) == 3
+
+
+async def test_bulk_update_tasks(client: AsyncClient) -> None:
+    """PUT /api/tasks/bulk applies partial updates to every task."""
+    created = await client.post(
+        "/api/tasks/bulk", json={"tasks": [{"title": "A"}, {"title": "B"}]}
+    )
+    ids = [t["id"] for t in created.json()]
+
+    response = await client.put(
+        "/api/tasks/bulk",
+        json={
+            "tasks": [{"id": ids[0], "status": "done"}, {"id": ids[1], "title": "B2"}]
+        },
+    )
+    assert response.status_code == 200
+    by_id = {t["id"]: t for t in response.json()}
+    assert by_id[ids[0]]["status"] == "done"
+    assert by_id[ids[0]]["title"] == "A"
+    assert by_id[ids[1]]["title"] == "B2"
+
+
+async def test_bulk_update_is_atomic(client: AsyncClient) -> None:
+    """PUT /api/tasks/bulk changes nothing if any task is missing."""
+    task = (await client.post("/api/tasks", json={"title": "Keep"})).json()
+
+    response = await client.put(
+        "/api/tasks/bulk",
+        json={
+            "tasks": [
+                {"id": task["id"], "title": "Lost"},
+                {"id": "missing", "title": "X"},
+            ]
+        },
+    )
+    assert response.status_code == 404
+    assert "missing" in response.json()["detail"]
+
+    response = await client.get(f"/api/tasks/{task['id']}")
+    assert response.json()["title"] == "Keep"
+
+
+async def test_bulk_delete_tasks(client: AsyncClient) -> None:
+    """POST /api/tasks/bulk/delete removes all listed tasks."""
+    created = await client.post(
+        "/api/tasks/bulk", json={"tasks": [{"title": "A"}, {"title": "B"}]}
+    )
+    ids = [t["id"] for t in created.json()]
+
+    response = await client.post("/api/tasks/bulk/delete", json={"ids": ["nope"]})
+    assert response.status_code == 404
+
+    response = await client.post("/api/tasks/bulk/delete", json={"ids": ids})
+    assert response.status_code == 204
+    assert (await client.get("/api/tasks")).json() == []
@@ -71,3 +71,17 @@ export async function executeTask(
 		},
 	);
 }
+
+/**
+ * Restore the project workspace to the task's pre-run checkpoint
+ */
+export async function restoreCheckpoint(
+	taskId: string,
+): Promise<{ success: boolean; task_id: string; checkpoint: string }> {
+	return request<{ success: boolean; task_id: string; checkpoint: string }>(
+		`/api/agent/restore/${taskId}`,
+		{
+			method: 'POST',
+		},
+	);
+}
@@ -3,7 +3,7 @@
  * Includes exponential backoff reconnection logic
  */
 
-import type { AgentLogEvent } from '$lib/types/agent';
+import type { AgentLogBatchEvent, AgentLogEvent } from '$lib/types/agent';
 import type { BackendTask, Task } from '$lib/types/task';
 import { mapBackendToTask } from '$lib/types/task';
 
@@ -18,8 +18,19 @@ export type EventType =
 	| 'task_created'
 	| 'task_updated'
 	| 'task_deleted'
+	| 'tasks_batch'
 	| 'agent_log'
-	| 'heartbeat';
+	| 'heartbeat'
+	| 'resync';
+
+/**
+ * Bulk create/update/delete, published once per bulk request
+ */
+interface TasksBatchEvent {
+	created: BackendTask[];
+	updated: BackendTask[];
+	deleted: { id: string }[];
+}
 
 export type ConnectionState = 'connected' | 'connecting' | 'disconnected';
 
@@ -46,6 +57,9 @@ interface SubscribeOptions {
  * - Exponential backoff reconnection (1s → 2s → 4s → ... → 30s max)
  * - Connection state callbacks for UI feedback
  * - Automatic retry on disconnect
+ * - Resumes from the last seen event id; a 'resync' event means the
+ *   gap could not be replayed and the caller should refetch its data
+ *   (also emitted on reconnect when no event id has been seen yet)
  */
 export function subscribeToEvents(options: SubscribeOptions): () => void {
 	const { onEvent, onConnectionChange } = options;
@@ -54,6 +68,8 @@ export function subscribeToEvents(options: SubscribeOptions): () => void {
 	let retryDelay = INITIAL_RETRY_DELAY;
 	let retryTimeout: ReturnType<typeof setTimeout> | null = null;
 	let isCleanedUp = false;
+	let lastEventId: string | null = null;
+	let hasConnected = false;
 
 	function setConnectionState(state: ConnectionState): void {
 		onConnectionChange?.(state);
@@ -63,37 +79,88 @@ export function subscribeToEvents(options: SubscribeOptions): () => void {
 		if (isCleanedUp) return;
 
 		setConnectionState('connecting');
-		eventSource = new EventSource(`${API_BASE}/api/events`);
+		// EventSource is re-created on reconnect, so pass the last id explicitly
+		const query = lastEventId
+			? `?last_event_id=${encodeURIComponent(lastEventId)}`
+			: '';
+		eventSource = new EventSource(`${API_BASE}/api/events${query}`);
 
 		eventSource.onopen = () => {
 			setConnectionState('connected');
 			retryDelay = INITIAL_RETRY_DELAY; // Reset backoff on successful connection
+			// Without an event id the backend cannot replay the gap
+			if (hasConnected && !lastEventId) {
+				onEvent({ type: 'resync' });
+			}
+			hasConnected = true;
+		};
+
+		const track = (e: MessageEvent) => {
+			if (e.lastEventId) lastEventId = e.lastEventId;
 		};
 
 		eventSource.addEventListener('task_created', (e: MessageEvent) => {
+			track(e);
 			const data = JSON.parse(e.data) as BackendTask;
 			onEvent({ type: 'task_created', task: mapBackendToTask(data) });
 		});
 
 		eventSource.addEventListener('task_updated', (e: MessageEvent) => {
+			track(e);
 			const data = JSON.parse(e.data) as BackendTask;
 			onEvent({ type: 'task_updated', task: mapBackendToTask(data) });
 		});
 
 		eventSource.addEventListener('task_deleted', (e: MessageEvent) => {
+			track(e);
 			const data = JSON.parse(e.data) as { id: string };
 			onEvent({ type: 'task_deleted', taskId: data.id });
 		});
 
+		// Unpack bulk operations into per-task events
+		eventSource.addEventListener('tasks_batch', (e: MessageEvent) => {
+			track(e);
+			const { created, updated, deleted } = JSON.parse(
+				e.data,
+			) as TasksBatchEvent;
+			for (const data of created) {
+				onEvent({ type: 'task_created', task: mapBackendToTask(data) });
+			}
+			for (const data of updated) {
+				onEvent({ type: 'task_updated', task: mapBackendToTask(data) });
+			}
+			for (const { id } of deleted) {
+				onEvent({ type: 'task_deleted', taskId: id });
+			}
+		});
+
 		eventSource.addEventListener('agent_log', (e: MessageEvent) => {
+			track(e);
 			const data = JSON.parse(e.data) as AgentLogEvent;
 			onEvent({ type: 'agent_log', agentLog: data });
 		});
 
+		// Unpack batches so consumers still get one agent_log per entry
+		eventSource.addEventListener('agent_log_batch', (e: MessageEvent) => {
+			track(e);
+			const { task_id, agent_run_id, logs } = JSON.parse(
+				e.data,
+			) as AgentLogBatchEvent;
+			for (const log of logs) {
+				const agentLog = { task_id, agent_run_id, log };
+				onEvent({ type: 'agent_log', agentLog });
+			}
+		});
+
 		eventSource.addEventListener('heartbeat', () => {
 			onEvent({ type: 'heartbeat' });
 		});
 
+		eventSource.addEventListener('resync', (e: MessageEvent) => {
+			track(e);
+			onEvent({ type: 'resync' });
+		});
+
 		eventSource.onerror = () => {
 			if (isCleanedUp) return;
 
@@ -7,11 +7,16 @@ import { request } from './api';
 export interface GitSettings {
 	auto_checkpoint: boolean;
 	checkpoint_prefix: string;
+	/** Run each agent in its own git worktree */
+	use_worktrees?: boolean;
 }
 
 export interface AgentSettings {
 	max_turns: number;
 	model: string;
+	/** Per-run budgets (null = unlimited); tasks can override them */
+	max_wall_seconds?: number | null;
+	max_tokens?: number | null;
 }
 
 export interface BackendSettings {
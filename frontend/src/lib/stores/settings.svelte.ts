@@ -37,8 +37,12 @@ let analytics = $state(false);
 // Backend Settings State (API)
 let gitAutoCheckpoint = $state(true);
 let gitCheckpointPrefix = $state('checkpoint:');
+let gitUseWorktrees = $state(false);
 let agentMaxTurns = $state(10);
 let agentModel = $state('claude-sonnet-4-20250514');
+// Not editable in the panel yet; kept so saving does not reset them
+let agentMaxWallSeconds = $state<number | null>(null);
+let agentMaxTokens = $state<number | null>(null);
 
 // Agent model options
 export const agentModelOptions = [
@@ -67,6 +71,7 @@ export function getSettings() {
 		// Backend Settings
 		gitAutoCheckpoint,
 		gitCheckpointPrefix,
+		gitUseWorktrees,
 		agentMaxTurns,
 		agentModel,
 	};
@@ -89,6 +94,10 @@ export function setGitCheckpointPrefix(value: string) {
 	gitCheckpointPrefix = value;
 }
 
+export function setGitUseWorktrees(value: boolean) {
+	gitUseWorktrees = value;
+}
+
 export function setAgentMaxTurns(value: number) {
 	agentMaxTurns = value;
 }
@@ -129,8 +138,11 @@ export async function loadBackendSettings(): Promise<void> {
 		const settings = await fetchBackendSettings();
 		gitAutoCheckpoint = settings.git.auto_checkpoint;
 		gitCheckpointPrefix = settings.git.checkpoint_prefix;
+		gitUseWorktrees = settings.git.use_worktrees ?? false;
 		agentMaxTurns = settings.agent.max_turns;
 		agentModel = settings.agent.model;
+		agentMaxWallSeconds = settings.agent.max_wall_seconds ?? null;
+		agentMaxTokens = settings.agent.max_tokens ?? null;
 	} catch (e) {
 		console.error('Failed to load backend settings:', e);
 	}
@@ -155,10 +167,13 @@ export async function saveBackendSettings(): Promise<void> {
 		git: {
 			auto_checkpoint: gitAutoCheckpoint,
 			checkpoint_prefix: gitCheckpointPrefix,
+			use_worktrees: gitUseWorktrees,
 		},
 		agent: {
 			max_turns: agentMaxTurns,
 			model: agentModel,
+			max_wall_seconds: agentMaxWallSeconds,
+			max_tokens: agentMaxTokens,
 		},
 	};
 	await saveBackendSettingsApi(settings);
@@ -67,6 +67,17 @@ export interface AgentRun {
 	error_message?: string;
 	started_at: string | null;
 	completed_at?: string;
+	priority?: number;
+	/** 1-based position while queued (pending), otherwise null */
+	queue_position?: number | null;
+	// Budget usage, recorded when the run finishes
+	num_turns?: number | null;
+	input_tokens?: number | null;
+	output_tokens?: number | null;
+	cost_usd?: number | null;
+	budget_exceeded?: 'turns' | 'wall_time' | 'tokens' | null;
+	/** Worktree mode: branch kept when the run's changes did not apply */
+	worktree_branch?: string | null;
 }
 
 /**
@@ -86,3 +97,15 @@ export interface AgentLogEvent {
 	agent_run_id: string;
 	log: AgentLogEntry;
 }
+
+/**
+ * Coalesced agent logs (SSE `agent_log_batch`), entries in emission order
+ */
+export interface AgentLogBatchEvent {
+	task_id: string;
+	agent_run_id: string;
+	project_id: string | null;
+	logs: AgentLogEntry[];
+	/** False if the entries could not be stored (only streamed) */
+	persisted?: boolean;
+}
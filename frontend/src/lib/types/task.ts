@@ -80,6 +80,15 @@ export const STATUS_FROM_BACKEND: Record<BackendTaskStatus, TaskStatus> = {
 // Task Interfaces
 // ─────────────────────────────────────────────────────────────
 
+/**
+ * Per-task agent run limits; null fields use the global agent settings.
+ */
+export interface TaskBudget {
+	max_turns?: number | null;
+	max_wall_seconds?: number | null;
+	max_tokens?: number | null;
+}
+
 /**
  * Full task model used in frontend components.
  * Status uses UPPERCASE for display.
@@ -126,6 +135,7 @@ export interface BackendTask {
 	allowed_mcps: string[] | null;
 	template: string | null;
 	source: TaskSource;
+	budget?: TaskBudget | null;
 }
 
 /**
@@ -142,6 +152,7 @@ export interface TaskCreate {
 	allowed_mcps?: string[];
 	template?: string;
 	source?: TaskSource;
+	budget?: TaskBudget;
 }
 
 /**
@@ -157,6 +168,7 @@ export interface TaskUpdate {
 	read_paths?: string[];
 	allowed_mcps?: string[];
 	template?: string;
+	budget?: TaskBudget;
 }
 
 // ─────────────────────────────────────────────────────────────